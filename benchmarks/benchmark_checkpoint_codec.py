@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite comparing checkpoint serialization formats.
+"""
+
+import asyncio
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import psutil
+
+from puffinflow.core.agent.base import Agent, FileCheckpointStorage
+from puffinflow.core.agent.checkpoint_codec import CheckpointCodec
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@dataclass
+class BenchmarkResult:
+    """Benchmark result container."""
+
+    name: str
+    duration_ms: float
+    memory_mb: float
+    cpu_percent: float
+    iterations: int
+    min_time: float
+    max_time: float
+    median_time: float
+    std_dev: float
+    throughput_ops_per_sec: float = 0
+
+
+class BenchmarkRunner:
+    """Benchmark runner with resource monitoring."""
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.results: list[BenchmarkResult] = []
+
+    def run_benchmark(
+        self,
+        name: str,
+        func,
+        iterations: int = 100,
+        warmup_iterations: int = 10,
+        *args,
+        **kwargs,
+    ) -> BenchmarkResult:
+        """Run a benchmark with performance monitoring."""
+        print(f"Running benchmark: {name}")
+
+        # Warmup
+        for _ in range(warmup_iterations):
+            if asyncio.iscoroutinefunction(func):
+                asyncio.run(func(*args, **kwargs))
+            else:
+                func(*args, **kwargs)
+
+        # Benchmark
+        times = []
+        memory_before = self.process.memory_info().rss / 1024 / 1024
+        cpu_before = self.process.cpu_percent()
+
+        for _ in range(iterations):
+            start_time = time.perf_counter()
+
+            if asyncio.iscoroutinefunction(func):
+                asyncio.run(func(*args, **kwargs))
+            else:
+                func(*args, **kwargs)
+
+            end_time = time.perf_counter()
+            times.append((end_time - start_time) * 1000)  # Convert to ms
+
+        memory_after = self.process.memory_info().rss / 1024 / 1024
+        cpu_after = self.process.cpu_percent()
+
+        # Calculate statistics
+        avg_time = statistics.mean(times)
+
+        result = BenchmarkResult(
+            name=name,
+            duration_ms=avg_time,
+            memory_mb=memory_after - memory_before,
+            cpu_percent=cpu_after - cpu_before,
+            iterations=iterations,
+            min_time=min(times),
+            max_time=max(times),
+            median_time=statistics.median(times),
+            std_dev=statistics.stdev(times) if len(times) > 1 else 0,
+            throughput_ops_per_sec=1000 / avg_time if avg_time > 0 else 0,
+        )
+
+        self.results.append(result)
+        print(f"  Average: {avg_time:.3f}ms, {result.throughput_ops_per_sec:.0f} ops/s")
+        return result
+
+    def print_results(self):
+        """Print benchmark results in a formatted table."""
+        print("\n" + "=" * 100)
+        print("BENCHMARK RESULTS")
+        print("=" * 100)
+        print(
+            f"{'Benchmark':<40} {'Avg (ms)':<10} {'Min (ms)':<10} {'Max (ms)':<10} {'Median (ms)':<12} {'Ops/s':<10}"
+        )
+        print("-" * 100)
+
+        for result in self.results:
+            print(
+                f"{result.name:<40} {result.duration_ms:<10.3f} {result.min_time:<10.3f} {result.max_time:<10.3f} {result.median_time:<12.3f} {result.throughput_ops_per_sec:<10.0f}"
+            )
+
+        print("=" * 100)
+
+
+class CheckpointCodecBenchmarks:
+    """Checkpoint serialization benchmarks."""
+
+    def __init__(self, num_states: int = 50):
+        self.checkpoint = self.create_agent(num_states).create_checkpoint()
+        self.codec = CheckpointCodec()
+        self.zlib_codec = CheckpointCodec("zlib")
+        self.pickled = pickle.dumps(self.checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+        self.encoded = self.codec.encode(self.checkpoint)
+        self.compressed = self.zlib_codec.encode(self.checkpoint)
+        self.directory = tempfile.TemporaryDirectory()
+        self.storages = {
+            format: FileCheckpointStorage(f"{self.directory.name}/{format}", format)
+            for format in ("pickle", "json", "binary")
+        }
+        self.checkpoint_ids: dict[str, str] = {}
+
+    def create_agent(self, num_states: int) -> Agent:
+        """Create an agent with typical checkpoint contents."""
+
+        async def step(ctx):
+            pass
+
+        agent = Agent("codec_benchmark")
+        for i in range(num_states):
+            dependencies = [f"state_{i - 1}"] if i else []
+            agent.add_state(f"state_{i}", step, dependencies=dependencies)
+            agent.shared_state[f"result_{i}"] = {
+                "value": i,
+                "score": i / 3,
+                "label": f"item {i}",
+                "tags": ["a", "b", "c"],
+            }
+        for i in range(num_states // 2):
+            agent.completed_states.add(f"state_{i}")
+            agent.completed_once.add(f"state_{i}")
+            agent.state_metadata[f"state_{i}"].attempts = 1
+        return agent
+
+    def benchmark_pickle_encode(self):
+        pickle.dumps(self.checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def benchmark_pickle_decode(self):
+        pickle.loads(self.pickled)
+
+    def benchmark_codec_encode(self):
+        self.codec.encode(self.checkpoint)
+
+    def benchmark_codec_decode(self):
+        self.codec.decode(self.encoded)
+
+    def benchmark_codec_zlib_encode(self):
+        self.zlib_codec.encode(self.checkpoint)
+
+    def benchmark_codec_zlib_decode(self):
+        self.zlib_codec.decode(self.compressed)
+
+    async def benchmark_file_save(self, format: str):
+        storage = self.storages[format]
+        self.checkpoint_ids[format] = await storage.save_checkpoint(
+            "codec_benchmark", self.checkpoint
+        )
+
+    async def benchmark_file_load(self, format: str):
+        storage = self.storages[format]
+        await storage.load_checkpoint("codec_benchmark", self.checkpoint_ids[format])
+
+    def print_sizes(self):
+        """Print the stored size of each format."""
+        sizes = {"pickle": len(self.pickled), "binary": len(self.encoded)}
+        sizes["binary (zlib)"] = len(self.compressed)
+        for format, checkpoint_id in self.checkpoint_ids.items():
+            storage = self.storages[format]
+            path = storage._get_checkpoint_path("codec_benchmark", checkpoint_id)
+            sizes[f"{format} file"] = path.stat().st_size
+
+        print("\nCheckpoint size")
+        for name, size in sizes.items():
+            print(f"  {name:<20} {size:>10} bytes")
+
+
+def main():
+    """Run checkpoint codec benchmarks."""
+    print("🗜️  Starting Checkpoint Codec Benchmarks")
+    print("=" * 50)
+
+    runner = BenchmarkRunner()
+    benchmarks = CheckpointCodecBenchmarks()
+
+    runner.run_benchmark(
+        "Pickle Encode", benchmarks.benchmark_pickle_encode, iterations=1000
+    )
+    runner.run_benchmark(
+        "Pickle Decode", benchmarks.benchmark_pickle_decode, iterations=1000
+    )
+    runner.run_benchmark(
+        "Binary Codec Encode", benchmarks.benchmark_codec_encode, iterations=1000
+    )
+    runner.run_benchmark(
+        "Binary Codec Decode", benchmarks.benchmark_codec_decode, iterations=1000
+    )
+    runner.run_benchmark(
+        "Binary Codec Encode (zlib)",
+        benchmarks.benchmark_codec_zlib_encode,
+        iterations=1000,
+    )
+    runner.run_benchmark(
+        "Binary Codec Decode (zlib)",
+        benchmarks.benchmark_codec_zlib_decode,
+        iterations=1000,
+    )
+
+    # Full storage round trips, including the JSON format
+    for format in ("pickle", "json", "binary"):
+        runner.run_benchmark(
+            f"File Save ({format})",
+            benchmarks.benchmark_file_save,
+            100,
+            10,
+            format,
+        )
+        runner.run_benchmark(
+            f"File Load ({format})",
+            benchmarks.benchmark_file_load,
+            100,
+            10,
+            format,
+        )
+
+    runner.print_results()
+    benchmarks.print_sizes()
+    benchmarks.directory.cleanup()
+
+    return runner.results
+
+
+if __name__ == "__main__":
+    results = main()
@@ -221,6 +221,91 @@ class AgentBenchmarks:
         ready_states = agent._get_ready_states()
         return len(ready_states)
 
+    def create_wide_dag_agent(self, width: int = 20) -> Agent:
+        """Create a fan-out agent where one slow branch runs beside fast chains."""
+        agent = Agent(name="wide_dag_agent", max_concurrent=width + 1)
+
+        async def slow_branch(ctx):
+            await asyncio.sleep(0.05)
+
+        async def fast_step(ctx):
+            await asyncio.sleep(0.001)
+
+        agent.add_state("slow_branch", slow_branch)
+        for i in range(width):
+            # Each chain is three hops long; only the last hop waits on its parent
+            agent.add_state(f"chain_{i}_a", fast_step)
+            agent.add_state(f"chain_{i}_b", fast_step, dependencies=[f"chain_{i}_a"])
+            agent.add_state(f"chain_{i}_c", fast_step, dependencies=[f"chain_{i}_b"])
+
+        return agent
+
+    async def benchmark_wide_dag_latency(self, width: int = 20):
+        """Benchmark makespan of a wide DAG against its critical path.
+
+        The critical path is the 50 ms slow branch. With batch-barrier
+        scheduling every fast chain hop waited for the slow state, so the run
+        took roughly three times the critical path; with event-driven
+        scheduling the chains finish underneath it.
+        """
+        from puffinflow.core.agent.state import ExecutionMode
+
+        agent = self.create_wide_dag_agent(width)
+        start = time.perf_counter()
+        await agent.run(execution_mode=ExecutionMode.PARALLEL)
+        makespan_ms = (time.perf_counter() - start) * 1000
+        return makespan_ms / 50.0
+
+    async def benchmark_hop_latency(self, hops: int = 50):
+        """Benchmark per-hop scheduling latency along a dependency chain."""
+        agent = Agent(name="chain_agent")
+
+        async def noop(ctx):
+            return None
+
+        agent.add_state("hop_0", noop)
+        for i in range(1, hops):
+            agent.add_state(f"hop_{i}", noop, dependencies=[f"hop_{i - 1}"])
+
+        start = time.perf_counter()
+        await agent.run()
+        return (time.perf_counter() - start) * 1000 / hops
+
+    def create_batch_agent(self) -> Agent:
+        """Create a three-step pipeline that is run once per input."""
+        agent = Agent(name="batch_agent")
+
+        async def load(ctx):
+            ctx.set_variable("data", list(range(ctx.get_variable("batch_index"))))
+
+        async def transform(ctx):
+            ctx.set_variable("processed", [x * 2 for x in ctx.get_variable("data")])
+
+        async def publish(ctx):
+            ctx.set_output("total", sum(ctx.get_variable("processed")))
+
+        agent.add_state("load", load)
+        agent.add_state("transform", transform, dependencies=["load"])
+        agent.add_state("publish", publish, dependencies=["transform"])
+        return agent
+
+    async def benchmark_fresh_agents_batch(self, runs: int = 100):
+        """Benchmark a batch of inputs with a new agent built per input."""
+        for i in range(runs):
+            agent = self.create_batch_agent()
+            await agent.run(initial_context={"batch_index": i})
+
+    async def benchmark_run_many_batch(self, runs: int = 100, concurrency: int = 50):
+        """Benchmark the same batch through ``run_many`` on one template agent.
+
+        Each worker resets and reuses its per-run agent between inputs, so
+        the batch skips rebuilding an agent for every run.
+        """
+        agent = self.create_batch_agent()
+        inputs = ({"batch_index": i} for i in range(runs))
+        async for _ in agent.run_many(inputs, concurrency=concurrency):
+            pass
+
     def benchmark_resource_acquisition(self):
         """Benchmark resource pool acquisition."""
         requirements = ResourceRequirements(cpu_cores=1, memory_mb=50)
@@ -276,6 +361,35 @@ def main():
         num_agents=10,
     )
 
+    runner.run_benchmark(
+        "Wide DAG Makespan (20 chains)",
+        benchmarks.benchmark_wide_dag_latency,
+        iterations=20,
+        width=20,
+    )
+
+    runner.run_benchmark(
+        "Dependency Chain (50 hops)",
+        benchmarks.benchmark_hop_latency,
+        iterations=20,
+        hops=50,
+    )
+
+    runner.run_benchmark(
+        "Batch of 100 (fresh agents)",
+        benchmarks.benchmark_fresh_agents_batch,
+        iterations=20,
+        runs=100,
+    )
+
+    runner.run_benchmark(
+        "Batch of 100 (run_many, 50 workers)",
+        benchmarks.benchmark_run_many_batch,
+        iterations=20,
+        runs=100,
+        concurrency=50,
+    )
+
     runner.run_benchmark(
         "State Dependency Resolution",
         benchmarks.benchmark_state_dependency_resolution,
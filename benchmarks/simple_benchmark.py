@@ -16,6 +16,8 @@ import psutil
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 try:
+    from puffinflow.core.agent.base import Agent
+
     HAS_PUFFINFLOW = True
 except ImportError:
     HAS_PUFFINFLOW = False
@@ -190,6 +192,43 @@ def benchmark_resource_intensive():
     return runner.results
 
 
+def benchmark_state_execution_overhead():
+    """Benchmark per-state engine overhead with and without the fast path."""
+    runner = SimpleBenchmarkRunner()
+
+    async def lightweight_state(context):
+        context.set_variable("done", True)
+
+    def create_agent(enable_fast_path: bool) -> Agent:
+        agent = Agent("overhead", enable_fast_path=enable_fast_path)
+        agent.add_state("lightweight", lightweight_state)
+        return agent
+
+    def run_states(enable_fast_path: bool):
+        async def execute():
+            agent = create_agent(enable_fast_path)
+            for _ in range(100):
+                agent.completed_states.discard("lightweight")
+                await agent.run_state("lightweight")
+
+        return asyncio.run(execute())
+
+    runner.run_benchmark(
+        "100 Lightweight States (pool + breaker)",
+        lambda: run_states(False),
+        iterations=200,
+        warmup=20,
+    )
+    runner.run_benchmark(
+        "100 Lightweight States (fast path)",
+        lambda: run_states(True),
+        iterations=200,
+        warmup=20,
+    )
+
+    return runner.results
+
+
 def main():
     """Main benchmark function."""
     print("🚀 Starting Simple PuffinFlow Benchmarks")
@@ -210,6 +249,11 @@ def main():
     resource_results = benchmark_resource_intensive()
     all_results.extend(resource_results)
 
+    if HAS_PUFFINFLOW:
+        print("\n🧩 State Execution Overhead Benchmarks")
+        overhead_results = benchmark_state_execution_overhead()
+        all_results.extend(overhead_results)
+
     # Print summary
     print("\n" + "=" * 80)
     print("🎯 BENCHMARK SUMMARY")
@@ -2,12 +2,35 @@
 
 from typing import Any, Callable
 
-from .base import Agent, AgentResult, ResourceTimeoutError
-from .checkpoint import AgentCheckpoint
-from .context import Context, StateType
+from .base import (
+    Agent,
+    AgentResult,
+    ResourceTimeoutError,
+    WriteConflictError,
+    create_checkpoint_storage,
+)
+from .checkpoint import AgentCheckpoint, CheckpointDelta, DeltaCheckpointer
+from .checkpoint_codec import CheckpointCodec
+from .checkpoint_log import LogCheckpointStorage
+from .checkpoint_sqlite import SQLiteCheckpointStorage
+from .context import Context, SharedStateOverlay, StateType
+from .context_cache import ContextCache
+from .dead_letters import DeadLetterQueue
 from .dependencies import DependencyConfig, DependencyLifecycle, DependencyType
+from .estimates import DurationEstimator
+from .executors import ExecutorRegistry, StateExecutor
+from .memoization import StateCache
+from .plan import PlannedState, WorkflowPlan
+from .queueing import (
+    AgingScheduler,
+    CriticalPathScheduler,
+    QueueWaitHistogram,
+    StateScheduler,
+    WeightedFairScheduler,
+)
 from .state import (
     AgentStatus,
+    CachePolicy,
     DeadLetter,
     ExecutionMode,
     PrioritizedState,
@@ -17,6 +40,8 @@ from .state import (
     StateResult,
     StateStatus,
 )
+from .streaming import StateStream, StreamError, StreamReader
+from .timing import PhaseTimer
 
 # Decorators
 try:
@@ -189,42 +214,68 @@ __all__ = [
     "AgentCheckpoint",
     "AgentResult",
     "AgentStatus",
+    "AgingScheduler",
+    "CachePolicy",
+    "CheckpointCodec",
+    "CheckpointDelta",
     "Context",
+    "ContextCache",
+    "CriticalPathScheduler",
     "DeadLetter",
+    "DeadLetterQueue",
+    "DeltaCheckpointer",
     "DependencyConfig",
     "DependencyLifecycle",
     # Dependencies
     "DependencyType",
+    "DurationEstimator",
     "ExecutionMode",
+    "ExecutorRegistry",
     "FlexibleStateDecorator",
     # Scheduling (if available)
     "GlobalScheduler",
     "InputType",
     "InvalidInputTypeError",
     "InvalidScheduleError",
+    "LogCheckpointStorage",
+    "PhaseTimer",
+    "PlannedState",
     "PrioritizedState",
     # State management
     "Priority",
+    "QueueWaitHistogram",
     "ResourceTimeoutError",
     "RetryPolicy",
+    "SQLiteCheckpointStorage",
     "ScheduleBuilder",
     "ScheduleParser",
     "ScheduledAgent",
     "ScheduledInput",
     "SchedulingError",
+    "SharedStateOverlay",
     # Decorators (if available)
     "StateBuilder",
+    "StateCache",
+    "StateExecutor",
     "StateMetadata",
     "StateProfile",
     "StateResult",
+    "StateScheduler",
     "StateStatus",
+    "StateStream",
     "StateType",
+    "StreamError",
+    "StreamReader",
+    "WeightedFairScheduler",
+    "WorkflowPlan",
+    "WriteConflictError",
     "batch_state",
     "build_state",
     "compare_states",
     "concurrent_state",
     "cpu_intensive",
     "cpu_state",
+    "create_checkpoint_storage",
     "create_custom_decorator",
     "create_environment_decorator",
     "create_external_team_decorator",
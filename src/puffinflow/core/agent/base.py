@@ -1,11 +1,22 @@
 """Agent with direct access and coordination features."""
 
 import asyncio
+import contextlib
+import functools
+import inspect
 import json
 import logging
+import mmap
 import pickle
 import time
 import weakref
+from collections.abc import (
+    AsyncGenerator,
+    Awaitable,
+    Iterable,
+    Mapping,
+    MutableMapping,
+)
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import (
@@ -17,10 +28,27 @@ from typing import (
     Union,
 )
 
-from .checkpoint import AgentCheckpoint
-from .context import Context
+from .checkpoint import (
+    AgentCheckpoint,
+    CheckpointDelta,
+    DeltaCheckpointer,
+    DirtyTrackingDict,
+)
+from .checkpoint_codec import CheckpointCodec
+from .checkpoint_log import LogCheckpointStorage
+from .checkpoint_sqlite import SQLiteCheckpointStorage
+from .context import Context, ContextIndex, SharedStateOverlay
+from .context_cache import ContextCache
+from .dead_letters import DeadLetterQueue
+from .dependencies import DependencyIndex
+from .estimates import DurationEstimator
+from .executors import ExecutorRegistry, run_state_in_worker
+from .memoization import StateCache
+from .plan import WorkflowPlan
+from .queueing import QueueWaitHistogram, StateScheduler, create_scheduler
 from .state import (
     AgentStatus,
+    CachePolicy,
     DeadLetter,
     ExecutionMode,
     PrioritizedState,
@@ -30,6 +58,16 @@ from .state import (
     StateResult,
     StateStatus,
 )
+from .streaming import StateStream, StreamReader
+from .timing import (
+    BODY,
+    CONTEXT_MERGE,
+    COORDINATION_ACQUIRE,
+    QUEUE_WAIT,
+    RESOURCE_ACQUIRE,
+    RESULT_HANDLING,
+    PhaseTimer,
+)
 
 # Import scheduling components
 try:
@@ -48,6 +86,25 @@ try:
 except ImportError:
     _ResourceRequirements = None
 
+
+def _resource_amounts(requirements: Any) -> tuple[float, ...]:
+    """Get the resource amounts a requirements object asks for."""
+    return (
+        requirements.cpu_units,
+        requirements.memory_mb,
+        requirements.io_weight,
+        requirements.network_weight,
+        requirements.gpu_units,
+    )
+
+
+# States asking for exactly the default amounts are eligible for the fast path
+_DEFAULT_RESOURCE_AMOUNTS = (
+    _resource_amounts(_ResourceRequirements())
+    if _ResourceRequirements is not None
+    else None
+)
+
 # Import these conditionally to avoid circular imports
 if TYPE_CHECKING:
     from ..coordination.agent_team import AgentTeam
@@ -64,14 +121,14 @@ class CheckpointStorage(Protocol):
     """Protocol for checkpoint storage backends."""
 
     async def save_checkpoint(
-        self, agent_name: str, checkpoint: AgentCheckpoint
+        self, agent_name: str, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
     ) -> str:
         """Save checkpoint and return checkpoint ID."""
         ...
 
     async def load_checkpoint(
         self, agent_name: str, checkpoint_id: Optional[str] = None
-    ) -> Optional[AgentCheckpoint]:
+    ) -> Optional[Union[AgentCheckpoint, CheckpointDelta]]:
         """Load checkpoint by ID or latest for agent."""
         ...
 
@@ -87,18 +144,30 @@ class CheckpointStorage(Protocol):
 class FileCheckpointStorage:
     """File-based checkpoint storage."""
 
-    def __init__(self, base_path: str = "./checkpoints", format: str = "pickle"):
+    _EXTENSIONS = {"pickle": "pkl", "json": "json", "binary": "ckpt"}
+
+    def __init__(
+        self,
+        base_path: str = "./checkpoints",
+        format: str = "pickle",
+        codec: Optional[CheckpointCodec] = None,
+    ):
         """
         Initialize file storage.
 
         Args:
             base_path: Directory to store checkpoint files
-            format: Storage format ('pickle' or 'json')
+            format: Storage format ('pickle', 'json' or 'binary')
+            codec: Codec of the binary format, for compression or pickled
+                values
         """
         self.base_path = Path(base_path)
         self.format = format.lower()
-        if self.format not in ("pickle", "json"):
-            raise ValueError(f"Unsupported format: {format}. Use 'pickle' or 'json'")
+        if self.format not in self._EXTENSIONS:
+            raise ValueError(
+                f"Unsupported format: {format}. Use 'pickle', 'json' or 'binary'"
+            )
+        self.codec = codec or CheckpointCodec()
 
         # Create directory if it doesn't exist
         self.base_path.mkdir(parents=True, exist_ok=True)
@@ -107,20 +176,30 @@ class FileCheckpointStorage:
         """Get file path for checkpoint."""
         agent_dir = self.base_path / agent_name
         agent_dir.mkdir(exist_ok=True)
-        ext = "pkl" if self.format == "pickle" else "json"
-        return agent_dir / f"{checkpoint_id}.{ext}"
+        return agent_dir / f"{checkpoint_id}.{self._EXTENSIONS[self.format]}"
 
     async def save_checkpoint(
-        self, agent_name: str, checkpoint: AgentCheckpoint
+        self, agent_name: str, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
     ) -> str:
         """Save checkpoint to file."""
-        checkpoint_id = f"checkpoint_{int(checkpoint.timestamp)}"
-        file_path = self._get_checkpoint_path(agent_name, checkpoint_id)
+        # Checkpoints taken within the same second get the next free ID
+        number = int(checkpoint.timestamp)
+        file_path = self._get_checkpoint_path(agent_name, f"checkpoint_{number}")
+        while file_path.exists():
+            number += 1
+            file_path = self._get_checkpoint_path(agent_name, f"checkpoint_{number}")
+        checkpoint_id = f"checkpoint_{number}"
 
         try:
             if self.format == "pickle":
                 with file_path.open("wb") as f:
                     pickle.dump(checkpoint, f)
+            elif self.format == "binary":
+                file_path.write_bytes(self.codec.encode(checkpoint))
+            elif not isinstance(checkpoint, AgentCheckpoint):
+                raise ValueError(
+                    "The json format cannot store delta checkpoints; use 'pickle'"
+                )
             else:  # json
                 # Convert checkpoint to JSON-serializable format
                 checkpoint_data = {
@@ -175,7 +254,7 @@ class FileCheckpointStorage:
 
     async def load_checkpoint(
         self, agent_name: str, checkpoint_id: Optional[str] = None
-    ) -> Optional[AgentCheckpoint]:
+    ) -> Optional[Union[AgentCheckpoint, CheckpointDelta]]:
         """Load checkpoint from file."""
         if checkpoint_id is None:
             # Load latest checkpoint
@@ -195,6 +274,13 @@ class FileCheckpointStorage:
                 with file_path.open("rb") as f:
                     checkpoint: AgentCheckpoint = pickle.load(f)
                     return checkpoint
+            elif self.format == "binary":
+                # Decode straight from the mapped file, which stays mapped
+                # after the file is closed
+                with file_path.open("rb") as stream:
+                    mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+                with mapped:
+                    return self.codec.decode(mapped)
             else:  # json
                 with file_path.open("r") as f:
                     data = json.load(f)
@@ -260,7 +346,7 @@ class FileCheckpointStorage:
         if not agent_dir.exists():
             return []
 
-        ext = "pkl" if self.format == "pickle" else "json"
+        ext = self._EXTENSIONS[self.format]
         checkpoint_files = [f.stem for f in agent_dir.glob(f"*.{ext}") if f.is_file()]
 
         # Sort by timestamp (extract from filename)
@@ -288,17 +374,23 @@ class MemoryCheckpointStorage:
     """In-memory checkpoint storage for testing."""
 
     def __init__(self) -> None:
-        self._checkpoints: dict[str, dict[str, AgentCheckpoint]] = {}
+        self._checkpoints: dict[
+            str, dict[str, Union[AgentCheckpoint, CheckpointDelta]]
+        ] = {}
 
     async def save_checkpoint(
-        self, agent_name: str, checkpoint: AgentCheckpoint
+        self, agent_name: str, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
     ) -> str:
         """Save checkpoint to memory."""
-        checkpoint_id = f"checkpoint_{int(checkpoint.timestamp)}"
-
         if agent_name not in self._checkpoints:
             self._checkpoints[agent_name] = {}
 
+        # Checkpoints taken within the same second get the next free ID
+        number = int(checkpoint.timestamp)
+        while f"checkpoint_{number}" in self._checkpoints[agent_name]:
+            number += 1
+        checkpoint_id = f"checkpoint_{number}"
+
         # Deep copy to prevent modifications
         import copy
 
@@ -309,7 +401,7 @@ class MemoryCheckpointStorage:
 
     async def load_checkpoint(
         self, agent_name: str, checkpoint_id: Optional[str] = None
-    ) -> Optional[AgentCheckpoint]:
+    ) -> Optional[Union[AgentCheckpoint, CheckpointDelta]]:
         """Load checkpoint from memory."""
         if agent_name not in self._checkpoints:
             return None
@@ -356,6 +448,40 @@ class MemoryCheckpointStorage:
         return False
 
 
+def create_checkpoint_storage(
+    backend: Optional[str] = None, path: Optional[str] = None
+) -> CheckpointStorage:
+    """
+    Create a checkpoint storage backend.
+
+    Args:
+        backend: "sqlite", "log", "file" or "memory"; defaults to the
+            ``storage_backend`` setting
+        path: Database file or directory; defaults to the ``storage_path``
+            setting, then to ``./checkpoints.db`` or ``./checkpoints``
+    """
+    if backend is None or path is None:
+        from ..config import get_settings
+
+        settings = get_settings()
+        backend = backend or settings.storage_backend
+        path = path or settings.storage_path
+
+    backend = backend.lower()
+    if backend == "sqlite":
+        return SQLiteCheckpointStorage(path or "./checkpoints.db")
+    if backend == "log":
+        return LogCheckpointStorage(path or "./checkpoints")
+    if backend == "file":
+        return FileCheckpointStorage(path or "./checkpoints")
+    if backend == "memory":
+        return MemoryCheckpointStorage()
+    raise ValueError(
+        f"Unknown storage backend: {backend}. "
+        f"Available backends: sqlite, log, file, memory"
+    )
+
+
 @dataclass
 class AgentResult:
     """Rich result container for agent execution."""
@@ -493,6 +619,18 @@ class ResourceTimeoutError(Exception):
     pass
 
 
+class WriteConflictError(Exception):
+    """Raised when a state's shared state writes conflict with another state."""
+
+    def __init__(self, state_name: str, keys: list[str]) -> None:
+        super().__init__(
+            f"State '{state_name}' wrote keys changed concurrently by another "
+            f"state: {', '.join(sorted(keys))}"
+        )
+        self.state_name = state_name
+        self.keys = keys
+
+
 class Agent:
     """Enhanced Agent with direct variable access and coordination features."""
 
@@ -507,6 +645,18 @@ class Agent:
         enable_dead_letter: bool = True,
         state_timeout: Optional[float] = None,
         checkpoint_storage: Optional[CheckpointStorage] = None,
+        executors: Optional[ExecutorRegistry] = None,
+        enable_fast_path: bool = True,
+        on_write_conflict: str = "overwrite",
+        stream_buffer_size: int = 64,
+        scheduling_policy: Union[str, StateScheduler] = "strict",
+        state_cache: Optional[StateCache] = None,
+        enable_phase_timing: bool = False,
+        dead_letter_queue: Optional[DeadLetterQueue] = None,
+        early_abort: bool = True,
+        context_cache: Optional[ContextCache] = None,
+        checkpointer: Optional[DeltaCheckpointer] = None,
+        checkpoint_interval: Optional[float] = None,
         **kwargs: Any,
     ) -> None:
         self.name = name
@@ -514,21 +664,128 @@ class Agent:
         self.state_metadata: dict[str, StateMetadata] = {}
         self.dependencies: dict[str, list[str]] = {}
         self.status = AgentStatus.IDLE
-        self.shared_state: dict[str, Any] = {}
+        # With a checkpointer, saved checkpoints after the first are deltas
+        # of the shared state keys written since the previous one
+        self.checkpointer = checkpointer
+        self.shared_state: dict[str, Any] = (
+            DirtyTrackingDict() if checkpointer is not None else {}
+        )
         self.priority_queue: list[PrioritizedState] = []
         self.running_states: set[str] = set()
         self.completed_states: set[str] = set()
         self.completed_once: set[str] = set()
-        self.dead_letters: list[DeadLetter] = []
+        self.dead_letters = (
+            dead_letter_queue if dead_letter_queue is not None else DeadLetterQueue()
+        )
         self.session_start: Optional[float] = None
 
+        # Event-driven execution: in-flight state tasks and the run loop wakeup
+        self._running_tasks: dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Dependency index and queue bookkeeping. Queued states whose
+        # dependencies are not met yet are parked off the heap until their
+        # last dependency completes.
+        self._dependency_index = DependencyIndex()
+        self._queued: set[str] = set()
+        self._parked: dict[str, PrioritizedState] = {}
+
+        # Failed states waiting out their retry backoff, as a heap of
+        # (ready_at, state_name) on the monotonic clock. The run loop queues
+        # them again once due, so backoff holds no execution slot.
+        self._retry_heap: list[tuple[float, str]] = []
+        self._retrying: set[str] = set()
+        self._retries_scheduled = 0
+
+        # Orders the priority queue: "strict", "aging", "fair",
+        # "critical_path" or a custom StateScheduler
+        self.state_scheduler = create_scheduler(scheduling_policy)
+
+        # Per-phase durations of state executions. None disables timing, so
+        # the hot path only pays for an attribute check.
+        self.phase_timer: Optional[PhaseTimer] = (
+            PhaseTimer() if enable_phase_timing else None
+        )
+
+        # Deadline timestamp of the current run, if it has a timeout.
+        # Historical durations estimate the critical path of the
+        # outstanding states: near the deadline free slots go to the states
+        # on it, and with early_abort a run that cannot finish in time stops
+        # right away instead of burning resources until it times out.
+        self.duration_estimator = DurationEstimator()
+        self.early_abort = early_abort
+        self._deadline: Optional[float] = None
+        self._critical_ranks: dict[str, float] = {}
+        # Max-heap of (-rank, state_name) of queued and retrying states.
+        # Entries of states that left both are dropped when they reach the
+        # top, so the longest outstanding rank is found without a scan.
+        self._rank_heap: list[tuple[float, str]] = []
+        self._deadline_aborts = 0
+
+        # Compiled workflow plan, possibly shared with other agents
+        self._plan: Optional[WorkflowPlan] = None
+
         # Configuration
         self.max_concurrent = max_concurrent
         self.state_timeout = state_timeout
         self.checkpoint_storage = checkpoint_storage or MemoryCheckpointStorage()
 
+        # Seconds between checkpoints taken in the background while running.
+        # Agents given a checkpoint storage default to the
+        # checkpoint_interval setting; 0 or None disables them.
+        if checkpoint_interval is None and checkpoint_storage is not None:
+            from ..config import get_settings
+
+            checkpoint_interval = get_settings().checkpoint_interval
+        if checkpoint_interval is not None and checkpoint_interval < 0:
+            raise ValueError(
+                f"Invalid checkpoint_interval: {checkpoint_interval}. "
+                f"Must not be negative"
+            )
+        self.checkpoint_interval = checkpoint_interval or None
+        # Background checkpoint writes: one at a time, with later requests
+        # coalesced into a single follow-up capture
+        self._checkpoint_write: Optional[asyncio.Task] = None
+        self._checkpoint_pending = False
+        self._last_checkpoint: Optional[float] = None
+        self._checkpoint_latency = QueueWaitHistogram()
+        self._checkpoint_failures = 0
+        self._checkpoints_coalesced = 0
+
+        # States with default resources and no protection configured skip the
+        # resource pool and circuit breaker. Plain int counters are enough as
+        # they are only touched from the event loop thread.
+        self.enable_fast_path = enable_fast_path
+        self._fast_path_executions = 0
+        self._protected_executions = 0
+
+        # Each state execution writes to a copy-on-write overlay of
+        # shared_state that is merged on completion. Per-key versions detect
+        # concurrent writes to the same key.
+        if on_write_conflict not in ("overwrite", "fail"):
+            raise ValueError(
+                f"Invalid on_write_conflict: {on_write_conflict}. "
+                f"Use 'overwrite' or 'fail'"
+            )
+        self.on_write_conflict = on_write_conflict
+        self._state_versions: dict[str, int] = {}
+        self._write_conflicts = 0
+
+        # Open streams of async generator states, keyed by producer. Each
+        # streaming consumer reads from its own queue of this many items.
+        if stream_buffer_size < 1:
+            raise ValueError(
+                f"Invalid stream_buffer_size: {stream_buffer_size}. Must be at least 1"
+            )
+        self.stream_buffer_size = stream_buffer_size
+        self._streams: dict[str, StateStream] = {}
+
         # Enhanced features
         self._context: Optional[Context] = None
+        # Metadata index and cache shared by this agent's contexts, and
+        # released state contexts kept for reuse
+        self._context_index = ContextIndex(context_cache)
+        self._context_pool: list[Context] = []
         self._variable_watchers: dict[str, list[Callable]] = {}
         self._shared_variable_watchers: dict[str, list[Callable]] = {}
         self._agent_variables: dict[str, Any] = {}
@@ -538,6 +795,8 @@ class Agent:
         self._message_handlers: dict[str, Callable] = {}
         self._event_handlers: dict[str, list[Callable]] = {}
         self._state_change_handlers: list[Callable] = []
+        # Resolved on every variable change to wake wait_for_variable
+        self._variable_waiter: Optional[asyncio.Future] = None
 
         # Resource and reliability components - lazy initialization
         self._resource_pool = resource_pool
@@ -545,6 +804,9 @@ class Agent:
         self._bulkhead: Optional[Bulkhead] = None
         self._circuit_breaker_config = circuit_breaker_config
         self._bulkhead_config = bulkhead_config
+        self._executors = executors
+        self._owns_executors = False
+        self._state_cache = state_cache
 
         self.retry_policy = retry_policy or RetryPolicy()
         self.enable_dead_letter = enable_dead_letter
@@ -553,6 +815,23 @@ class Agent:
         # Create context
         self.context = self._create_context(self.shared_state)
 
+    @property
+    def state_cache(self) -> StateCache:
+        """Get or create the cache of state results."""
+        if self._state_cache is None:
+            self._state_cache = StateCache()
+        return self._state_cache
+
+    @property
+    def context_cache(self) -> ContextCache:
+        """Get the cache behind ``set_cached`` and ``get_cached``."""
+        return self._context_index.cache
+
+    @context_cache.setter
+    def context_cache(self, value: ContextCache) -> None:
+        """Replace the cache, for example with one shared by a team."""
+        self._context_index.cache = value
+
     @property
     def resource_pool(self) -> "ResourcePool":
         """Get or create resource pool."""
@@ -567,6 +846,14 @@ class Agent:
         """Set resource pool."""
         self._resource_pool = value
 
+    @property
+    def executors(self) -> ExecutorRegistry:
+        """Get or create the registry of thread and process pool backends."""
+        if self._executors is None:
+            self._executors = ExecutorRegistry()
+            self._owns_executors = True
+        return self._executors
+
     @property
     def circuit_breaker(self) -> "CircuitBreaker":
         """Get or create circuit breaker."""
@@ -617,6 +904,7 @@ class Agent:
             old_value = self._agent_variables.get(key)
             self._agent_variables[key] = value
             self._trigger_variable_watchers(key, old_value, value)
+        self._notify_variable_change()
 
     def increment_variable(self, key: str, amount: Union[int, float] = 1) -> None:
         """Increment a numeric variable."""
@@ -639,7 +927,16 @@ class Agent:
         """Set shared variable accessible to all agents."""
         old_value = self.shared_state.get(key)
         self.shared_state[key] = value
+        self._context_index.observe(key, value)
         self._trigger_shared_variable_watchers(key, old_value, value)
+        self._notify_variable_change()
+
+    def update_shared_state(self, values: Mapping[str, Any]) -> None:
+        """Merge values into the shared state outside a state execution."""
+        self.shared_state.update(values)
+        for key, value in values.items():
+            self._context_index.observe(key, value)
+        self._notify_variable_change()
 
     def get_agent_variable(self, key: str, default: Any = None) -> Any:
         """Get agent-specific variable (not shared)."""
@@ -650,6 +947,54 @@ class Agent:
         old_value = self._agent_variables.get(key)
         self._agent_variables[key] = value
         self._trigger_variable_watchers(key, old_value, value)
+        self._notify_variable_change()
+
+    def _notify_variable_change(self) -> None:
+        """Wake every task waiting for this agent's variables to change."""
+        waiter = self._variable_waiter
+        if waiter is not None:
+            self._variable_waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_for_variable(
+        self, key: str, expected_value: Any, timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until a variable equals ``expected_value``.
+
+        The value is re-checked whenever a variable is set or a state
+        commits its writes, rather than on a polling interval.
+
+        Returns:
+            True if the value was reached, False on timeout. A timeout of
+            None or 0 waits indefinitely, or until the run's deadline while
+            the agent is running with a timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        remaining_budget = self._remaining_budget()
+        if remaining_budget is not None:
+            budget_deadline = time.monotonic() + remaining_budget
+            deadline = (
+                budget_deadline if deadline is None else min(deadline, budget_deadline)
+            )
+        while True:
+            if self.get_variable(key) == expected_value:
+                return True
+
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+
+            if self._variable_waiter is None:
+                self._variable_waiter = asyncio.get_running_loop().create_future()
+            # Shielded so a timeout does not cancel the future other
+            # waiters share
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    asyncio.shield(self._variable_waiter), timeout=remaining
+                )
 
     def get_persistent_variable(self, key: str, default: Any = None) -> Any:
         """Get persistent variable that survives restarts."""
@@ -918,16 +1263,16 @@ class Agent:
         if not other_agent:
             return False
 
-        start_time = time.time()
-        while True:
-            current_value = other_agent.get_variable(variable_name)
-            if current_value == expected_value:
-                return True
-
-            if timeout and (time.time() - start_time) > timeout:
-                return False
+        # Never wait past this agent's own deadline
+        remaining = self._remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                return bool(other_agent.get_variable(variable_name) == expected_value)
+            timeout = min(timeout, remaining) if timeout else remaining
 
-            await asyncio.sleep(0.1)
+        return await other_agent.wait_for_variable(
+            variable_name, expected_value, timeout=timeout
+        )
 
     def get_synced_variable(
         self, agent_name: str, variable_name: str, default: Any = None
@@ -941,17 +1286,71 @@ class Agent:
         return default
 
     # Context creation
-    def _create_context(self, shared_state: dict[str, Any]) -> Context:
+    def _create_context(self, shared_state: MutableMapping[str, Any]) -> Context:
         """Create enhanced context with agent variables."""
-        context = Context(shared_state)
+        if self._context_pool:
+            context = self._context_pool.pop()
+            context._reset(shared_state)
+        else:
+            context = Context(shared_state, index=self._context_index)
 
-        # Copy agent variables to context
-        for key, value in self._agent_variables.items():
-            context.set_variable(key, value)
+        # Copy agent variables to the base shared state, so a state's overlay
+        # does not count them among its writes
+        if self._agent_variables:
+            self._apply_agent_variables(shared_state)
 
         self._context = context
         return context
 
+    def _apply_agent_variables(self, shared_state: MutableMapping[str, Any]) -> None:
+        """Write agent variables whose shared state value differs."""
+        if isinstance(shared_state, SharedStateOverlay):
+            shared_state = shared_state.base
+        versions = self._state_versions
+        for key, value in self._agent_variables.items():
+            if key.startswith(Context._IMMUTABLE_PREFIXES):
+                raise ValueError(f"Cannot set variable with reserved prefix: {key}")
+            if key in shared_state and shared_state[key] is value:
+                continue
+            shared_state[key] = value
+            # States that wrote the key meanwhile see a conflicting commit
+            versions[key] = versions.get(key, 0) + 1
+            self._context_index.observe(key, value)
+
+    def _commit_overlay(self, state_name: str, overlay: SharedStateOverlay) -> None:
+        """Merge a state's writes into shared_state, checking for conflicts."""
+        conflicts = overlay.conflicts()
+        if conflicts:
+            self._write_conflicts += 1
+            if self.on_write_conflict == "fail":
+                overlay.discard()
+                raise WriteConflictError(state_name, conflicts)
+            logger.debug(
+                f"State {state_name} overwrote concurrently written keys: "
+                f"{conflicts}"
+            )
+        self._merge_overlay(overlay)
+
+    def _merge_overlay(self, overlay: SharedStateOverlay) -> None:
+        """Commit an overlay and record its writes in the context index."""
+        updates, removed = overlay.changes()
+        overlay.commit()
+        index = self._context_index
+        for key in removed:
+            index.forget(key)
+        for key, value in updates.items():
+            index.observe(key, value)
+        self._notify_variable_change()
+
+    def _release_context(self, context: Context) -> None:
+        """Return a finished state's context to the pool for reuse."""
+        if (
+            type(context) is Context
+            and context._index is self._context_index
+            and len(self._context_pool) < self.max_concurrent
+        ):
+            self._context_pool.append(context)
+
     def _apply_initial_context(self, initial_context: dict[str, Any]) -> None:
         """Apply initial context data with support for different data types."""
         if not self._context:
@@ -1032,9 +1431,27 @@ class Agent:
         retry_policy: Optional[RetryPolicy] = None,
         coordination_primitives: Optional[list["CoordinationPrimitive"]] = None,
         max_retries: Optional[int] = None,
+        executor: Optional[str] = None,
+        streaming: bool = False,
+        cache: Optional[Union[bool, CachePolicy]] = None,
+        checkpoint_interval: Optional[float] = None,
         **kwargs: Any,
     ) -> None:
-        """Add a state to the agent."""
+        """Add a state to the agent.
+
+        States whose function is an async generator stream the items they
+        yield. A dependent added with ``streaming=True`` starts as soon as
+        such a dependency starts and reads its items with
+        ``context.stream(name)``.
+
+        With ``cache=True`` (or a :class:`CachePolicy`) the state is skipped
+        when its code and inputs match a cached execution, and its recorded
+        writes and return value are replayed instead.
+
+        With ``checkpoint_interval`` (or ``checkpoint_every`` in a decorator)
+        a checkpoint is taken in the background after the state completes
+        whenever the last one is at least that many seconds old.
+        """
         # Validate state name
         if not name or not isinstance(name, str):
             raise ValueError("State name must be a non-empty string")
@@ -1053,6 +1470,8 @@ class Agent:
 
         self.states[name] = func
         self.dependencies[name] = dependencies
+        self._dependency_index.add_state(name, dependencies)
+        self._plan = None
 
         # Extract decorator requirements if available
         decorator_requirements = self._extract_decorator_requirements(func)
@@ -1085,93 +1504,139 @@ class Agent:
             retry_policy=retry_policy or self.retry_policy,
             coordination_primitives=coordination_primitives or [],
             max_retries=final_max_retries,
+            executor=executor or getattr(func, "_executor", None),
+            streaming=streaming or getattr(func, "_streaming", False),
+            cache=self._resolve_cache_policy(func, cache),
+            checkpoint_interval=(
+                checkpoint_interval
+                if checkpoint_interval is not None
+                else getattr(func, "_checkpoint_interval", None)
+            ),
         )
 
         self.state_metadata[name] = metadata
 
-    def _validate_workflow_configuration(self, execution_mode: ExecutionMode) -> None:
+    @staticmethod
+    def _resolve_cache_policy(
+        func: Callable, cache: Optional[Union[bool, CachePolicy]]
+    ) -> Optional[CachePolicy]:
+        """Combine the add_state cache argument with decorator settings."""
+        if cache is None:
+            return getattr(func, "_cache_policy", None)
+        if isinstance(cache, CachePolicy):
+            return cache
+        if cache:
+            return getattr(func, "_cache_policy", None) or CachePolicy()
+        return None
+
+    # Compiled plans
+    @classmethod
+    def from_plan(cls, name: str, plan: WorkflowPlan, **kwargs: Any) -> "Agent":
+        """Create an agent whose states come from a compiled plan.
+
+        The plan is shared by reference, so building many identical agents
+        skips per-state decorator extraction and graph validation.
+
+        Args:
+            name: Name of the new agent
+            plan: Plan compiled with :meth:`compile_plan` on a template agent
+            **kwargs: Other ``Agent`` constructor arguments
+        """
+        agent = cls(name, **kwargs)
+        agent.apply_plan(plan)
+        return agent
+
+    def apply_plan(self, plan: WorkflowPlan) -> None:
+        """Load states from a compiled plan into an agent without states."""
+        if self.states:
+            raise ValueError(
+                f"Cannot apply a plan to agent '{self.name}' which already has states"
+            )
+
+        for name, spec in plan.states.items():
+            self.states[name] = spec.func
+            self.dependencies[name] = list(spec.dependencies)
+        self.state_metadata = self._plan_metadata(plan)
+
+        self._plan = plan
+        self._dependency_index = plan.new_dependency_index()
+
+    def _plan_metadata(self, plan: WorkflowPlan) -> dict[str, StateMetadata]:
+        """Create pending metadata for every state of a plan."""
+        return {
+            name: StateMetadata(
+                status=StateStatus.PENDING,
+                priority=spec.priority,
+                resources=spec.resources,
+                retry_policy=spec.retry_policy or self.retry_policy,
+                coordination_primitives=list(spec.coordination_primitives),
+                max_retries=spec.max_retries,
+                executor=spec.executor,
+                streaming=spec.streaming,
+                cache=spec.cache,
+                checkpoint_interval=spec.checkpoint_interval,
+            )
+            for name, spec in plan.states.items()
+        }
+
+    def compile_plan(self) -> WorkflowPlan:
+        """Get the compiled plan for this agent's states, compiling if stale.
+
+        Raises:
+            ValueError: If the state dependencies form a cycle.
+        """
+        plan = self._plan
+        if plan is None or not plan.matches(self.states, self.dependencies):
+            plan = WorkflowPlan.compile(self)
+            self._plan = plan
+        return plan
+
+    def _validate_workflow_configuration(
+        self, execution_mode: ExecutionMode
+    ) -> WorkflowPlan:
         """Validate the overall workflow configuration before execution."""
         if not self.states:
             raise ValueError(
                 "No states defined. Agent must have at least one state to run."
             )
 
-        # Check for circular dependencies
-        self._check_circular_dependencies()
+        # Compiling the plan checks for circular dependencies
+        plan = self.compile_plan()
 
         # Validate execution mode configuration
         if execution_mode == ExecutionMode.SEQUENTIAL:
-            self._validate_sequential_mode()
+            self._validate_sequential_mode(plan)
         elif execution_mode == ExecutionMode.PARALLEL:
-            self._validate_parallel_mode()
+            self._validate_parallel_mode(plan)
+
+        return plan
 
     def _check_circular_dependencies(self) -> None:
         """Check for circular dependencies in the state graph."""
+        self.compile_plan()
 
-        def has_cycle(state: str, visited: set, rec_stack: set) -> bool:
-            visited.add(state)
-            rec_stack.add(state)
-
-            # Follow dependencies from this state
-            for dep in self.dependencies.get(state, []):
-                if dep not in self.states:
-                    # Skip non-existent dependencies
-                    continue
-                if dep not in visited:
-                    if has_cycle(dep, visited, rec_stack):
-                        return True
-                elif dep in rec_stack:
-                    # Found a back edge - cycle detected
-                    return True
-
-            rec_stack.remove(state)
-            return False
-
-        visited: set[str] = set()
-        for state in self.states:
-            if state not in visited and has_cycle(state, visited, set()):
-                raise ValueError(
-                    "Circular dependency detected in workflow. "
-                    "State dependencies form a cycle, which would prevent execution."
-                )
-
-    def _validate_sequential_mode(self) -> None:
+    def _validate_sequential_mode(self, plan: Optional[WorkflowPlan] = None) -> None:
         """Validate configuration for sequential execution mode."""
-        entry_states = self._find_entry_states()
+        plan = plan or self.compile_plan()
 
-        if not entry_states:
+        if not plan.entry_states:
             raise ValueError(
                 "Sequential execution mode requires at least one state without dependencies "
                 "to serve as an entry point. All states have dependencies, creating a deadlock."
             )
 
-        # Check if all states are reachable
-        reachable = set()
-        to_visit = entry_states.copy()
-
-        while to_visit:
-            current = to_visit.pop(0)
-            if current in reachable:
-                continue
-            reachable.add(current)
-
-            # Find states that depend on current state
-            for state, deps in self.dependencies.items():
-                if current in deps and state not in reachable:
-                    to_visit.append(state)
-
-        unreachable = set(self.states.keys()) - reachable
-        if unreachable:
+        if plan.sequential_unreachable:
             logger.warning(
-                f"States {unreachable} are unreachable in sequential mode. "
-                f"They have dependencies that will never be satisfied or lack proper transitions."
+                f"States {set(plan.sequential_unreachable)} are unreachable in "
+                f"sequential mode. They have dependencies that will never be "
+                f"satisfied or lack proper transitions."
             )
 
-    def _validate_parallel_mode(self) -> None:
+    def _validate_parallel_mode(self, plan: Optional[WorkflowPlan] = None) -> None:
         """Validate configuration for parallel execution mode."""
-        entry_states = self._find_entry_states()
+        plan = plan or self.compile_plan()
 
-        if not entry_states:
+        if not plan.entry_states:
             logger.warning(
                 "No entry states found for parallel mode. All states have dependencies. "
                 "This may prevent execution unless states return proper transitions."
@@ -1192,7 +1657,50 @@ class Agent:
     # Checkpointing
     def create_checkpoint(self) -> AgentCheckpoint:
         """Create a checkpoint of current agent state."""
-        return AgentCheckpoint.create_from_agent(self)
+        # Parked states are still queued; put them back so they are captured
+        self._unpark_all()
+        checkpoint = AgentCheckpoint.create_from_agent(self)
+
+        # Pending retries resume without their remaining backoff
+        import heapq
+
+        for _, state_name in self._retry_heap:
+            heapq.heappush(
+                checkpoint.priority_queue,
+                self._prioritized_state(
+                    state_name, checkpoint.state_metadata[state_name]
+                ),
+            )
+        for state_name in self._in_flight_states(checkpoint):
+            heapq.heappush(
+                checkpoint.priority_queue,
+                self._prioritized_state(
+                    state_name, checkpoint.state_metadata[state_name]
+                ),
+            )
+        return checkpoint
+
+    def _in_flight_states(
+        self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> list[str]:
+        """Turn a checkpoint's running states into pending ones.
+
+        Like :meth:`pause`, a checkpoint taken while states execute records
+        them as queued, so restoring it starts them over. States that
+        already completed once are not queued again. Returns the states to
+        queue; their captured metadata, if any, is marked pending.
+        """
+        requeued = [
+            state_name
+            for state_name in checkpoint.running_states
+            if state_name not in self.completed_once
+        ]
+        checkpoint.running_states = set()
+        for state_name in requeued:
+            metadata = checkpoint.state_metadata.get(state_name)
+            if metadata is not None:
+                metadata.status = StateStatus.PENDING
+        return requeued
 
     async def restore_from_checkpoint(self, checkpoint: AgentCheckpoint) -> None:
         """Restore agent from checkpoint."""
@@ -1204,24 +1712,137 @@ class Agent:
         self.completed_once = checkpoint.completed_once.copy()
         self.shared_state = checkpoint.shared_state.copy()
         self.session_start = checkpoint.session_start
+        self._rebuild_dependency_index()
+        if self.checkpointer is not None:
+            self.shared_state = DirtyTrackingDict(self.shared_state)
+            self.checkpointer.reset()
+
+    def _capture_checkpoint(self) -> Union[AgentCheckpoint, CheckpointDelta]:
+        """Capture a full checkpoint or, with a checkpointer, a delta."""
+        checkpointer = self.checkpointer
+        if checkpointer is None or checkpointer.needs_base(self):
+            checkpoint = self.create_checkpoint()
+            if checkpointer is not None:
+                checkpointer.start_base(self)
+            return checkpoint
+
+        self._unpark_all()
+        queue = [
+            (ps.priority, ps.timestamp, ps.state_name) for ps in self.priority_queue
+        ]
+        for _, state_name in self._retry_heap:
+            entry = self._prioritized_state(state_name, self.state_metadata[state_name])
+            queue.append((entry.priority, entry.timestamp, state_name))
+        delta = checkpointer.capture_delta(self, queue)
+        # The metadata of in-flight states is only in the delta if it changed
+        # since the previous checkpoint, which stored it as pending already
+        for state_name in self._in_flight_states(delta):
+            entry = self._prioritized_state(state_name, self.state_metadata[state_name])
+            delta.priority_queue.append((entry.priority, entry.timestamp, state_name))
+        return delta
+
+    async def _resolve_checkpoint(
+        self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> Optional[AgentCheckpoint]:
+        """Apply a delta checkpoint's chain to its base checkpoint."""
+        chain: list[CheckpointDelta] = []
+        loaded: Optional[Union[AgentCheckpoint, CheckpointDelta]] = checkpoint
+        while isinstance(loaded, CheckpointDelta):
+            chain.append(loaded)
+            loaded = await self.checkpoint_storage.load_checkpoint(
+                agent_name=self.name, checkpoint_id=loaded.parent_id
+            )
+        if loaded is None:
+            logger.warning(
+                f"Checkpoint chain of agent {self.name} is broken at "
+                f"{chain[-1].parent_id}"
+            )
+            return None
+        for delta in reversed(chain):
+            loaded = delta.apply(loaded)
+        return loaded
 
     async def save_checkpoint(self) -> str:
         """Save current state as checkpoint with persistent storage."""
-        checkpoint = self.create_checkpoint()
+        # Deltas must follow the checkpoint a background write is saving
+        await self._finish_checkpoint_writes()
+        return await self._store_checkpoint(self._capture_checkpoint())
 
+    async def _store_checkpoint(
+        self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> str:
+        """Save a captured checkpoint, recording the write latency."""
+        started = time.perf_counter()
         try:
             checkpoint_id = await self.checkpoint_storage.save_checkpoint(
                 agent_name=self.name, checkpoint=checkpoint
             )
+            if self.checkpointer is not None:
+                self.checkpointer.saved(checkpoint_id)
             logger.info(
                 f"Checkpoint saved for agent {self.name} with ID: {checkpoint_id}"
             )
             return checkpoint_id
 
         except Exception as e:
+            if self.checkpointer is not None:
+                self.checkpointer.reset()
+            self._checkpoint_failures += 1
             logger.error(f"Failed to save checkpoint for agent {self.name}: {e}")
             raise
 
+        finally:
+            self._checkpoint_latency.observe(time.perf_counter() - started)
+
+    # Background checkpoints
+    def _request_checkpoint(self) -> None:
+        """Capture a checkpoint now and save it in a background task.
+
+        Capturing copies the agent's state synchronously, so the checkpoint
+        is consistent; storage I/O runs while states keep executing. While
+        a write is in flight, requests are coalesced into one capture taken
+        when it finishes.
+        """
+        if self._checkpoint_write is not None and not self._checkpoint_write.done():
+            if self._checkpoint_pending:
+                self._checkpoints_coalesced += 1
+            self._checkpoint_pending = True
+            return
+        self._last_checkpoint = time.monotonic()
+        checkpoint = self._capture_checkpoint()
+        self._checkpoint_write = asyncio.get_running_loop().create_task(
+            self._write_checkpoint(checkpoint)
+        )
+
+    async def _write_checkpoint(
+        self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> None:
+        with contextlib.suppress(Exception):
+            await self._store_checkpoint(checkpoint)
+        self._checkpoint_write = None
+        if self._checkpoint_pending:
+            self._checkpoint_pending = False
+            self._request_checkpoint()
+
+    def _checkpoint_after_state(self, metadata: StateMetadata) -> None:
+        """Request a checkpoint if the state's checkpoint interval elapsed."""
+        interval = metadata.checkpoint_interval
+        if interval is None:
+            return
+        last = self._last_checkpoint
+        if last is None or time.monotonic() - last >= interval:
+            self._request_checkpoint()
+
+    async def _checkpoint_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self._request_checkpoint()
+
+    async def _finish_checkpoint_writes(self) -> None:
+        """Wait for background checkpoint writes, including coalesced ones."""
+        while self._checkpoint_write is not None:
+            await asyncio.shield(self._checkpoint_write)
+
     async def load_checkpoint(self, checkpoint_id: Optional[str] = None) -> bool:
         """
         Load agent state from a checkpoint.
@@ -1240,6 +1861,10 @@ class Agent:
             if checkpoint is None:
                 logger.warning(f"No checkpoint found for agent {self.name}")
                 return False
+            if isinstance(checkpoint, CheckpointDelta):
+                checkpoint = await self._resolve_checkpoint(checkpoint)
+                if checkpoint is None:
+                    return False
 
             await self.restore_from_checkpoint(checkpoint)
             logger.info(
@@ -1278,14 +1903,26 @@ class Agent:
 
     # Execution control
     async def pause(self) -> AgentCheckpoint:
-        """Pause agent execution and return checkpoint."""
+        """Pause agent execution and return checkpoint.
+
+        In-flight states are cancelled, releasing their resources, and queued
+        again so that the checkpoint and the next run start them over. Writes
+        they made before the interruption are kept.
+        """
         self.status = AgentStatus.PAUSED
+        interrupted = await self._interrupt_running_states()
+        for state_name in interrupted:
+            if state_name not in self.completed_once:
+                self.state_metadata[state_name].status = StateStatus.PENDING
+                self._enqueue(state_name)
+        self._wake()
         return self.create_checkpoint()
 
     async def resume(self) -> None:
         """Resume agent execution."""
         if self.status == AgentStatus.PAUSED:
             self.status = AgentStatus.RUNNING
+            self._wake()
 
     # Find entry states
     def _find_entry_states(self) -> list[str]:
@@ -1321,66 +1958,313 @@ class Agent:
             state_names = list(self.states.keys())
             return [state_names[0]] if state_names else []
 
+    def _rebuild_dependency_index(self) -> None:
+        """Rebuild the dependency index and queue bookkeeping from scratch."""
+        plan = self._plan
+        if (
+            plan is not None
+            and not self.completed_states
+            and plan.matches(self.states, self.dependencies)
+        ):
+            self._dependency_index = plan.new_dependency_index()
+        else:
+            self._dependency_index = DependencyIndex.build(
+                self.dependencies, self.completed_states
+            )
+        self._unpark_all()
+        self._queued = {ps.state_name for ps in self.priority_queue}
+
+    def _unpark_all(self) -> None:
+        """Move every parked state back onto the priority queue."""
+        if not self._parked:
+            return
+        import heapq
+
+        for prioritized_state in self._parked.values():
+            heapq.heappush(self.priority_queue, prioritized_state)
+        self._parked.clear()
+
     async def _check_dependent_states(self, completed_state: str) -> None:
-        """Check for states that depend on the completed state and queue them
-        if ready."""
-        for state_name, deps in self.dependencies.items():
-            # Skip if this state doesn't depend on the completed state
-            if completed_state not in deps:
-                continue
+        """Queue direct dependents of the completed state that are now ready."""
+        import heapq
 
+        for state_name in self._dependency_index.mark_completed(completed_state):
             # Skip if state is already completed or running
             if state_name in self.completed_once or state_name in self.running_states:
                 continue
 
-            # Skip if state is already in queue
-            if any(ps.state_name == state_name for ps in self.priority_queue):
+            # Consumers of a live stream start right away, see _open_stream
+            if self._consumes_open_stream(state_name):
+                if self._dependencies_met(state_name):
+                    self._start_stream_consumer(state_name)
+                continue
+
+            # A parked state was queued earlier and only waited on dependencies
+            parked = self._parked.pop(state_name, None)
+            if parked is not None:
+                heapq.heappush(self.priority_queue, parked)
+                self._wake()
                 continue
 
-            # Check if all dependencies are now satisfied
+            # Double-check against the dependency lists, which may have been
+            # edited after the index was built
             if await self._can_run(state_name):
                 await self._add_to_queue(state_name)
 
     async def _add_to_queue(self, state_name: str, priority_boost: int = 0) -> None:
         """Add state to priority queue."""
+        self._enqueue(state_name, priority_boost)
+
+    def _enqueue(self, state_name: str, priority_boost: int = 0) -> None:
+        """Push a state onto the priority queue unless it is already queued."""
         if state_name not in self.state_metadata:
             logger.error(f"State {state_name} not found in metadata")
             return
 
-        metadata = self.state_metadata[state_name]
-        priority_value = metadata.priority.value + priority_boost
+        if state_name in self._queued:
+            return
+
+        import heapq
 
-        prioritized_state = PrioritizedState(
-            priority=-priority_value,  # Negative for max-heap behavior
-            timestamp=time.time(),
-            state_name=state_name,
-            metadata=metadata,
+        heapq.heappush(
+            self.priority_queue,
+            self._prioritized_state(
+                state_name, self.state_metadata[state_name], priority_boost
+            ),
         )
+        self._queued.add(state_name)
+        if self._critical_ranks:
+            self._push_rank(state_name)
+        self._wake()
+
+    def _prioritized_state(
+        self, state_name: str, metadata: StateMetadata, priority_boost: int = 0
+    ) -> PrioritizedState:
+        """Create the priority queue entry for a state."""
+        return self.state_scheduler.entry(state_name, metadata, priority_boost)
+
+    def _schedule_retry(self, state_name: str, delay: float) -> None:
+        """Queue a failed state again once its backoff delay has passed."""
+        self._retries_scheduled += 1
+        if delay <= 0:
+            self._enqueue(state_name)
+            return
 
         import heapq
 
-        heapq.heappush(self.priority_queue, prioritized_state)
+        heapq.heappush(self._retry_heap, (time.monotonic() + delay, state_name))
+        self._retrying.add(state_name)
+        if self._critical_ranks:
+            self._push_rank(state_name)
+        self._wake()
+
+    def _release_due_retries(self) -> Optional[float]:
+        """Queue retries whose backoff has elapsed.
+
+        Returns:
+            Seconds until the next pending retry is due, or None if there is
+            no pending retry.
+        """
+        if not self._retry_heap:
+            return None
+
+        import heapq
+
+        now = time.monotonic()
+        while self._retry_heap and self._retry_heap[0][0] <= now:
+            _, state_name = heapq.heappop(self._retry_heap)
+            self._retrying.discard(state_name)
+            self._enqueue(state_name)
+        return self._retry_heap[0][0] - now if self._retry_heap else None
+
+    def _remaining_budget(self) -> Optional[float]:
+        """Seconds left before the run's deadline, or None without one."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.time())
+
+    def _capped_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        """Cap a wait at the remaining run budget."""
+        remaining = self._remaining_budget()
+        if remaining is None:
+            return timeout
+        return remaining if timeout is None else min(timeout, remaining)
 
-    async def _get_ready_states(self) -> list[str]:
-        """Get states that are ready to run."""
-        ready_states = []
+    def _remaining_critical_path(self) -> float:
+        """Estimate the seconds the outstanding states still need.
+
+        Running states are assumed to be about to finish, so only the work
+        after them counts; this keeps the estimate on the optimistic side.
+        """
+        ranks = self._critical_ranks
+        if not ranks:
+            return 0.0
+        import heapq
+
+        heap = self._rank_heap
+        queued = self._queued
+        retrying = self._retrying
+        while heap and heap[0][1] not in queued and heap[0][1] not in retrying:
+            heapq.heappop(heap)
+        outstanding = -heap[0][0] if heap else 0.0
+
+        # At most max_concurrent states run, so scanning them is cheap
+        estimator = self.duration_estimator
+        running = max(
+            (
+                ranks.get(name, 0.0) - estimator.estimate(name)
+                for name in self._running_tasks
+            ),
+            default=0.0,
+        )
+        return max(outstanding, running)
+
+    def _push_rank(self, state_name: str) -> None:
+        """Track the rank of a state that was queued or scheduled for retry."""
+        import heapq
+
+        heap = self._rank_heap
+        heapq.heappush(heap, (-self._critical_ranks.get(state_name, 0.0), state_name))
+        # Compact once dropped entries outnumber the outstanding states
+        if len(heap) > 2 * (len(self._queued) + len(self._retrying)) + 64:
+            self._reset_rank_heap()
+
+    def _reset_rank_heap(self) -> None:
+        """Rebuild the rank heap from the queued and retrying states."""
+        import heapq
+
+        ranks = self._critical_ranks
+        if not ranks:
+            self._rank_heap = []
+            return
+        self._rank_heap = [
+            (-ranks.get(name, 0.0), name) for name in self._queued | self._retrying
+        ]
+        heapq.heapify(self._rank_heap)
+
+    async def _get_ready_states(
+        self, limit: Optional[int] = None, critical_first: bool = False
+    ) -> list[str]:
+        """Get states that are ready to run.
+
+        Args:
+            limit: Maximum number of ready states to take off the queue. Ready
+                states beyond the limit stay queued for the next free slot.
+            critical_first: Fill the limit with the ready states that have
+                the longest estimated path to the end of the run, instead of
+                in queue order
+        """
+        ready: list[PrioritizedState] = []
+        picked: set[str] = set()
         temp_queue = []
 
         import heapq
 
         while self.priority_queue:
+            if limit is not None and not critical_first and len(ready) >= limit:
+                break
             state = heapq.heappop(self.priority_queue)
-            if await self._can_run(state.state_name):
-                ready_states.append(state.state_name)
-            # If it can't run, only put it back if it hasn't completed.
-            elif state.state_name not in self.completed_once:
+            state_name = state.state_name
+            if state_name in picked:
+                # Duplicate queue entry for a state already picked this pass
+                continue
+
+            if state_name in self.completed_once:
+                # Already done; drop the entry
+                self._queued.discard(state_name)
+            elif state_name in self.running_states or state_name in self._running_tasks:
                 temp_queue.append(state)
+            elif not self._dependencies_met(state_name):
+                # Park until the last dependency completes
+                self._parked[state_name] = state
+            else:
+                ready.append(state)
+                picked.add(state_name)
+
+        if limit is not None and len(ready) > limit:
+            # Stable sort, so equal ranks keep their queue order
+            ranks = self._critical_ranks
+            ready.sort(key=lambda entry: -ranks.get(entry.state_name, 0.0))
+            temp_queue.extend(ready[limit:])
+            ready = ready[:limit]
+
+        for state in ready:
+            self._queued.discard(state.state_name)
+            self.state_scheduler.on_dequeue(state)
+            if self.phase_timer is not None:
+                self.phase_timer.record(
+                    QUEUE_WAIT, int((time.time() - state.timestamp) * 1e9)
+                )
 
-        # Put non-ready states back
+        # Put states that are still running or were not picked back
         for state in temp_queue:
             heapq.heappush(self.priority_queue, state)
 
-        return ready_states
+        return [state.state_name for state in ready]
+
+    def _wake(self) -> None:
+        """Wake the run loop so it re-evaluates the queue."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _launch_state(self, state_name: str) -> "asyncio.Task[None]":
+        """Start a state as a task tracked by the run loop."""
+        existing = self._running_tasks.get(state_name)
+        if existing is not None and not existing.done():
+            return existing
+        task = asyncio.create_task(self.run_state(state_name))
+        self._running_tasks[state_name] = task
+        task.add_done_callback(functools.partial(self._on_state_task_done, state_name))
+        return task
+
+    def _on_state_task_done(self, state_name: str, task: "asyncio.Task[None]") -> None:
+        """Forget a finished state task and signal the run loop."""
+        if self._running_tasks.get(state_name) is task:
+            del self._running_tasks[state_name]
+        # An interrupted consumer must not keep its producer blocked
+        if (
+            task.cancelled()
+            and self._streams
+            and self.state_metadata[state_name].streaming
+        ):
+            self._detach_stream_consumer(state_name)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Unhandled error in state {state_name} of agent {self.name}: "
+                f"{task.exception()}"
+            )
+        self._wake()
+
+    async def _interrupt_running_states(self) -> list[str]:
+        """Cancel in-flight state tasks and wait until they have unwound.
+
+        Cancellation runs each state's cleanup, so its resources are back in
+        the pool when this returns. A state cancelling itself is interrupted
+        at its next await instead of being waited for.
+
+        Returns:
+            Names of the states that were interrupted.
+        """
+        tasks = {
+            name: task for name, task in self._running_tasks.items() if not task.done()
+        }
+        current = asyncio.current_task()
+        for task in tasks.values():
+            task.cancel()
+        others = [task for task in tasks.values() if task is not current]
+        if others:
+            await asyncio.gather(*others, return_exceptions=True)
+        return list(tasks)
+
+    async def _drain_running_tasks(self, cancel: bool = False) -> None:
+        """Wait for in-flight state tasks, optionally cancelling them first."""
+        tasks = list(self._running_tasks.values())
+        if not tasks:
+            return
+        if cancel:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     async def run_state(self, state_name: str) -> None:
         """Execute a single state."""
@@ -1400,51 +2284,145 @@ class Agent:
     ) -> None:
         """Execute state with circuit breaker protection."""
         try:
-            async with self.circuit_breaker.protect():
-                await self._execute_state_core(state_name, start_time)
+            if self._is_fast_path_state(state_name):
+                self._fast_path_executions += 1
+                await self._execute_state_core(state_name, start_time, fast_path=True)
+            else:
+                self._protected_executions += 1
+                timer = self.phase_timer
+                started = time.perf_counter_ns() if timer is not None else 0
+                async with self.circuit_breaker.protect():
+                    if timer is not None:
+                        timer.record(
+                            COORDINATION_ACQUIRE, time.perf_counter_ns() - started
+                        )
+                    await self._execute_state_core(state_name, start_time)
         except Exception as e:
             await self._handle_state_failure(state_name, e, start_time)
 
-    async def _execute_state_core(self, state_name: str, start_time: float) -> None:
+    def _is_fast_path_state(self, state_name: str) -> bool:
+        """Check whether a state can skip the resource pool and circuit breaker.
+
+        Only states asking for default resource amounts with no timeout, no
+        coordination primitives and no circuit breaker configuration qualify.
+        """
+        if not self.enable_fast_path or self._circuit_breaker_config is not None:
+            return False
+
+        metadata = self.state_metadata[state_name]
+        if metadata.coordination_primitives:
+            return False
+        if getattr(self.states[state_name], "_circuit_breaker_enabled", False):
+            return False
+
+        resources = metadata.resources
+        if resources is None:
+            return True
+        if _ResourceRequirements is None or not isinstance(
+            resources, _ResourceRequirements
+        ):
+            return False
+        return (
+            resources.timeout is None
+            and _resource_amounts(resources) == _DEFAULT_RESOURCE_AMOUNTS
+        )
+
+    async def _execute_state_core(
+        self, state_name: str, start_time: float, fast_path: bool = False
+    ) -> None:
         """Core state execution logic."""
         metadata = self.state_metadata[state_name]
+        timer = self.phase_timer
 
         # Get timeout from resources or default
         state_timeout = None
         if metadata.resources and hasattr(metadata.resources, "timeout"):
             state_timeout = metadata.resources.timeout
+        if self._deadline is not None:
+            state_timeout = self._capped_timeout(state_timeout)
 
         # Acquire resources (pass agent name for leak detection)
-        resources = metadata.resources
-        if resources is None and _ResourceRequirements is not None:
+        resources = None if fast_path else metadata.resources
+        if resources is None and not fast_path and _ResourceRequirements is not None:
             resources = _ResourceRequirements()
 
         # Only try to acquire resources if we have a valid ResourceRequirements object
         if resources is not None:
+            started = time.perf_counter_ns() if timer is not None else 0
             resource_acquired = await self.resource_pool.acquire(
                 state_name, resources, timeout=state_timeout, agent_name=self.name
             )
+            if timer is not None:
+                timer.record(RESOURCE_ACQUIRE, time.perf_counter_ns() - started)
 
             if not resource_acquired:
                 raise ResourceTimeoutError(
                     f"Failed to acquire resources for state {state_name}"
                 )
 
+        context: Optional[Context] = None
+        overlay = SharedStateOverlay(self.shared_state, self._state_versions)
         try:
-            # Execute the state function
-            context = self._create_context(self.shared_state)
-
-            # Execute with timeout if specified
-            if state_timeout:
-                result = await asyncio.wait_for(
-                    self.states[state_name](context), timeout=state_timeout
+            # Execute the state function against a private overlay. Agent-level
+            # accessors keep using the agent context and the base shared state.
+            agent_context = self._context
+            context = self._create_context(overlay)
+            self._context = agent_context
+            context.deadline = self._deadline
+            if metadata.streaming and self._streams:
+                context._streams = self._stream_readers(state_name)
+
+            func = self.states[state_name]
+            streaming = inspect.isasyncgenfunction(func)
+
+            # Cached states with unchanged code and inputs replay their effects
+            cache_key = cached = None
+            if metadata.cache is not None and not streaming:
+                cache_key = self.state_cache.make_key(
+                    state_name, func, overlay, metadata.cache.inputs
                 )
+                if cache_key is not None:
+                    cached = self.state_cache.get(cache_key, metadata.cache.ttl)
+
+            started = time.perf_counter_ns() if timer is not None else 0
+            if cached is not None:
+                result = self._replay_cached_effects(context, cached)
             else:
-                result = await self.states[state_name](context)
+                execution: Awaitable[StateResult]
+                if streaming:
+                    execution = self._run_streaming_state(state_name, context)
+                elif metadata.executor:
+                    execution = self._run_in_executor(state_name, context, metadata)
+                else:
+                    execution = func(context)
 
-            time.time() - start_time
+                # Execute with timeout if specified
+                if state_timeout is not None:
+                    result = await asyncio.wait_for(execution, timeout=state_timeout)
+                else:
+                    result = await execution
+            if timer is not None:
+                timer.record(BODY, time.perf_counter_ns() - started)
+
+            store_key = cache_key if cached is None else None
+            effects = overlay.changes() if store_key else None
+
+            # Publish the state's writes before dependents can be scheduled
+            if timer is not None:
+                started = time.perf_counter_ns()
+                self._commit_overlay(state_name, overlay)
+                timer.record(CONTEXT_MERGE, time.perf_counter_ns() - started)
+            else:
+                self._commit_overlay(state_name, overlay)
+            if store_key and effects is not None:
+                self.state_cache.put(store_key, result, *effects)
+            if metadata.streaming and self._streams:
+                self._detach_stream_consumer(state_name)
 
             # Update metadata on success
+            if timer is not None:
+                started = time.perf_counter_ns()
+            self.duration_estimator.observe(state_name, time.time() - start_time)
             metadata.status = StateStatus.COMPLETED
             metadata.last_execution = time.time()
             metadata.last_success = time.time()
@@ -1459,15 +2437,145 @@ class Agent:
 
             # Handle transitions/next states
             await self._handle_state_result(state_name, result)
-
-            # Update shared state from context
-            self.shared_state.update(context.shared_state)
+            if metadata.checkpoint_interval is not None:
+                self._checkpoint_after_state(metadata)
+            if timer is not None:
+                timer.record(RESULT_HANDLING, time.perf_counter_ns() - started)
 
         finally:
+            # Writes made before a failure stay visible, e.g. to retries
+            if not overlay.closed:
+                self._merge_overlay(overlay)
+            if context is not None:
+                self._release_context(context)
+
             # Always release resources if they were acquired
             if resources is not None:
                 await self.resource_pool.release(state_name)
 
+    def _replay_cached_effects(
+        self, context: Context, cached: tuple[Any, dict[str, Any], list[str]]
+    ) -> StateResult:
+        """Apply a cached execution's writes to a context and get its result."""
+        result: StateResult
+        result, updates, removed = cached
+        for key in removed:
+            context.shared_state.pop(key, None)
+            context._forget(key)
+        context.shared_state.update(updates)
+        for key, value in updates.items():
+            context._observe(key, value)
+        return result
+
+    async def _run_streaming_state(self, state_name: str, context: Context) -> None:
+        """Run an async generator state, publishing each item it yields.
+
+        Publishing waits while any consumer's queue is full, so a slow
+        consumer pauses the producer instead of letting items pile up.
+        """
+        stream = self._open_stream(state_name)
+        try:
+            async for item in self.states[state_name](context):
+                await stream.publish(item)
+        except BaseException as e:
+            stream.close(error=e)
+            raise
+        stream.close()
+        if not stream.consumers and self._streams.get(state_name) is stream:
+            del self._streams[state_name]
+
+    def _open_stream(self, state_name: str) -> StateStream:
+        """Open a stream for a producer and start its streaming consumers."""
+        previous = self._streams.get(state_name)
+        if previous is not None:
+            # A retry replaces the stream of the failed attempt
+            previous.close()
+
+        consumers = [
+            dependent
+            for dependent in self._dependency_index.dependents.get(state_name, ())
+            if self.state_metadata[dependent].streaming
+            and dependent not in self.completed_once
+        ]
+        stream = StateStream(state_name, consumers, self.stream_buffer_size)
+        self._streams[state_name] = stream
+
+        for consumer in consumers:
+            if consumer not in self.running_states and self._dependencies_met(consumer):
+                self._start_stream_consumer(consumer)
+        return stream
+
+    def _start_stream_consumer(self, state_name: str) -> None:
+        """Launch a consumer of a live stream without waiting for a slot.
+
+        The producer blocks once the consumer's queue is full, so holding the
+        consumer back until a slot frees up could deadlock the run.
+        """
+        if self._parked.pop(state_name, None) is not None:
+            self._queued.discard(state_name)
+        self._launch_state(state_name)
+
+    def _consumes_open_stream(self, state_name: str) -> bool:
+        """Check whether a state reads from a stream still being produced."""
+        if not self._streams or not self.state_metadata[state_name].streaming:
+            return False
+        for dep in self.dependencies.get(state_name, ()):
+            stream = self._streams.get(dep)
+            if (
+                stream is not None
+                and not stream.closed
+                and state_name in stream.consumers
+            ):
+                return True
+        return False
+
+    def _stream_readers(self, state_name: str) -> dict[str, StreamReader]:
+        """Get a consumer's readers for the streams of its dependencies."""
+        readers = {}
+        for dep in self.dependencies.get(state_name, ()):
+            stream = self._streams.get(dep)
+            if stream is not None and state_name in stream.consumers:
+                readers[dep] = stream.reader(state_name)
+        return readers
+
+    def _detach_stream_consumer(self, state_name: str) -> None:
+        """Stop feeding a finished consumer and drop streams nobody reads."""
+        for dep in self.dependencies.get(state_name, ()):
+            stream = self._streams.get(dep)
+            if stream is None:
+                continue
+            stream.detach(state_name)
+            if stream.closed and not stream.consumers:
+                del self._streams[dep]
+
+    async def _run_in_executor(
+        self, state_name: str, context: Context, metadata: StateMetadata
+    ) -> StateResult:
+        """Run a state in its thread or process pool and merge its changes.
+
+        The worker gets a snapshot of the shared state rather than the live
+        context, and only the keys it added, replaced or removed are applied
+        back, so concurrent states on the event loop are not overwritten.
+        """
+        executor = self.executors.get(metadata.executor or "")
+        snapshot = executor.snapshot(context.shared_state)
+
+        result: StateResult
+        result, updates, removed = await executor.run(
+            run_state_in_worker,
+            self.states[state_name],
+            snapshot,
+            slots=executor.slots_for(metadata.resources),
+        )
+
+        for key in removed:
+            context.shared_state.pop(key, None)
+            context._forget(key)
+        context.shared_state.update(updates)
+        for key, value in updates.items():
+            context._observe(key, value)
+        return result
+
     async def _handle_state_result(self, state_name: str, result: StateResult) -> None:
         """Handle the result of state execution."""
         if result is None:
@@ -1477,6 +2585,8 @@ class Agent:
             # Single next state
             if result in self.states and result not in self.completed_states:
                 await self._add_to_queue(result)
+        elif isinstance(result, tuple):
+            await self._hand_off(result)
         elif isinstance(result, list):
             # Multiple next states
             for next_state in result:
@@ -1487,10 +2597,34 @@ class Agent:
                 ):
                     await self._add_to_queue(next_state)
                 elif isinstance(next_state, tuple):
-                    # Handle agent transition: (agent, state)
-                    agent, state = next_state
-                    if hasattr(agent, "add_to_queue"):
-                        await agent._add_to_queue(state)
+                    await self._hand_off(next_state)
+
+    async def _hand_off(self, transition: tuple) -> None:
+        """Queue a state on another agent: ``(agent, state[, data])``."""
+        agent, state, *payload = transition
+        if isinstance(agent, Agent):
+            await agent.receive_handoff(state, payload[0] if payload else None)
+        elif hasattr(agent, "_add_to_queue"):
+            await agent._add_to_queue(state)
+        else:
+            logger.warning(f"Cannot hand off state {state} to {agent!r}")
+
+    async def receive_handoff(
+        self, state_name: str, data: Optional[dict[str, Any]] = None
+    ) -> None:
+        """Accept a state transition from another agent.
+
+        ``data`` is set as variables by reference, without copying, before
+        the state is queued. Queuing wakes this agent's run loop directly.
+        """
+        if state_name not in self.states:
+            logger.warning(
+                f"Agent {self.name} received handoff for unknown state {state_name}"
+            )
+            return
+        for key, value in (data or {}).items():
+            self.set_variable(key, value)
+        await self._add_to_queue(state_name)
 
     async def _handle_state_failure(
         self, state_name: str, error: Exception, start_time: float
@@ -1502,6 +2636,8 @@ class Agent:
         # Check if we've exceeded max retries
         if metadata.attempts >= metadata.max_retries:
             metadata.status = StateStatus.FAILED
+            if metadata.streaming and self._streams:
+                self._detach_stream_consumer(state_name)
 
             # Check for compensation state
             compensation_state = f"{state_name}_compensation"
@@ -1523,15 +2659,16 @@ class Agent:
                     attempts=metadata.attempts,
                     failed_at=time.time(),
                     timeout_occurred=isinstance(error, asyncio.TimeoutError),
-                    context_snapshot=dict(self.shared_state),
+                    context_snapshot=self.dead_letters.snapshot(self.shared_state),
                 )
                 self.dead_letters.append(dead_letter)
         else:
-            # Retry the state
+            # Retry the state after its backoff, without holding a slot
             metadata.status = StateStatus.PENDING
+            delay = 0.0
             if metadata.retry_policy:
-                await metadata.retry_policy.wait(metadata.attempts - 1)
-            await self._add_to_queue(state_name)
+                delay = metadata.retry_policy.get_delay(metadata.attempts - 1)
+            self._schedule_retry(state_name, delay)
 
     # Add alias for backward compatibility
     async def _handle_failure(
@@ -1552,19 +2689,40 @@ class Agent:
 
     async def _can_run(self, state_name: str) -> bool:
         """Check if a state can run."""
-        if state_name in self.running_states:
+        if state_name in self.running_states or state_name in self._running_tasks:
             return False
 
         if state_name in self.completed_once:
             return False
 
-        # Check dependencies
-        deps = self.dependencies.get(state_name, [])
-        return all(dep in self.completed_states for dep in deps)
+        return self._dependencies_met(state_name)
+
+    def _dependencies_met(self, state_name: str) -> bool:
+        """Check whether every dependency of a state is satisfied.
+
+        For streaming consumers a dependency that is still streaming counts
+        as satisfied, unless its stream failed.
+        """
+        deps = self.dependencies.get(state_name, ())
+        if not self._streams or not self.state_metadata[state_name].streaming:
+            return all(dep in self.completed_states for dep in deps)
+        return all(
+            dep in self.completed_states
+            or (dep in self._streams and not self._streams[dep].failed)
+            for dep in deps
+        )
 
     # State control
     def cancel_state(self, state_name: str) -> None:
-        """Cancel a running or queued state."""
+        """Cancel a running or queued state.
+
+        A running state is interrupted at its next await and releases its
+        resources as it unwinds.
+        """
+        task = self._running_tasks.get(state_name)
+        if task is not None and not task.done():
+            task.cancel()
+
         # Remove from queue
         import heapq
 
@@ -1572,6 +2730,13 @@ class Agent:
             s for s in self.priority_queue if s.state_name != state_name
         ]
         heapq.heapify(self.priority_queue)
+        self._parked.pop(state_name, None)
+        self._queued.discard(state_name)
+        self._retry_heap = [
+            entry for entry in self._retry_heap if entry[1] != state_name
+        ]
+        heapq.heapify(self._retry_heap)
+        self._retrying.discard(state_name)
 
         # Remove from running states
         self.running_states.discard(state_name)
@@ -1581,10 +2746,21 @@ class Agent:
             self.state_metadata[state_name].status = StateStatus.CANCELLED
 
     async def cancel_all(self) -> None:
-        """Cancel all running and queued states."""
+        """Cancel all running and queued states.
+
+        Running states are interrupted and have released their resources by
+        the time this returns.
+        """
         self.priority_queue.clear()
-        self.running_states.clear()
+        self._parked.clear()
+        self._queued.clear()
+        self._retry_heap.clear()
+        self._retrying.clear()
         self.status = AgentStatus.CANCELLED
+        for state_name in await self._interrupt_running_states():
+            self.state_metadata[state_name].status = StateStatus.CANCELLED
+        self.running_states.clear()
+        self._wake()
 
     # Information methods
     def get_resource_status(self) -> dict[str, Any]:
@@ -1616,21 +2792,23 @@ class Agent:
             "status": metadata.status if metadata else "unknown",
             "dependencies": self.dependencies.get(state_name, []),
             "has_decorator": has_decorator,
-            "in_queue": any(s.state_name == state_name for s in self.priority_queue),
+            "in_queue": state_name in self._queued,
             "running": state_name in self.running_states,
             "completed": state_name in self.completed_states,
         }
 
     def list_states(self) -> list[dict[str, Any]]:
         """List all states with their information."""
-        result = []
-        for name in self.states:
-            try:
-                from .decorators.inspection import is_puffinflow_state
+        try:
+            from .decorators.inspection import is_puffinflow_state
+        except ImportError:
+            is_puffinflow_state = None  # type: ignore[assignment]
 
-                has_decorator = is_puffinflow_state(self.states[name])
-            except ImportError:
-                has_decorator = False
+        result = []
+        for name, func in self.states.items():
+            has_decorator = bool(
+                is_puffinflow_state is not None and is_puffinflow_state(func)
+            )
 
             metadata = self.state_metadata.get(name)
             status = metadata.status if metadata is not None else "unknown"
@@ -1640,7 +2818,9 @@ class Agent:
                     "name": name,
                     "has_decorator": has_decorator,
                     "dependencies": self.dependencies.get(name, []),
+                    "dependents": list(self._dependency_index.dependents.get(name, [])),
                     "status": status,
+                    "in_queue": name in self._queued,
                 }
             )
         return result
@@ -1648,7 +2828,7 @@ class Agent:
     # Dead letter management
     def get_dead_letters(self) -> list[DeadLetter]:
         """Get all dead letters."""
-        return self.dead_letters.copy()
+        return list(self.dead_letters)
 
     def clear_dead_letters(self) -> None:
         """Clear all dead letters."""
@@ -1662,7 +2842,52 @@ class Agent:
 
     def get_dead_letters_by_state(self, state_name: str) -> list[DeadLetter]:
         """Get dead letters for a specific state."""
-        return [dl for dl in self.dead_letters if dl.state_name == state_name]
+        return self.dead_letters.query(state_name=state_name)
+
+    def query_dead_letters(
+        self,
+        state_name: Optional[str] = None,
+        error_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> list[DeadLetter]:
+        """Get dead letters by state, exception type name and failure time."""
+        return self.dead_letters.query(state_name, error_type, since, until)
+
+    def replay_dead_letters(
+        self,
+        state_name: Optional[str] = None,
+        error_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> list[str]:
+        """Queue the states of matching dead letters to run again.
+
+        Matching letters leave the dead letter queue and each of their states
+        is queued once with its attempts reset, however many letters it had.
+        Letters of running or unknown states stay in the queue. Replayed
+        states run in the current run, or in the next one if the agent is
+        not running.
+
+        Returns:
+            Names of the queued states, in order of their first failure.
+        """
+        replayed: dict[str, None] = {}
+        for letter in self.dead_letters.take(state_name, error_type, since, until):
+            name = letter.state_name
+            if name in replayed:
+                continue
+            metadata = self.state_metadata.get(name)
+            if metadata is None or name in self.running_states:
+                self.dead_letters.append(letter)
+                continue
+            metadata.status = StateStatus.PENDING
+            metadata.attempts = 0
+            self.completed_states.discard(name)
+            self.completed_once.discard(name)
+            self._enqueue(name)
+            replayed[name] = None
+        return list(replayed)
 
     # Circuit breaker control
     async def force_circuit_breaker_open(self) -> None:
@@ -1694,6 +2919,11 @@ class Agent:
             except Exception as e:
                 logger.error(f"Error in cleanup handler: {e}")
 
+        if self._owns_executors and self._executors is not None:
+            self._executors.shutdown(wait=False)
+            self._executors = None
+            self._owns_executors = False
+
     def _get_execution_metadata(self) -> dict[str, Any]:
         """Get execution metadata."""
         return {
@@ -1712,6 +2942,31 @@ class Agent:
             "resource_usage": self.get_resource_status(),
             "circuit_breaker_metrics": self.circuit_breaker.get_metrics(),
             "bulkhead_metrics": self.bulkhead.get_metrics(),
+            "fast_path_executions": self._fast_path_executions,
+            "protected_executions": self._protected_executions,
+            "write_conflicts": self._write_conflicts,
+            "retries_scheduled": self._retries_scheduled,
+            "pending_retries": len(self._retry_heap),
+            "queue_wait": self.state_scheduler.get_metrics(),
+            "state_cache": (
+                self._state_cache.get_metrics() if self._state_cache else {}
+            ),
+            "dead_letters": self.dead_letters.get_metrics(),
+            "context_cache": self.context_cache.get_metrics(),
+            "checkpoints": (
+                self.checkpointer.get_metrics() if self.checkpointer else {}
+            ),
+            "checkpoint_writes": {
+                "interval": self.checkpoint_interval,
+                "failures": self._checkpoint_failures,
+                "coalesced": self._checkpoints_coalesced,
+                "latency": self._checkpoint_latency.to_dict(),
+            },
+            "deadline_aborts": self._deadline_aborts,
+            "duration_estimates": self.duration_estimator.get_metrics(),
+            "phase_timings": (
+                self.phase_timer.to_dict() if self.phase_timer is not None else {}
+            ),
         }
 
     # Scheduling methods
@@ -1864,9 +3119,22 @@ class Agent:
         if self.session_start is None:
             self.session_start = start_time
 
+        periodic_checkpoints: Optional[asyncio.Task] = None
         try:
+            # Expire cached values in the background while the run lasts
+            self.context_cache.start_sweeper()
+
             # Validate workflow configuration before execution
-            self._validate_workflow_configuration(execution_mode)
+            plan = self._validate_workflow_configuration(execution_mode)
+            self._rebuild_dependency_index()
+            self._streams.clear()
+
+            # Track writes for delta checkpoints, also after the shared state
+            # was replaced
+            if self.checkpointer is not None and not isinstance(
+                self.shared_state, DirtyTrackingDict
+            ):
+                self.shared_state = DirtyTrackingDict(self.shared_state)
 
             # Create context with current shared state
             self._create_context(self.shared_state)
@@ -1875,49 +3143,112 @@ class Agent:
             if initial_context:
                 self._apply_initial_context(initial_context)
 
+            if self.checkpoint_interval:
+                self._last_checkpoint = time.monotonic()
+                periodic_checkpoints = asyncio.create_task(
+                    self._checkpoint_periodically(self.checkpoint_interval)
+                )
+
+            # Rank states by their estimated path to the end of the run for
+            # deadline handling and rank-based scheduling
+            if timeout:
+                self._deadline = start_time + timeout
+            if (
+                timeout or self.state_scheduler.uses_ranks
+            ) and self.duration_estimator.estimates:
+                self._critical_ranks = self.duration_estimator.upward_ranks(
+                    self.states,
+                    self._dependency_index.dependents,
+                    self.completed_once,
+                )
+            self._reset_rank_heap()
+            self.state_scheduler.prepare(self._critical_ranks)
+
             # Find entry states based on execution mode
-            entry_states = self._find_entry_states_by_mode(execution_mode)
+            entry_states = plan.entry_states_for(execution_mode)
 
             # Add entry states to queue
             for state_name in entry_states:
                 await self._add_to_queue(state_name)
 
-            # Main execution loop
+            # Main execution loop. States are launched as soon as they become
+            # ready, up to max_concurrent in flight; every completion or queue
+            # change wakes the loop instead of polling.
+            self._wakeup = asyncio.Event()
+            timed_out = False
             while self.status == AgentStatus.RUNNING:
-                if timeout and (time.time() - start_time) > timeout:
-                    logger.warning(
-                        f"Agent {self.name} timed out after {timeout} seconds."
-                    )
-                    self.status = AgentStatus.FAILED
-                    break
+                remaining = None
+                critical_first = False
+                if self._deadline is not None:
+                    remaining = self._deadline - time.time()
+                    if remaining <= 0:
+                        logger.warning(
+                            f"Agent {self.name} timed out after {timeout} seconds."
+                        )
+                        self.status = AgentStatus.FAILED
+                        timed_out = True
+                        break
+                    critical_path = self._remaining_critical_path()
+                    if self.early_abort and critical_path > remaining:
+                        logger.warning(
+                            f"Agent {self.name} aborted: estimated critical path "
+                            f"of {critical_path:.3f}s exceeds the remaining "
+                            f"budget of {remaining:.3f}s."
+                        )
+                        self._deadline_aborts += 1
+                        self.status = AgentStatus.FAILED
+                        timed_out = True
+                        break
+                    # Near the deadline, free slots go to the critical path
+                    critical_first = critical_path * 2 >= remaining
 
                 # Stop if there's nothing left to do
-                if not self.priority_queue and not self.running_states:
+                if (
+                    not self.priority_queue
+                    and not self._parked
+                    and not self._running_tasks
+                    and not self._retry_heap
+                ):
                     break
 
-                ready_states = await self._get_ready_states()
-
-                if ready_states:
-                    tasks = []
-                    for state_name in ready_states[: self.max_concurrent]:
-                        task = asyncio.create_task(self.run_state(state_name))
-                        tasks.append(task)
-
-                    if tasks:
-                        await asyncio.gather(*tasks, return_exceptions=True)
+                self._wakeup.clear()
+                next_retry = self._release_due_retries()
+                free_slots = self.max_concurrent - len(self._running_tasks)
+                if free_slots > 0:
+                    for state_name in await self._get_ready_states(
+                        limit=free_slots, critical_first=critical_first
+                    ):
+                        self._launch_state(state_name)
+
+                if not self._running_tasks and next_retry is None:
+                    if self.priority_queue or self._parked:
+                        # States are in queue but none can run, and nothing is
+                        # running. This indicates a deadlock or unmeetable
+                        # dependencies.
+                        logger.warning(
+                            f"Deadlock in agent {self.name}: States in queue but "
+                            f"none can run."
+                        )
+                        self.status = AgentStatus.FAILED
+                        break
+                    continue
 
-                elif self.priority_queue and not self.running_states:
-                    # States are in queue but none can run, and nothing is running
-                    # This indicates a deadlock or unmeetable dependencies
-                    logger.warning(
-                        f"Deadlock in agent {self.name}: States in queue but none "
-                        f"can run."
+                # Sleep until a state finishes, new work is queued or the
+                # next retry is due
+                if next_retry is not None:
+                    remaining = (
+                        next_retry if remaining is None else min(remaining, next_retry)
                     )
-                    self.status = AgentStatus.FAILED
-                    break
+                if remaining is None:
+                    await self._wakeup.wait()
                 else:
-                    # No states ready, but some are running. Wait for them.
-                    await asyncio.sleep(0.01)  # Short sleep to yield control
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+
+            await self._drain_running_tasks(cancel=timed_out)
+            if periodic_checkpoints is not None:
+                periodic_checkpoints.cancel()
+            await self._finish_checkpoint_writes()
 
             # Determine final status
             if self.status == AgentStatus.RUNNING:
@@ -1952,8 +3283,15 @@ class Agent:
 
             return result
 
+        except asyncio.CancelledError:
+            # Don't leave state tasks running behind a cancelled run
+            self.status = AgentStatus.CANCELLED
+            await self._drain_running_tasks(cancel=True)
+            raise
+
         except Exception as e:
             self.status = AgentStatus.FAILED
+            await self._drain_running_tasks(cancel=True)
             end_time = time.time()
 
             return AgentResult(
@@ -1965,9 +3303,174 @@ class Agent:
                 execution_duration=end_time - start_time,
             )
 
+        finally:
+            if periodic_checkpoints is not None:
+                periodic_checkpoints.cancel()
+            self.context_cache.stop_sweeper()
+            self._deadline = None
+            self._critical_ranks = {}
+            self._rank_heap = []
+
+    # Batch execution
+    def _spawn_run_agent(self, plan: WorkflowPlan, index: int) -> "Agent":
+        """Create an isolated per-run agent that shares this agent's engine."""
+        run_agent = Agent.from_plan(
+            f"{self.name}[{index}]",
+            plan,
+            resource_pool=self.resource_pool,
+            retry_policy=self.retry_policy,
+            max_concurrent=self.max_concurrent,
+            enable_dead_letter=self.enable_dead_letter,
+            state_timeout=self.state_timeout,
+            checkpoint_storage=self.checkpoint_storage,
+            checkpoint_interval=self.checkpoint_interval or 0,
+            executors=self.executors,
+            enable_fast_path=self.enable_fast_path,
+            on_write_conflict=self.on_write_conflict,
+            stream_buffer_size=self.stream_buffer_size,
+            scheduling_policy=self.state_scheduler.spawn(),
+            state_cache=self.state_cache,
+            early_abort=self.early_abort,
+        )
+        run_agent.phase_timer = self.phase_timer
+        run_agent.duration_estimator = self.duration_estimator
+        # Share reliability components so failures count across the batch
+        run_agent._circuit_breaker = self.circuit_breaker
+        run_agent._bulkhead = self.bulkhead
+        run_agent._agent_variables = dict(self._agent_variables)
+        return run_agent
+
+    def _reuse_run_agent(
+        self, run_agent: "Agent", plan: WorkflowPlan, index: int
+    ) -> "Agent":
+        """Reset a finished per-run agent for the next run of a batch.
+
+        Everything a run writes is replaced rather than cleared, so results
+        of earlier runs keep their own context, outputs and metadata.
+        """
+        run_agent.name = f"{self.name}[{index}]"
+        run_agent.status = AgentStatus.IDLE
+        run_agent.session_start = None
+        run_agent.state_metadata = run_agent._plan_metadata(plan)
+        run_agent.shared_state = {}
+        run_agent.priority_queue = []
+        run_agent.running_states = set()
+        run_agent.completed_states = set()
+        run_agent.completed_once = set()
+        run_agent.dead_letters = DeadLetterQueue()
+        run_agent._queued = set()
+        run_agent._parked = {}
+        run_agent._retry_heap = []
+        run_agent._retrying = set()
+        run_agent._retries_scheduled = 0
+        run_agent._deadline_aborts = 0
+        run_agent.state_scheduler = self.state_scheduler.spawn()
+        run_agent._last_checkpoint = None
+        run_agent._checkpoint_latency = QueueWaitHistogram()
+        run_agent._checkpoint_failures = 0
+        run_agent._checkpoints_coalesced = 0
+        run_agent._fast_path_executions = 0
+        run_agent._protected_executions = 0
+        run_agent._state_versions = {}
+        run_agent._write_conflicts = 0
+        run_agent._streams = {}
+        # Contexts of earlier runs stay bound to their own index and cache
+        run_agent._context_index = ContextIndex()
+        run_agent._context_pool = []
+        run_agent._agent_variables = dict(self._agent_variables)
+        run_agent.context = run_agent._create_context(run_agent.shared_state)
+        return run_agent
+
+    async def run_many(
+        self,
+        inputs: Iterable[Optional[dict[str, Any]]],
+        concurrency: int = 10,
+        timeout: Optional[float] = None,
+        execution_mode: ExecutionMode = ExecutionMode.SEQUENTIAL,
+    ) -> AsyncGenerator[AgentResult, None]:
+        """
+        Run this agent's workflow once per input, streaming results.
+
+        Every run is isolated, with its own queue, completion sets and shared
+        state, but all runs share this agent's compiled plan, resource pool,
+        circuit breaker and bulkhead. Inputs are consumed lazily, so at most
+        ``concurrency`` runs are in flight at once.
+
+        Args:
+            inputs: Initial context for each run, in the same formats accepted
+                by ``run(initial_context=...)``
+            concurrency: Maximum number of runs executing at the same time
+            timeout: Optional timeout in seconds for each run
+            execution_mode: Execution mode used for every run
+
+        Yields:
+            AgentResult for each run in completion order. The position of the
+            input is available as ``result.metadata["run_index"]``.
+
+        Example:
+            async for result in agent.run_many(records, concurrency=50):
+                print(result.get_metadata("run_index"), result.status)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        plan = self._validate_workflow_configuration(execution_mode)
+        pending_inputs = iter(enumerate(inputs))
+        results: asyncio.Queue[Optional[AgentResult]] = asyncio.Queue()
+
+        async def worker() -> None:
+            # Each worker reuses one per-run agent for all of its runs
+            run_agent: Optional[Agent] = None
+            try:
+                # Workers pull from one shared iterator, so input order is kept
+                for index, initial_context in pending_inputs:
+                    start_time = time.time()
+                    try:
+                        if run_agent is None:
+                            run_agent = self._spawn_run_agent(plan, index)
+                        else:
+                            self._reuse_run_agent(run_agent, plan, index)
+                        result = await run_agent.run(
+                            timeout=timeout,
+                            initial_context=initial_context,
+                            execution_mode=execution_mode,
+                        )
+                    except Exception as e:
+                        # Start the next run from a fresh agent
+                        run_agent = None
+                        end_time = time.time()
+                        result = AgentResult(
+                            agent_name=f"{self.name}[{index}]",
+                            status=AgentStatus.FAILED,
+                            error=e,
+                            start_time=start_time,
+                            end_time=end_time,
+                            execution_duration=end_time - start_time,
+                        )
+                    result.metadata["run_index"] = index
+                    await results.put(result)
+            finally:
+                await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        remaining_workers = len(workers)
+        try:
+            while remaining_workers:
+                result = await results.get()
+                if result is None:
+                    remaining_workers -= 1
+                    continue
+                yield result
+        finally:
+            # Stop outstanding runs if the consumer stops iterating early
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
     def __del__(self) -> None:
         """Cleanup on deletion."""
-        if self._cleanup_handlers:
+        # Construction may have failed before the handlers were set up
+        if getattr(self, "_cleanup_handlers", None):
             try:
                 loop = asyncio.get_event_loop()
                 if loop.is_running():
@@ -48,3 +48,269 @@ class AgentCheckpoint:
             shared_state=deepcopy(agent.shared_state),
             session_start=session_start,
         )
+
+
+class DirtyTrackingDict(dict):
+    """Shared state dictionary that records the keys changed since a reset.
+
+    Writes and deletions through the dictionary API are tracked; values
+    mutated in place are not, so reassign a key after changing its value
+    when using delta checkpoints. Copies and pickles are plain dicts.
+    """
+
+    __slots__ = ("dirty", "removed")
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.dirty: set[str] = set()
+        self.removed: set[str] = set()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return dict, (dict(self),)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+        self.removed.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.dirty.discard(key)
+        self.removed.add(key)
+
+    def __ior__(self, other: Any) -> "DirtyTrackingDict":  # type: ignore[misc]
+        self.update(other)
+        return self
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self:
+            self.dirty.discard(key)
+            self.removed.add(key)
+        return super().pop(key, *default)
+
+    def popitem(self) -> tuple[str, Any]:
+        key, value = super().popitem()
+        self.dirty.discard(key)
+        self.removed.add(key)
+        return key, value
+
+    def clear(self) -> None:
+        self.removed.update(self)
+        self.dirty.clear()
+        super().clear()
+
+    def reset_tracking(self) -> None:
+        """Forget the recorded changes."""
+        self.dirty.clear()
+        self.removed.clear()
+
+
+@dataclass
+class CheckpointDelta:
+    """Changes of an agent since its previous checkpoint.
+
+    A delta stores the shared state keys written and removed, the state
+    metadata that changed and the small scheduling sets in full. Queue
+    entries refer to states by name and are linked to the restored
+    metadata. Applying every delta after a base :class:`AgentCheckpoint`
+    in order rebuilds the full checkpoint.
+    """
+
+    timestamp: float
+    agent_name: str
+    parent_id: str
+    agent_status: "AgentStatus"
+    priority_queue: list[tuple[float, float, str]]
+    state_metadata: dict[str, "StateMetadata"]
+    removed_states: set[str]
+    running_states: set[str]
+    completed_states: set[str]
+    completed_once: set[str]
+    shared_state_updates: dict[str, Any]
+    shared_state_removed: set[str]
+    session_start: Optional[float]
+
+    def apply(self, checkpoint: AgentCheckpoint) -> AgentCheckpoint:
+        """Get the checkpoint that results from applying this delta."""
+        from .state import PrioritizedState
+
+        shared_state = dict(checkpoint.shared_state)
+        for key in self.shared_state_removed:
+            shared_state.pop(key, None)
+        shared_state.update(self.shared_state_updates)
+
+        state_metadata = dict(checkpoint.state_metadata)
+        for name in self.removed_states:
+            state_metadata.pop(name, None)
+        state_metadata.update(self.state_metadata)
+
+        return AgentCheckpoint(
+            timestamp=self.timestamp,
+            agent_name=self.agent_name,
+            agent_status=self.agent_status,
+            priority_queue=[
+                PrioritizedState(priority, timestamp, name, state_metadata[name])
+                for priority, timestamp, name in self.priority_queue
+                if name in state_metadata
+            ],
+            state_metadata=state_metadata,
+            running_states=set(self.running_states),
+            completed_states=set(self.completed_states),
+            completed_once=set(self.completed_once),
+            shared_state=shared_state,
+            session_start=self.session_start,
+        )
+
+
+def _metadata_fingerprint(metadata: "StateMetadata") -> tuple:
+    """The fields of a state's metadata that change while an agent runs."""
+    return (
+        metadata.status,
+        metadata.attempts,
+        metadata.last_execution,
+        metadata.last_success,
+        metadata.state_id,
+        frozenset(metadata.satisfied_dependencies),
+    )
+
+
+class DeltaCheckpointer:
+    """Decides between full and delta checkpoints for one agent.
+
+    The first checkpoint is a full base. Later ones are deltas holding the
+    shared state keys the agent's :class:`DirtyTrackingDict` recorded and
+    the state metadata whose runtime fields changed, chained to the
+    checkpoint saved before them. After ``compact_every`` deltas, or once
+    the keys changed since the base exceed ``compact_ratio`` of the shared
+    state, the chain is folded into a new base, which bounds both restore
+    time and chain length.
+    """
+
+    def __init__(self, compact_every: int = 16, compact_ratio: float = 0.5) -> None:
+        if compact_every < 1:
+            raise ValueError(
+                f"Invalid compact_every: {compact_every}. Must be at least 1"
+            )
+        if compact_ratio <= 0:
+            raise ValueError(
+                f"Invalid compact_ratio: {compact_ratio}. Must be positive"
+            )
+        self.compact_every = compact_every
+        self.compact_ratio = compact_ratio
+
+        # ID of the last saved checkpoint, the parent of the next delta
+        self._parent_id: Optional[str] = None
+        # Shared state whose changes are being tracked
+        self._tracked: Optional[DirtyTrackingDict] = None
+        self._fingerprints: dict[str, tuple] = {}
+        self._deltas = 0
+        self._changed_keys = 0
+
+        self.bases = 0
+        self.deltas = 0
+
+    def needs_base(self, agent: "Agent") -> bool:
+        """Whether the next checkpoint of the agent must be a full base."""
+        shared_state = agent.shared_state
+        if self._parent_id is None or shared_state is not self._tracked:
+            return True
+        changed = (
+            self._changed_keys + len(shared_state.dirty) + len(shared_state.removed)
+        )
+        return self._deltas >= self.compact_every or changed > self.compact_ratio * max(
+            1, len(shared_state)
+        )
+
+    def start_base(self, agent: "Agent") -> None:
+        """Start tracking changes from a full checkpoint just captured."""
+        shared_state = agent.shared_state
+        if isinstance(shared_state, DirtyTrackingDict):
+            shared_state.reset_tracking()
+            self._tracked = shared_state
+        else:
+            self._tracked = None
+        self._fingerprints = {
+            name: _metadata_fingerprint(metadata)
+            for name, metadata in agent.state_metadata.items()
+        }
+        self._parent_id = None
+        self._deltas = 0
+        self._changed_keys = 0
+        self.bases += 1
+
+    def capture_delta(
+        self, agent: "Agent", queue: list[tuple[float, float, str]]
+    ) -> CheckpointDelta:
+        """Capture the agent's changes since the previous checkpoint.
+
+        Args:
+            agent: Agent whose ``shared_state`` is a DirtyTrackingDict
+            queue: ``(priority, timestamp, state_name)`` of every queued state
+        """
+        from copy import deepcopy
+
+        assert self._parent_id is not None
+        shared_state = agent.shared_state
+        assert isinstance(shared_state, DirtyTrackingDict)
+
+        changed_metadata = {}
+        for name, metadata in agent.state_metadata.items():
+            fingerprint = _metadata_fingerprint(metadata)
+            if self._fingerprints.get(name) != fingerprint:
+                self._fingerprints[name] = fingerprint
+                changed_metadata[name] = metadata
+        removed_states = set(self._fingerprints) - set(agent.state_metadata)
+        for name in removed_states:
+            del self._fingerprints[name]
+
+        # One deepcopy call keeps values that share objects consistent
+        updates, changed_metadata = deepcopy(
+            ({key: shared_state[key] for key in shared_state.dirty}, changed_metadata)
+        )
+        removed = set(shared_state.removed)
+        shared_state.reset_tracking()
+        self._deltas += 1
+        self._changed_keys += len(updates) + len(removed)
+        self.deltas += 1
+
+        return CheckpointDelta(
+            timestamp=time.time(),
+            agent_name=agent.name,
+            parent_id=self._parent_id,
+            agent_status=agent.status,
+            priority_queue=queue,
+            state_metadata=changed_metadata,
+            removed_states=removed_states,
+            running_states=set(agent.running_states),
+            completed_states=set(agent.completed_states),
+            completed_once=set(agent.completed_once),
+            shared_state_updates=updates,
+            shared_state_removed=removed,
+            session_start=agent.session_start,
+        )
+
+    def saved(self, checkpoint_id: str) -> None:
+        """Record the ID a captured checkpoint was saved under."""
+        self._parent_id = checkpoint_id
+
+    def reset(self) -> None:
+        """Make the next checkpoint a full base, e.g. after a failed save."""
+        self._parent_id = None
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get the numbers of bases and deltas captured."""
+        return {
+            "bases": self.bases,
+            "deltas": self.deltas,
+            "deltas_since_base": self._deltas,
+            "keys_changed_since_base": self._changed_keys,
+        }
@@ -0,0 +1,1156 @@
+"""Versioned binary codec for agent checkpoints."""
+
+import datetime
+import decimal
+import functools
+import operator
+import pickle
+import struct
+import uuid
+import zlib
+from dataclasses import MISSING
+from dataclasses import fields as dataclass_fields
+from enum import Enum
+from typing import Any, Callable, Optional, Union
+
+from .checkpoint import AgentCheckpoint, CheckpointDelta
+from .state import (
+    AgentStatus,
+    CachePolicy,
+    ExecutionMode,
+    PrioritizedState,
+    Priority,
+    RetryPolicy,
+    StateMetadata,
+    StateStatus,
+)
+
+try:
+    from ..resources.requirements import ResourceRequirements, ResourceType
+
+    _RESOURCES_AVAILABLE = True
+except ImportError:
+    _RESOURCES_AVAILABLE = False
+
+try:
+    import zoneinfo
+
+    _ZONEINFO_AVAILABLE = True
+except ImportError:
+    _ZONEINFO_AVAILABLE = False
+
+try:
+    import zstandard
+
+    _ZSTD_AVAILABLE = True
+except ImportError:
+    _ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+
+    _LZ4_AVAILABLE = True
+except ImportError:
+    _LZ4_AVAILABLE = False
+
+VERSION = 1
+MAGIC = b"PFCK"
+
+# magic, version, compression, checkpoint kind
+_HEADER = struct.Struct("<4sBBB")
+_FULL = 0
+_DELTA = 1
+
+_COMPRESSION_CODES = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_COMPRESSION_NAMES = {code: name for name, code in _COMPRESSION_CODES.items()}
+
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_OPTIONAL_F64 = struct.Struct("<Bd")
+# year, month, day, hour, minute, second, microsecond, fold
+_DATETIME_FIELDS = struct.Struct("<HBBBBBIB")
+_DATE_FIELDS = struct.Struct("<HBB")
+# hour, minute, second, microsecond, fold
+_TIME_FIELDS = struct.Struct("<BBBIB")
+# days, seconds, microseconds
+_TIMEDELTA_FIELDS = struct.Struct("<iII")
+
+# Fixed part of a StateMetadata record: status, priority, attempts,
+# max_retries, flags, last_execution, last_success and the number of
+# satisfied dependencies
+_METADATA = "BBIIHddI"
+_METADATA_FIELDS = 8
+_HAS_LAST_EXECUTION = 1
+_HAS_LAST_SUCCESS = 2
+_STREAMING = 4
+_HAS_EXECUTOR = 8
+_HAS_CHECKPOINT_INTERVAL = 16
+_DEFAULT_RESOURCES = 32
+_HAS_RESOURCES = 64
+_HAS_RETRY_POLICY = 128
+_HAS_CACHE = 256
+_HAS_COORDINATION = 512
+_HAS_DEPENDENCIES = 1024
+_DEFAULT_RETRY_POLICY = 2048
+# Metadata fields written after the packed sections
+_EXTRA_FIELDS = (
+    _HAS_EXECUTOR
+    | _HAS_CHECKPOINT_INTERVAL
+    | _HAS_RESOURCES
+    | _HAS_RETRY_POLICY
+    | _HAS_CACHE
+    | _HAS_COORDINATION
+    | _HAS_DEPENDENCIES
+)
+
+# Value tags. Tags from 0x80 hold the integers 0 to 127 themselves.
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_BIGINT = 4
+_FLOAT = 5
+_STR = 6
+_STR8 = 7
+_BYTES = 8
+_LIST = 9
+_TUPLE = 10
+_DICT = 11
+_SET = 12
+_FROZENSET = 13
+_ENUM = 14
+_RECORD = 15
+_PICKLE = 16
+_DATETIME = 17
+_DATE = 18
+_TIME = 19
+_TIMEDELTA = 20
+_TIMEZONE = 21
+_ZONEINFO = 22
+_DECIMAL = 23
+_UUID = 24
+# Dict keys seen before, by the order they first appeared
+_KEY8 = 25
+_KEY = 26
+_FIXINT = 0x80
+
+# Enums by code, with the member values of string enums in code order.
+# Codes and orders are part of the format: only append to these tables.
+_STR_ENUMS: dict[int, tuple[type[Enum], tuple[str, ...]]] = {
+    1: (
+        AgentStatus,
+        ("idle", "running", "paused", "completed", "failed", "cancelled"),
+    ),
+    2: (
+        StateStatus,
+        (
+            "pending",
+            "ready",
+            "running",
+            "completed",
+            "failed",
+            "cancelled",
+            "blocked",
+            "timeout",
+            "retrying",
+        ),
+    ),
+    4: (ExecutionMode, ("parallel", "sequential")),
+}
+_INT_ENUMS: dict[int, type[Enum]] = {3: Priority}
+
+# Dataclasses by code, with their fields in encoding order
+_RECORDS: dict[int, tuple[type, tuple[str, ...]]] = {
+    1: (
+        RetryPolicy,
+        (
+            "max_retries",
+            "initial_delay",
+            "exponential_base",
+            "jitter",
+            "dead_letter_on_max_retries",
+            "dead_letter_on_timeout",
+        ),
+    ),
+    2: (CachePolicy, ("inputs", "ttl")),
+}
+
+if _RESOURCES_AVAILABLE:
+    _INT_ENUMS[5] = ResourceType
+    _RECORDS[3] = (
+        ResourceRequirements,
+        (
+            "cpu_units",
+            "memory_mb",
+            "io_weight",
+            "network_weight",
+            "gpu_units",
+            "priority_boost",
+            "timeout",
+            "resource_types",
+        ),
+    )
+
+_ENUM_CODES: dict[type, tuple[int, Optional[dict[Any, int]]]] = {
+    cls: (code, {value: index for index, value in enumerate(values)})
+    for code, (cls, values) in _STR_ENUMS.items()
+}
+_ENUM_CODES.update({cls: (code, None) for code, cls in _INT_ENUMS.items()})
+_RECORD_CODES = {cls: (code, fields) for code, (cls, fields) in _RECORDS.items()}
+
+
+def _field_defaults(cls: type, fields: tuple[str, ...]) -> tuple[Any, ...]:
+    """Get the default of each encoded field, MISSING for required ones."""
+    defaults = {}
+    for field in dataclass_fields(cls):
+        if field.default is not MISSING:
+            defaults[field.name] = field.default
+        elif field.default_factory is not MISSING:
+            defaults[field.name] = field.default_factory()
+    return tuple(defaults.get(field_name, MISSING) for field_name in fields)
+
+
+# Trailing fields left at their defaults are not written
+_RECORD_DEFAULTS = {
+    cls: _field_defaults(cls, fields) for cls, (_, fields) in _RECORD_CODES.items()
+}
+_RECORD_DEFAULT_TYPES = {
+    cls: tuple(map(type, defaults)) for cls, defaults in _RECORD_DEFAULTS.items()
+}
+_RECORD_GETTERS = {
+    cls: operator.attrgetter(*fields) for cls, (_, fields) in _RECORD_CODES.items()
+}
+_RECORD_STATES = {
+    cls: dict(zip(fields, _RECORD_DEFAULTS[cls]))
+    for cls, (_, fields) in _RECORD_CODES.items()
+}
+
+# String enums hash like their values, so plain strings find their codes too
+_AGENT_STATUS_CODES = {
+    AgentStatus(value): i for i, value in enumerate(_STR_ENUMS[1][1])
+}
+_STATE_STATUS_CODES = {
+    StateStatus(value): i for i, value in enumerate(_STR_ENUMS[2][1])
+}
+_AGENT_STATUSES = tuple(AgentStatus(value) for value in _STR_ENUMS[1][1])
+_STATE_STATUSES = tuple(StateStatus(value) for value in _STR_ENUMS[2][1])
+_PRIORITIES = {int(priority): priority for priority in Priority}
+
+
+def _is_default_record(value: Any) -> bool:
+    """Check whether every field of a registered dataclass is its default."""
+    cls = type(value)
+    values = _RECORD_GETTERS[cls](value)
+    return bool(
+        values == _RECORD_DEFAULTS[cls]
+        and tuple(map(type, values)) == _RECORD_DEFAULT_TYPES[cls]
+    )
+
+
+def _record(code: int, values: Any) -> Any:
+    """Rebuild a dataclass from its leading field values."""
+    if code not in _RECORDS:
+        raise ValueError(f"Corrupt checkpoint data: unknown record code {code}")
+    cls, fields = _RECORDS[code]
+    # Like unpickling, this skips __init__; fields written by newer versions
+    # are ignored
+    record: Any = object.__new__(cls)
+    state = record.__dict__
+    state.update(_RECORD_STATES[cls])
+    if values:
+        state.update(zip(fields, values))
+    return record
+
+
+@functools.lru_cache(maxsize=256)
+def _layout(layout: str) -> struct.Struct:
+    """Get a compiled struct for a section layout."""
+    return struct.Struct(layout)
+
+
+def _compressors(
+    name: str,
+) -> tuple[Callable[[bytes], bytes], Callable[[Any], bytes]]:
+    """Get the compress and decompress functions of a compression."""
+    if name == "zlib":
+        return zlib.compress, zlib.decompress
+    if name == "zstd":
+        if not _ZSTD_AVAILABLE:
+            raise ValueError(
+                "zstd compression requires the zstandard package. "
+                "Install with: pip install puffinflow[compression]"
+            )
+        return (
+            zstandard.ZstdCompressor().compress,
+            zstandard.ZstdDecompressor().decompress,
+        )
+    if name == "lz4":
+        if not _LZ4_AVAILABLE:
+            raise ValueError(
+                "lz4 compression requires the lz4 package. "
+                "Install with: pip install puffinflow[compression]"
+            )
+        return lz4.frame.compress, lz4.frame.decompress
+    raise ValueError(
+        f"Unknown compression: {name}. "
+        f"Available compressions: {', '.join(_COMPRESSION_CODES)}"
+    )
+
+
+class CheckpointCodec:
+    """Compact binary encoding of checkpoints and delta checkpoints.
+
+    An encoded checkpoint starts with a magic number, the format version,
+    the compression and the checkpoint kind. State names are written once
+    to a table and referred to by index, and the priority queue and the
+    fixed fields, IDs and satisfied dependencies of every state's metadata
+    are each packed with a single ``struct`` call. Values are written with
+    type tags: None, booleans, numbers, strings, bytes, lists, tuples,
+    dicts, sets, ``datetime`` dates, times, timedeltas and time zones,
+    ``Decimal``, ``UUID`` and the framework's enums and policies. Other
+    objects are pickled only when ``allow_pickle`` is set, for both
+    encoding and decoding.
+
+    The body can be compressed with ``"zlib"``, or with ``"zstd"`` or
+    ``"lz4"`` when the ``zstandard`` or ``lz4`` packages are installed.
+    :meth:`decode` reads any buffer, such as a memory-mapped file, through
+    a ``memoryview`` without copying it first.
+    """
+
+    def __init__(self, compression: str = "none", allow_pickle: bool = False):
+        if compression not in _COMPRESSION_CODES:
+            raise ValueError(
+                f"Unknown compression: {compression}. "
+                f"Available compressions: {', '.join(_COMPRESSION_CODES)}"
+            )
+        self.compression = compression
+        self.allow_pickle = allow_pickle
+        self._compress = _compressors(compression)[0] if compression != "none" else None
+
+    def encode(self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]) -> bytes:
+        """Encode a checkpoint or delta checkpoint."""
+        kind = _DELTA if isinstance(checkpoint, CheckpointDelta) else _FULL
+        body = _Encoder(self.allow_pickle).checkpoint(checkpoint)
+        header = _HEADER.pack(
+            MAGIC, VERSION, _COMPRESSION_CODES[self.compression], kind
+        )
+        if self._compress is not None:
+            return header + self._compress(bytes(body))
+        return header + body
+
+    def decode(self, data: Any) -> Union[AgentCheckpoint, CheckpointDelta]:
+        """Decode a checkpoint from ``bytes`` or any other buffer.
+
+        Raises:
+            ValueError: If the data is not an encoded checkpoint, is
+                truncated or corrupt, or uses a newer format version or an
+                unavailable compression.
+        """
+        with memoryview(data) as view:
+            if len(view) < _HEADER.size:
+                raise ValueError("Data is too short to be an encoded checkpoint")
+            magic, version, compression, kind = _HEADER.unpack_from(view)
+            if magic != MAGIC:
+                raise ValueError("Data is not an encoded checkpoint")
+            if version > VERSION:
+                raise ValueError(
+                    f"Unsupported checkpoint format version: {version}. "
+                    f"Newest supported version: {VERSION}"
+                )
+            name = _COMPRESSION_NAMES.get(compression)
+            if name is None:
+                raise ValueError(f"Unknown compression code: {compression}")
+            if name == "none":
+                return self._decode_body(view, _HEADER.size, kind)
+            decompress = _compressors(name)[1]
+            try:
+                body = decompress(view[_HEADER.size :])
+            except Exception as e:
+                raise ValueError(f"Corrupt checkpoint data: {e}") from e
+            with memoryview(body) as body_view:
+                return self._decode_body(body_view, 0, kind)
+
+    def _decode_body(
+        self, view: memoryview, position: int, kind: int
+    ) -> Union[AgentCheckpoint, CheckpointDelta]:
+        try:
+            return _Decoder(view, position, self.allow_pickle).checkpoint(kind)
+        except (
+            struct.error,
+            IndexError,
+            KeyError,
+            TypeError,
+            OverflowError,
+            UnicodeDecodeError,
+            decimal.InvalidOperation,
+            EOFError,
+            pickle.UnpicklingError,
+        ) as e:
+            raise ValueError(f"Corrupt checkpoint data: {e!r}") from e
+
+
+def is_encoded_checkpoint(data: Any) -> bool:
+    """Check whether a buffer starts like an encoded checkpoint."""
+    return bytes(memoryview(data)[: len(MAGIC)]) == MAGIC
+
+
+class _Encoder:
+    """Writes one checkpoint to a byte array."""
+
+    def __init__(self, allow_pickle: bool) -> None:
+        self.out = bytearray()
+        self.allow_pickle = allow_pickle
+        self.names: dict[str, int] = {}
+        self.index_format = "B"
+        self.keys: dict[str, int] = {}
+        self._dispatch: dict[type, Callable[[Any], None]] = {
+            type(None): self._none,
+            bool: self._bool,
+            int: self._int,
+            float: self._float,
+            str: self._str,
+            bytes: self._bytes,
+            bytearray: self._bytes,
+            list: self._list,
+            tuple: self._tuple,
+            dict: self._dict,
+            set: self._set,
+            frozenset: self._frozenset,
+            datetime.datetime: self._datetime,
+            datetime.date: self._date,
+            datetime.time: self._time,
+            datetime.timedelta: self._timedelta,
+            datetime.timezone: self._timezone,
+            decimal.Decimal: self._decimal,
+            uuid.UUID: self._uuid,
+        }
+        if _ZONEINFO_AVAILABLE:
+            self._dispatch[zoneinfo.ZoneInfo] = self._zoneinfo
+
+    # Checkpoints
+    def checkpoint(
+        self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> bytearray:
+        self._name_table(checkpoint)
+        out = self.out
+        out += _F64.pack(checkpoint.timestamp)
+        self._text(checkpoint.agent_name)
+        out.append(_AGENT_STATUS_CODES[checkpoint.agent_status])
+        self._optional_float(checkpoint.session_start)
+
+        names = self.names
+        index = self.index_format
+        count = len(checkpoint.priority_queue)
+        metadata = list(checkpoint.state_metadata.values())
+        if isinstance(checkpoint, CheckpointDelta):
+            self._text(checkpoint.parent_id)
+            delta_queue = checkpoint.priority_queue
+            out += _U32.pack(count)
+            out += _layout(f"<{count}d{count}d{count}{index}").pack(
+                *[entry[0] for entry in delta_queue],
+                *[entry[1] for entry in delta_queue],
+                *[names[entry[2]] for entry in delta_queue],
+            )
+        else:
+            # Queue entries normally share the state's metadata; the others
+            # follow the states' metadata
+            queue = checkpoint.priority_queue
+            state_metadata = checkpoint.state_metadata
+            own = [
+                state_metadata.get(entry.state_name) is not entry.metadata
+                for entry in queue
+            ]
+            out += _U32.pack(count)
+            out += _layout(f"<{count}d{count}d{count}{index}{count}?").pack(
+                *[entry.priority for entry in queue],
+                *[entry.timestamp for entry in queue],
+                *[names[entry.state_name] for entry in queue],
+                *own,
+            )
+            metadata += [entry.metadata for entry, is_own in zip(queue, own) if is_own]
+
+        self._names(checkpoint.state_metadata)
+        self._metadata(metadata)
+        if isinstance(checkpoint, CheckpointDelta):
+            self._names(checkpoint.removed_states)
+        self._names(checkpoint.running_states)
+        self._names(checkpoint.completed_states)
+        self._names(checkpoint.completed_once)
+        if isinstance(checkpoint, CheckpointDelta):
+            self._dict(checkpoint.shared_state_updates)
+            self._set(checkpoint.shared_state_removed)
+        else:
+            self._dict(checkpoint.shared_state)
+        return out
+
+    def _name_table(self, checkpoint: Union[AgentCheckpoint, CheckpointDelta]) -> None:
+        names: dict[str, None] = dict.fromkeys(checkpoint.state_metadata)
+        for metadata in checkpoint.state_metadata.values():
+            names.update(dict.fromkeys(metadata.satisfied_dependencies))
+        if isinstance(checkpoint, CheckpointDelta):
+            names.update(dict.fromkeys(entry[2] for entry in checkpoint.priority_queue))
+            names.update(dict.fromkeys(checkpoint.removed_states))
+        else:
+            for entry in checkpoint.priority_queue:
+                names[entry.state_name] = None
+                names.update(dict.fromkeys(entry.metadata.satisfied_dependencies))
+        names.update(dict.fromkeys(checkpoint.running_states))
+        names.update(dict.fromkeys(checkpoint.completed_states))
+        names.update(dict.fromkeys(checkpoint.completed_once))
+
+        self.names = {name: index for index, name in enumerate(names)}
+        self.index_format = (
+            "B" if len(names) <= 0x100 else "H" if len(names) <= 0x10000 else "I"
+        )
+        self.out += _U32.pack(len(names))
+        self.out.append(ord(self.index_format))
+        self._texts(list(names))
+
+    def _names(self, names: Any) -> None:
+        indices = [self.names[name] for name in names]
+        self.out += _U32.pack(len(indices))
+        self.out += _layout(f"<{len(indices)}{self.index_format}").pack(*indices)
+
+    def _texts(self, texts: list[str]) -> None:
+        """Write strings as packed lengths and one UTF-8 block."""
+        # Lengths in code points, so the strings slice out of one decoded
+        # block
+        encoded = "".join(texts).encode()
+        self.out += _layout(f"<{len(texts)}I").pack(*map(len, texts))
+        self.out += _U32.pack(len(encoded))
+        self.out += encoded
+
+    def _text(self, text: str) -> None:
+        encoded = text.encode()
+        self.out += _U32.pack(len(encoded))
+        self.out += encoded
+
+    def _optional_float(self, value: Optional[float]) -> None:
+        self.out += _OPTIONAL_F64.pack(value is not None, value or 0.0)
+
+    def _metadata(self, metadata: list[StateMetadata]) -> None:
+        """Write the packed sections of each state's metadata, then the rest."""
+        fixed: list[Any] = []
+        state_ids = []
+        satisfied: list[int] = []
+        extras = []
+        codes = _STATE_STATUS_CODES
+        names = self.names
+        for entry in metadata:
+            flags = 0
+            if entry.last_execution is not None:
+                flags |= _HAS_LAST_EXECUTION
+            if entry.last_success is not None:
+                flags |= _HAS_LAST_SUCCESS
+            if entry.streaming:
+                flags |= _STREAMING
+            if entry.executor is not None:
+                flags |= _HAS_EXECUTOR
+            if entry.checkpoint_interval is not None:
+                flags |= _HAS_CHECKPOINT_INTERVAL
+            resources = entry.resources
+            if resources is not None:
+                if (
+                    _RESOURCES_AVAILABLE
+                    and type(resources) is ResourceRequirements
+                    and _is_default_record(resources)
+                ):
+                    flags |= _DEFAULT_RESOURCES
+                else:
+                    flags |= _HAS_RESOURCES
+            retry_policy = entry.retry_policy
+            if retry_policy is not None:
+                if type(retry_policy) is RetryPolicy and _is_default_record(
+                    retry_policy
+                ):
+                    flags |= _DEFAULT_RETRY_POLICY
+                else:
+                    flags |= _HAS_RETRY_POLICY
+            if entry.cache is not None:
+                flags |= _HAS_CACHE
+            if entry.coordination_primitives != []:
+                flags |= _HAS_COORDINATION
+            if entry.dependencies != {}:
+                flags |= _HAS_DEPENDENCIES
+            fixed += (
+                codes[entry.status],
+                entry.priority,
+                entry.attempts,
+                entry.max_retries,
+                flags,
+                entry.last_execution or 0.0,
+                entry.last_success or 0.0,
+                len(entry.satisfied_dependencies),
+            )
+            state_ids.append(str(entry.state_id))
+            satisfied += [names[name] for name in entry.satisfied_dependencies]
+            if flags & _EXTRA_FIELDS:
+                extras.append((entry, flags))
+
+        out = self.out
+        out += _layout("<" + _METADATA * len(metadata)).pack(*fixed)
+        self._texts(state_ids)
+        out += _layout(f"<{len(satisfied)}{self.index_format}").pack(*satisfied)
+        for entry, flags in extras:
+            if flags & _HAS_EXECUTOR:
+                self._text(entry.executor)  # type: ignore[arg-type]
+            if flags & _HAS_CHECKPOINT_INTERVAL:
+                out += _F64.pack(entry.checkpoint_interval)
+            if flags & _HAS_RESOURCES:
+                self.value(entry.resources)
+            if flags & _HAS_RETRY_POLICY:
+                self.value(entry.retry_policy)
+            if flags & _HAS_CACHE:
+                self.value(entry.cache)
+            if flags & _HAS_COORDINATION:
+                self.value(entry.coordination_primitives)
+            if flags & _HAS_DEPENDENCIES:
+                self.value(entry.dependencies)
+
+    # Values
+    def value(self, value: Any) -> None:
+        encode = self._dispatch.get(type(value))
+        if encode is not None:
+            encode(value)
+        elif type(value) in _ENUM_CODES:
+            self._enum(value)
+        elif type(value) in _RECORD_CODES:
+            self._record(value)
+        elif isinstance(value, dict):
+            # Dict subclasses such as the dirty tracking shared state
+            self._dict(value)
+        elif self.allow_pickle:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            self.out.append(_PICKLE)
+            self.out += _U32.pack(len(data))
+            self.out += data
+        else:
+            raise TypeError(
+                f"Cannot encode value of type {type(value).__name__} in a "
+                f"checkpoint; enable allow_pickle to store it pickled"
+            )
+
+    def _none(self, value: None) -> None:
+        self.out.append(_NONE)
+
+    def _bool(self, value: bool) -> None:
+        self.out.append(_TRUE if value else _FALSE)
+
+    def _int(self, value: int) -> None:
+        if 0 <= value < 0x80:
+            self.out.append(_FIXINT | value)
+        elif -(2**63) <= value < 2**63:
+            self.out.append(_INT)
+            self.out += _I64.pack(value)
+        else:
+            data = value.to_bytes(value.bit_length() // 8 + 1, "little", signed=True)
+            self.out.append(_BIGINT)
+            self.out += _U32.pack(len(data))
+            self.out += data
+
+    def _float(self, value: float) -> None:
+        self.out.append(_FLOAT)
+        self.out += _F64.pack(value)
+
+    def _str(self, value: str) -> None:
+        encoded = value.encode()
+        if len(encoded) < 0x100:
+            self.out.append(_STR8)
+            self.out.append(len(encoded))
+        else:
+            self.out.append(_STR)
+            self.out += _U32.pack(len(encoded))
+        self.out += encoded
+
+    def _bytes(self, value: bytes) -> None:
+        self.out.append(_BYTES)
+        self.out += _U32.pack(len(value))
+        self.out += value
+
+    def _items(self, tag: int, items: Any) -> None:
+        self.out.append(tag)
+        self.out += _U32.pack(len(items))
+        value = self.value
+        for item in items:
+            value(item)
+
+    def _list(self, value: list) -> None:
+        self._items(_LIST, value)
+
+    def _tuple(self, value: tuple) -> None:
+        self._items(_TUPLE, value)
+
+    def _set(self, value: set) -> None:
+        self._items(_SET, value)
+
+    def _frozenset(self, value: frozenset) -> None:
+        self._items(_FROZENSET, value)
+
+    def _dict(self, value: dict) -> None:
+        out = self.out
+        out.append(_DICT)
+        out += _U32.pack(len(value))
+        encode = self.value
+        keys = self.keys
+        for key, item in value.items():
+            if type(key) is not str:
+                encode(key)
+            elif key in keys:
+                index = keys[key]
+                if index < 0x100:
+                    out.append(_KEY8)
+                    out.append(index)
+                else:
+                    out.append(_KEY)
+                    out += _U32.pack(index)
+            else:
+                keys[key] = len(keys)
+                self._str(key)
+            encode(item)
+
+    def _datetime(self, value: datetime.datetime) -> None:
+        self.out.append(_DATETIME)
+        self.out += _DATETIME_FIELDS.pack(
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+            value.fold,
+        )
+        self.value(value.tzinfo)
+
+    def _date(self, value: datetime.date) -> None:
+        self.out.append(_DATE)
+        self.out += _DATE_FIELDS.pack(value.year, value.month, value.day)
+
+    def _time(self, value: datetime.time) -> None:
+        self.out.append(_TIME)
+        self.out += _TIME_FIELDS.pack(
+            value.hour, value.minute, value.second, value.microsecond, value.fold
+        )
+        self.value(value.tzinfo)
+
+    def _timedelta(self, value: datetime.timedelta) -> None:
+        self.out.append(_TIMEDELTA)
+        self.out += _TIMEDELTA_FIELDS.pack(
+            value.days, value.seconds, value.microseconds
+        )
+
+    def _timezone(self, value: datetime.timezone) -> None:
+        offset = value.utcoffset(None)
+        name = value.tzname(None)
+        self.out.append(_TIMEZONE)
+        self._timedelta(offset)
+        # Only names other than the generated "UTC+hh:mm" are kept
+        self.value(None if datetime.timezone(offset).tzname(None) == name else name)
+
+    def _zoneinfo(self, value: Any) -> None:
+        self.out.append(_ZONEINFO)
+        self._text(value.key)
+
+    def _decimal(self, value: decimal.Decimal) -> None:
+        self.out.append(_DECIMAL)
+        self._text(str(value))
+
+    def _uuid(self, value: uuid.UUID) -> None:
+        self.out.append(_UUID)
+        self.out += value.bytes
+
+    def _enum(self, value: Enum) -> None:
+        code, indices = _ENUM_CODES[type(value)]
+        self.out.append(_ENUM)
+        self.out.append(code)
+        if indices is not None:
+            self.out.append(indices[value.value])
+        else:
+            self._int(int(value.value))
+
+    def _record(self, value: Any) -> None:
+        code = _RECORD_CODES[type(value)][0]
+        values = _RECORD_GETTERS[type(value)](value)
+        defaults = _RECORD_DEFAULTS[type(value)]
+        count = len(values)
+        while count and type(values[count - 1]) is type(defaults[count - 1]):
+            if values[count - 1] != defaults[count - 1]:
+                break
+            count -= 1
+        self.out.append(_RECORD)
+        self.out.append(code)
+        self.out.append(count)
+        for item in values[:count]:
+            self.value(item)
+
+
+class _Decoder:
+    """Reads one checkpoint from a memoryview."""
+
+    def __init__(self, view: memoryview, position: int, allow_pickle: bool) -> None:
+        self.view = view
+        self.position = position
+        self.allow_pickle = allow_pickle
+        self.names: list[str] = []
+        self.index_format = "B"
+        self.keys: list[str] = []
+        self._readers: list[Optional[Callable[[], Any]]] = [None] * _FIXINT
+        self._readers[_NONE] = lambda: None
+        self._readers[_FALSE] = lambda: False
+        self._readers[_TRUE] = lambda: True
+        self._readers[_INT] = self._int
+        self._readers[_BIGINT] = self._bigint
+        self._readers[_FLOAT] = self._float
+        self._readers[_STR] = self._text
+        self._readers[_STR8] = self._str8
+        self._readers[_BYTES] = self._bytes
+        self._readers[_LIST] = self._list
+        self._readers[_TUPLE] = lambda: tuple(self._list())
+        self._readers[_DICT] = self._dict
+        self._readers[_SET] = lambda: set(self._list())
+        self._readers[_FROZENSET] = lambda: frozenset(self._list())
+        self._readers[_ENUM] = self._enum
+        self._readers[_RECORD] = self._record
+        self._readers[_PICKLE] = self._pickle
+        self._readers[_DATETIME] = self._datetime
+        self._readers[_DATE] = self._date
+        self._readers[_TIME] = self._time
+        self._readers[_TIMEDELTA] = self._timedelta
+        self._readers[_TIMEZONE] = self._timezone
+        self._readers[_ZONEINFO] = self._zoneinfo
+        self._readers[_DECIMAL] = self._decimal
+        self._readers[_UUID] = self._uuid
+
+    # Checkpoints
+    def checkpoint(self, kind: int) -> Union[AgentCheckpoint, CheckpointDelta]:
+        self._name_table()
+        names = self.names
+        index = self.index_format
+        timestamp = self._unpack(_F64)[0]
+        agent_name = self._text()
+        agent_status = _AGENT_STATUSES[self._byte()]
+        session_start = self._optional_float()
+
+        if kind == _DELTA:
+            parent_id = self._text()
+        count = self._unpack(_U32)[0]
+        if kind == _DELTA:
+            queue = self._unpack(_layout(f"<{count}d{count}d{count}{index}"))
+            own: tuple = ()
+        else:
+            queue = self._unpack(_layout(f"<{count}d{count}d{count}{index}{count}?"))
+            own = queue[3 * count :]
+        priorities = queue[:count]
+        queued_at = queue[count : 2 * count]
+        queue_names = [names[i] for i in queue[2 * count : 3 * count]]
+
+        state_names = self._names()
+        metadata = self._metadata(len(state_names) + sum(own))
+        state_metadata = dict(zip(state_names, metadata))
+        removed_states = self._names() if kind == _DELTA else []
+        running_states = self._names()
+        completed_states = self._names()
+        completed_once = self._names()
+
+        if kind == _DELTA:
+            self._expect(_DICT)
+            updates = self._dict()
+            self._expect(_SET)
+            removed = set(self._list())
+            return CheckpointDelta(
+                timestamp=timestamp,
+                agent_name=agent_name,
+                parent_id=parent_id,
+                agent_status=agent_status,
+                priority_queue=list(zip(priorities, queued_at, queue_names)),
+                state_metadata=state_metadata,
+                removed_states=set(removed_states),
+                running_states=set(running_states),
+                completed_states=set(completed_states),
+                completed_once=set(completed_once),
+                shared_state_updates=updates,
+                shared_state_removed=removed,
+                session_start=session_start,
+            )
+
+        owned = iter(metadata[len(state_names) :])
+        priority_queue = [
+            PrioritizedState(
+                priority=priority,
+                timestamp=at,
+                state_name=state_name,
+                metadata=next(owned) if is_own else state_metadata[state_name],
+            )
+            for priority, at, state_name, is_own in zip(
+                priorities, queued_at, queue_names, own
+            )
+        ]
+        self._expect(_DICT)
+        return AgentCheckpoint(
+            timestamp=timestamp,
+            agent_name=agent_name,
+            agent_status=agent_status,
+            priority_queue=priority_queue,
+            state_metadata=state_metadata,
+            running_states=set(running_states),
+            completed_states=set(completed_states),
+            completed_once=set(completed_once),
+            shared_state=self._dict(),
+            session_start=session_start,
+        )
+
+    def _name_table(self) -> None:
+        count = self._unpack(_U32)[0]
+        index_format = chr(self._byte())
+        if index_format not in ("B", "H", "I"):
+            raise ValueError("Corrupt checkpoint data: unknown name index format")
+        self.index_format = index_format
+        self.names = self._texts(count)
+
+    def _metadata(self, count: int) -> list[StateMetadata]:
+        fixed = self._unpack(_layout("<" + _METADATA * count))
+        state_ids = self._texts(count)
+        satisfied_count = sum(fixed[_METADATA_FIELDS - 1 :: _METADATA_FIELDS])
+        satisfied = self._unpack(_layout(f"<{satisfied_count}{self.index_format}"))
+        names = self.names
+        metadata = []
+        extras = []
+        dependency = 0
+        for position in range(count):
+            start = position * _METADATA_FIELDS
+            (
+                status,
+                priority,
+                attempts,
+                max_retries,
+                flags,
+                last_execution,
+                last_success,
+                satisfied_dependencies,
+            ) = fixed[start : start + _METADATA_FIELDS]
+            end = dependency + satisfied_dependencies
+            dependencies = {names[index] for index in satisfied[dependency:end]}
+            dependency = end
+            resources = _record(3, ()) if flags & _DEFAULT_RESOURCES else None
+            entry = StateMetadata(
+                status=_STATE_STATUSES[status],
+                attempts=attempts,
+                max_retries=max_retries,
+                resources=resources,
+                retry_policy=(
+                    _record(1, ()) if flags & _DEFAULT_RETRY_POLICY else None
+                ),
+                satisfied_dependencies=dependencies,
+                last_execution=(
+                    last_execution if flags & _HAS_LAST_EXECUTION else None
+                ),
+                last_success=last_success if flags & _HAS_LAST_SUCCESS else None,
+                state_id=state_ids[position],
+                priority=_PRIORITIES[priority],
+                streaming=bool(flags & _STREAMING),
+            )
+            if not flags & (_DEFAULT_RESOURCES | _HAS_RESOURCES):
+                # __post_init__ fills in resources the checkpoint left unset
+                entry.resources = None
+            metadata.append(entry)
+            if flags & _EXTRA_FIELDS:
+                extras.append((entry, flags))
+
+        # The remaining fields follow the packed sections
+        for entry, flags in extras:
+            if flags & _HAS_EXECUTOR:
+                entry.executor = self._text()
+            if flags & _HAS_CHECKPOINT_INTERVAL:
+                entry.checkpoint_interval = self._unpack(_F64)[0]
+            if flags & _HAS_RESOURCES:
+                entry.resources = self.value()
+            if flags & _HAS_RETRY_POLICY:
+                entry.retry_policy = self.value()
+            if flags & _HAS_CACHE:
+                entry.cache = self.value()
+            if flags & _HAS_COORDINATION:
+                entry.coordination_primitives = self.value()
+            if flags & _HAS_DEPENDENCIES:
+                entry.dependencies = self.value()
+        return metadata
+
+    def _names(self) -> list[str]:
+        count = self._unpack(_U32)[0]
+        names = self.names
+        return [
+            names[index]
+            for index in self._unpack(_layout(f"<{count}{self.index_format}"))
+        ]
+
+    def _texts(self, count: int) -> list[str]:
+        lengths = self._unpack(_layout(f"<{count}I"))
+        text = str(self._take(self._unpack(_U32)[0]), "utf-8")
+        if sum(lengths) != len(text):
+            raise ValueError("Corrupt checkpoint data: string lengths mismatch")
+        texts = []
+        start = 0
+        for length in lengths:
+            texts.append(text[start : start + length])
+            start += length
+        return texts
+
+    # Primitives
+    def _unpack(self, layout: struct.Struct) -> tuple:
+        values = layout.unpack_from(self.view, self.position)
+        self.position += layout.size
+        return values
+
+    def _take(self, length: int) -> memoryview:
+        start = self.position
+        end = start + length
+        if end > len(self.view):
+            raise ValueError("Corrupt checkpoint data: truncated")
+        self.position = end
+        return self.view[start:end]
+
+    def _byte(self) -> int:
+        value: int = self.view[self.position]
+        self.position += 1
+        return value
+
+    def _expect(self, tag: int) -> None:
+        if self._byte() != tag:
+            raise ValueError("Corrupt checkpoint data")
+
+    def _text(self) -> str:
+        return str(self._take(self._unpack(_U32)[0]), "utf-8")
+
+    def _optional_float(self) -> Optional[float]:
+        present, value = self._unpack(_OPTIONAL_F64)
+        return value if present else None
+
+    # Values
+    def value(self) -> Any:
+        view = self.view
+        position = self.position
+        tag: int = view[position]
+        if tag >= _FIXINT:
+            self.position = position + 1
+            return tag - _FIXINT
+        if tag == _STR8:
+            start = position + 2
+            end = start + view[position + 1]
+            if end > len(view):
+                raise ValueError("Corrupt checkpoint data: truncated")
+            self.position = end
+            return str(view[start:end], "utf-8")
+        self.position = position + 1
+        reader = self._readers[tag] if tag < len(self._readers) else None
+        if reader is None:
+            raise ValueError(f"Corrupt checkpoint data: unknown value tag {tag}")
+        return reader()
+
+    def _int(self) -> int:
+        value: int = self._unpack(_I64)[0]
+        return value
+
+    def _bigint(self) -> int:
+        length = self._unpack(_U32)[0]
+        return int.from_bytes(self._take(length), "little", signed=True)
+
+    def _float(self) -> float:
+        value: float = self._unpack(_F64)[0]
+        return value
+
+    def _str8(self) -> str:
+        return str(self._take(self._byte()), "utf-8")
+
+    def _bytes(self) -> bytes:
+        return bytes(self._take(self._unpack(_U32)[0]))
+
+    def _list(self) -> list:
+        return [self.value() for _ in range(self._unpack(_U32)[0])]
+
+    def _dict(self) -> dict:
+        result = {}
+        view = self.view
+        keys = self.keys
+        for _ in range(self._unpack(_U32)[0]):
+            tag = view[self.position]
+            if tag == _KEY8:
+                key = keys[view[self.position + 1]]
+                self.position += 2
+            elif tag == _KEY:
+                self.position += 1
+                key = keys[self._unpack(_U32)[0]]
+            else:
+                key = self.value()
+                if type(key) is str:
+                    keys.append(key)
+            result[key] = self.value()
+        return result
+
+    def _datetime(self) -> datetime.datetime:
+        year, month, day, hour, minute, second, microsecond, fold = self._unpack(
+            _DATETIME_FIELDS
+        )
+        return datetime.datetime(
+            year,
+            month,
+            day,
+            hour,
+            minute,
+            second,
+            microsecond,
+            tzinfo=self.value(),
+            fold=fold,
+        )
+
+    def _date(self) -> datetime.date:
+        return datetime.date(*self._unpack(_DATE_FIELDS))
+
+    def _time(self) -> datetime.time:
+        hour, minute, second, microsecond, fold = self._unpack(_TIME_FIELDS)
+        return datetime.time(
+            hour, minute, second, microsecond, tzinfo=self.value(), fold=fold
+        )
+
+    def _timedelta(self) -> datetime.timedelta:
+        return datetime.timedelta(*self._unpack(_TIMEDELTA_FIELDS))
+
+    def _timezone(self) -> datetime.timezone:
+        self._expect(_TIMEDELTA)
+        offset = self._timedelta()
+        name = self.value()
+        if name is None:
+            return datetime.timezone(offset)
+        return datetime.timezone(offset, name)
+
+    def _zoneinfo(self) -> Any:
+        if not _ZONEINFO_AVAILABLE:
+            raise ValueError("Checkpoint contains a time zone; zoneinfo is required")
+        return zoneinfo.ZoneInfo(self._text())
+
+    def _decimal(self) -> decimal.Decimal:
+        return decimal.Decimal(self._text())
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(bytes=bytes(self._take(16)))
+
+    def _enum(self) -> Enum:
+        code = self._byte()
+        if code in _STR_ENUMS:
+            cls, values = _STR_ENUMS[code]
+            return cls(values[self._byte()])
+        if code in _INT_ENUMS:
+            return _INT_ENUMS[code](self.value())
+        raise ValueError(f"Corrupt checkpoint data: unknown enum code {code}")
+
+    def _record(self) -> Any:
+        code = self._byte()
+        count = self._byte()
+        return _record(code, [self.value() for _ in range(count)])
+
+    def _pickle(self) -> Any:
+        if not self.allow_pickle:
+            raise ValueError(
+                "Checkpoint contains pickled values; decode with allow_pickle "
+                "to load them"
+            )
+        return pickle.loads(self._take(self._unpack(_U32)[0]))
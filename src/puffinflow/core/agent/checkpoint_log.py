@@ -0,0 +1,421 @@
+"""Append-only segmented log storage for agent checkpoints."""
+
+import asyncio
+import logging
+import os
+import pickle
+import struct
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .checkpoint import AgentCheckpoint, CheckpointDelta
+from .checkpoint_codec import CheckpointCodec, is_encoded_checkpoint
+
+logger = logging.getLogger(__name__)
+
+# Record header: kind, payload length, payload CRC-32, checkpoint number
+_HEADER = struct.Struct("<BIIQ")
+_CHECKPOINT = 0
+_DELETE = 1
+
+
+class _AgentLog:
+    """Open segments and offset index of one agent's log."""
+
+    __slots__ = (
+        "active",
+        "active_fd",
+        "compaction",
+        "dead_bytes",
+        "directory",
+        "index",
+        "last_number",
+        "segment_sizes",
+    )
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        # Checkpoint ID -> (segment, payload offset, payload length), in
+        # checkpoint number order
+        self.index: dict[str, tuple[int, int, int]] = {}
+        self.segment_sizes: dict[int, int] = {}
+        self.dead_bytes: dict[int, int] = {}
+        self.active = 0
+        self.active_fd: Optional[int] = None
+        self.last_number = 0
+        # Held while sealed segments are rewritten
+        self.compaction = asyncio.Lock()
+
+    def segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment_{segment:08d}.log"
+
+
+class LogCheckpointStorage:
+    """Checkpoint storage appending length-prefixed records to segment files.
+
+    Each agent gets a directory of numbered segment files. Checkpoints are
+    pickled, or encoded with ``codec`` when given, and appended to the
+    active segment, deletions append a tombstone, and an in-memory index
+    maps checkpoint IDs to record offsets, so the latest checkpoint loads
+    without listing the directory.
+    The index is rebuilt from the segments the first time an agent's log is
+    used, discarding a torn record at the end of the last segment.
+
+    Saves return once their record is on disk. Records appended within
+    ``flush_interval`` seconds share one fsync (group commit). When the
+    active segment reaches ``segment_bytes`` it is sealed and a new one is
+    started; once deleted records make up more than half of the sealed
+    segments, their live records are compacted into a single segment by a
+    worker thread.
+    """
+
+    def __init__(
+        self,
+        base_path: Union[str, Path] = "./checkpoints",
+        segment_bytes: int = 64 * 1024 * 1024,
+        flush_interval: float = 0.005,
+        fsync: bool = True,
+        codec: Optional[CheckpointCodec] = None,
+    ) -> None:
+        if segment_bytes < 1:
+            raise ValueError(
+                f"Invalid segment_bytes: {segment_bytes}. Must be at least 1"
+            )
+        if flush_interval < 0:
+            raise ValueError(
+                f"Invalid flush_interval: {flush_interval}. Must not be negative"
+            )
+        self.base_path = Path(base_path)
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.codec = codec
+        self.base_path.mkdir(parents=True, exist_ok=True)
+
+        self._logs: dict[str, _AgentLog] = {}
+        # Group commit: descriptors written since the last fsync and the
+        # saves waiting for it
+        self._unsynced: set[int] = set()
+        self._waiters: list[asyncio.Future] = []
+        # Descriptors an fsync thread still uses, and sealed segments whose
+        # descriptor is closed once those threads finish
+        self._syncing: Counter[int] = Counter()
+        self._closing: set[int] = set()
+        # The flush still collecting saves, and every flush not yet finished
+        self._flusher: Optional[asyncio.Task] = None
+        self._flushes: set[asyncio.Task] = set()
+
+        self.fsyncs = 0
+        self.compactions = 0
+
+    # CheckpointStorage protocol
+    async def save_checkpoint(
+        self, agent_name: str, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> str:
+        """Append a checkpoint to the agent's log."""
+        log = self._open(agent_name)
+        number = max(int(checkpoint.timestamp), log.last_number + 1)
+        if self.codec is not None:
+            payload = self.codec.encode(checkpoint)
+        else:
+            payload = pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+        checkpoint_id = f"checkpoint_{number}"
+        log.index[checkpoint_id] = self._append(log, _CHECKPOINT, number, payload)
+        log.last_number = number
+        await self._commit()
+        await self._maybe_compact(log)
+        return checkpoint_id
+
+    async def load_checkpoint(
+        self, agent_name: str, checkpoint_id: Optional[str] = None
+    ) -> Optional[Union[AgentCheckpoint, CheckpointDelta]]:
+        """Load a checkpoint by ID, or the latest one."""
+        log = self._open(agent_name)
+        if checkpoint_id is None:
+            checkpoint_id = next(reversed(log.index), None)
+            if checkpoint_id is None:
+                return None
+        location = log.index.get(checkpoint_id)
+        if location is None:
+            return None
+        segment, offset, length = location
+        try:
+            with log.segment_path(segment).open("rb") as f:
+                f.seek(offset)
+                data = f.read(length)
+            # Records written before a codec was configured stay pickled
+            if self.codec is not None and is_encoded_checkpoint(data):
+                return self.codec.decode(data)
+            checkpoint: Union[AgentCheckpoint, CheckpointDelta] = pickle.loads(data)
+            return checkpoint
+        except Exception as e:
+            logger.error(f"Failed to load checkpoint {agent_name}/{checkpoint_id}: {e}")
+            return None
+
+    async def list_checkpoints(self, agent_name: str) -> list[str]:
+        """List the agent's checkpoint IDs, oldest first."""
+        return list(self._open(agent_name).index)
+
+    async def delete_checkpoint(self, agent_name: str, checkpoint_id: str) -> bool:
+        """Delete a checkpoint by appending a tombstone."""
+        log = self._open(agent_name)
+        location = log.index.pop(checkpoint_id, None)
+        if location is None:
+            return False
+        segment, _, length = location
+        log.dead_bytes[segment] = log.dead_bytes.get(segment, 0) + _HEADER.size + length
+        number = int(checkpoint_id.rsplit("_", 1)[-1])
+        tombstone = self._append(log, _DELETE, number, b"")
+        log.dead_bytes[tombstone[0]] = (
+            log.dead_bytes.get(tombstone[0], 0) + _HEADER.size
+        )
+        await self._commit()
+        await self._maybe_compact(log)
+        return True
+
+    # Log files
+    def _open(self, agent_name: str) -> _AgentLog:
+        log = self._logs.get(agent_name)
+        if log is not None:
+            return log
+        log = _AgentLog(self.base_path / agent_name)
+        log.directory.mkdir(parents=True, exist_ok=True)
+        segments = sorted(
+            int(path.stem.split("_")[-1])
+            for path in log.directory.glob("segment_*.log")
+        )
+        for position, segment in enumerate(segments):
+            self._scan(log, segment, last=position == len(segments) - 1)
+        log.active = segments[-1] if segments else 1
+        log.segment_sizes.setdefault(log.active, 0)
+        self._logs[agent_name] = log
+        return log
+
+    def _scan(self, log: _AgentLog, segment: int, last: bool) -> None:
+        """Add a segment's records to the index."""
+        path = log.segment_path(segment)
+        data = path.read_bytes()
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            kind, length, crc, number = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            payload = data[start : start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            checkpoint_id = f"checkpoint_{number}"
+            previous = log.index.pop(checkpoint_id, None)
+            if previous is not None:
+                log.dead_bytes[previous[0]] = (
+                    log.dead_bytes.get(previous[0], 0) + _HEADER.size + previous[2]
+                )
+            if kind == _CHECKPOINT:
+                log.index[checkpoint_id] = (segment, start, length)
+            else:
+                log.dead_bytes[segment] = log.dead_bytes.get(segment, 0) + _HEADER.size
+            log.last_number = max(log.last_number, number)
+            offset = start + length
+
+        if offset < len(data):
+            if not last:
+                logger.warning(f"Ignoring corrupt records at {path}:{offset}")
+            else:
+                # A save interrupted mid-write leaves a torn record at the end
+                logger.warning(f"Truncating torn checkpoint record at {path}:{offset}")
+                with path.open("r+b") as f:
+                    f.truncate(offset)
+        log.segment_sizes[segment] = offset if last else len(data)
+
+    def _append(
+        self, log: _AgentLog, kind: int, number: int, payload: bytes
+    ) -> tuple[int, int, int]:
+        """Write one record to the active segment and get its location."""
+        if log.segment_sizes[log.active] >= self.segment_bytes:
+            self._roll_over(log)
+        if log.active_fd is None:
+            log.active_fd = os.open(
+                log.segment_path(log.active), os.O_WRONLY | os.O_CREAT | os.O_APPEND
+            )
+        record = _HEADER.pack(kind, len(payload), zlib.crc32(payload), number)
+        os.write(log.active_fd, record + payload)
+        offset = log.segment_sizes[log.active] + _HEADER.size
+        log.segment_sizes[log.active] += len(record) + len(payload)
+        if self.fsync:
+            self._unsynced.add(log.active_fd)
+        return log.active, offset, len(payload)
+
+    def _roll_over(self, log: _AgentLog) -> None:
+        """Seal the active segment and start the next one."""
+        self._close_active(log)
+        log.active += 1
+        log.segment_sizes[log.active] = 0
+
+    def _close_active(self, log: _AgentLog) -> None:
+        fd = log.active_fd
+        if fd is None:
+            return
+        log.active_fd = None
+        if fd in self._unsynced:
+            os.fsync(fd)
+            self._unsynced.discard(fd)
+        if self._syncing[fd]:
+            # An fsync thread still uses the descriptor; its flush closes it
+            self._closing.add(fd)
+        else:
+            os.close(fd)
+
+    async def _maybe_compact(self, log: _AgentLog) -> None:
+        """Compact the sealed segments once most of their bytes are dead."""
+        if log.compaction.locked():
+            return
+        sealed = [segment for segment in log.segment_sizes if segment != log.active]
+        sealed_bytes = sum(log.segment_sizes[segment] for segment in sealed)
+        dead = sum(log.dead_bytes.get(segment, 0) for segment in sealed)
+        if len(sealed) > 1 and dead * 2 > sealed_bytes:
+            async with log.compaction:
+                await self._compact(log, sealed)
+
+    async def _compact(self, log: _AgentLog, sealed: list[int]) -> None:
+        """Rewrite the live records of sealed segments into the newest one."""
+        target = max(sealed)
+        sealed_set = set(sealed)
+        live = [
+            (checkpoint_id, location)
+            for checkpoint_id, location in log.index.items()
+            if location[0] in sealed_set
+        ]
+        temp_path, relocated, position = await asyncio.to_thread(
+            self._rewrite, log, target, live
+        )
+        # Checkpoints deleted while the records were copied stay deleted
+        dead = 0
+        for checkpoint_id, location in live:
+            if log.index.get(checkpoint_id) == location:
+                log.index[checkpoint_id] = relocated[checkpoint_id]
+            else:
+                dead += _HEADER.size + location[2]
+        # Replacing the newest sealed segment first keeps the log readable
+        # if removing the older ones is interrupted
+        temp_path.replace(log.segment_path(target))
+        for segment in sealed:
+            if segment != target:
+                log.segment_path(segment).unlink(missing_ok=True)
+                del log.segment_sizes[segment]
+            log.dead_bytes.pop(segment, None)
+        log.segment_sizes[target] = position
+        if dead:
+            log.dead_bytes[target] = dead
+        self.compactions += 1
+
+    def _rewrite(
+        self,
+        log: _AgentLog,
+        target: int,
+        live: list[tuple[str, tuple[int, int, int]]],
+    ) -> tuple[Path, dict[str, tuple[int, int, int]], int]:
+        """Copy records into a synced temporary segment, off the event loop."""
+        temp_path = log.segment_path(target).with_suffix(".compact")
+        relocated = {}
+        with temp_path.open("wb") as out:
+            position = 0
+            for checkpoint_id, (segment, offset, length) in live:
+                with log.segment_path(segment).open("rb") as f:
+                    f.seek(offset)
+                    payload = f.read(length)
+                number = int(checkpoint_id.rsplit("_", 1)[-1])
+                out.write(
+                    _HEADER.pack(_CHECKPOINT, length, zlib.crc32(payload), number)
+                )
+                out.write(payload)
+                relocated[checkpoint_id] = (target, position + _HEADER.size, length)
+                position += _HEADER.size + length
+            out.flush()
+            os.fsync(out.fileno())
+        return temp_path, relocated, position
+
+    # Group commit
+    async def _commit(self) -> None:
+        """Wait until every record appended so far is on disk."""
+        if not self.fsync or not self._unsynced:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_after(self.flush_interval))
+            self._flushes.add(self._flusher)
+            self._flusher.add_done_callback(self._flushes.discard)
+        await waiter
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        descriptors = list(self._unsynced)
+        waiters = self._waiters
+        self._unsynced = set()
+        self._waiters = []
+        self._syncing.update(descriptors)
+        # Saves arriving during the fsync wait for the next flush
+        self._flusher = None
+        try:
+            await asyncio.to_thread(_fsync_all, descriptors)
+            self.fsyncs += 1
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        finally:
+            self._release(descriptors)
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _release(self, descriptors: list[int]) -> None:
+        """Close sealed segments no fsync thread uses anymore."""
+        for fd in descriptors:
+            self._syncing[fd] -= 1
+            if self._syncing[fd] <= 0:
+                del self._syncing[fd]
+                if fd in self._closing:
+                    self._closing.discard(fd)
+                    os.close(fd)
+
+    async def compact(self, agent_name: str) -> None:
+        """Seal the agent's active segment and compact all sealed segments."""
+        await self._drain()
+        log = self._open(agent_name)
+        async with log.compaction:
+            self._roll_over(log)
+            sealed = [segment for segment in log.segment_sizes if segment != log.active]
+            await self._compact(log, sealed)
+
+    async def close(self) -> None:
+        """Flush pending records and close every segment file."""
+        await self._drain()
+        for log in self._logs.values():
+            self._close_active(log)
+
+    async def _drain(self) -> None:
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get per-agent sizes and fsync and compaction counters."""
+        return {
+            "fsyncs": self.fsyncs,
+            "compactions": self.compactions,
+            "agents": {
+                name: {
+                    "checkpoints": len(log.index),
+                    "segments": len(log.segment_sizes),
+                    "bytes": sum(log.segment_sizes.values()),
+                    "dead_bytes": sum(log.dead_bytes.values()),
+                }
+                for name, log in self._logs.items()
+            },
+        }
+
+
+def _fsync_all(descriptors: list[int]) -> None:
+    for fd in descriptors:
+        os.fsync(fd)
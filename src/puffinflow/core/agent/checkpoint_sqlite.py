@@ -0,0 +1,262 @@
+"""SQLite storage for agent checkpoints."""
+
+import asyncio
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .checkpoint import AgentCheckpoint, CheckpointDelta
+from .checkpoint_codec import CheckpointCodec, is_encoded_checkpoint
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    agent_name TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (agent_name, checkpoint_id)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_agent_timestamp
+    ON checkpoints (agent_name, timestamp);
+"""
+
+_INSERT = "INSERT INTO checkpoints VALUES (?, ?, ?, ?, ?)"
+_DELETE = "DELETE FROM checkpoints WHERE agent_name = ? AND checkpoint_id = ?"
+_LATEST = (
+    "SELECT data FROM checkpoints WHERE agent_name = ? "
+    "ORDER BY timestamp DESC, number DESC LIMIT 1"
+)
+
+
+class SQLiteCheckpointStorage:
+    """Checkpoint storage for many agents in one SQLite database file.
+
+    The database runs in WAL mode, so loads never wait for writes. Saves and
+    deletes go through an asyncio queue to a single writer, which commits
+    up to ``batch_size`` queued operations from any number of agents in one
+    transaction. Checkpoints are pickled, or encoded with ``codec`` when
+    given, and looked up through an index on ``(agent_name, timestamp)``.
+
+    After each batch, agents that saved checkpoints keep at most
+    ``max_checkpoints`` of them and none older than ``max_age`` seconds.
+    Retention does not follow delta chains, so with a ``DeltaCheckpointer``
+    keep at least ``compact_every`` checkpoints per agent.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = "./checkpoints.db",
+        batch_size: int = 256,
+        max_checkpoints: Optional[int] = None,
+        max_age: Optional[float] = None,
+        codec: Optional[CheckpointCodec] = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(f"Invalid batch_size: {batch_size}. Must be at least 1")
+        if max_checkpoints is not None and max_checkpoints < 1:
+            raise ValueError(
+                f"Invalid max_checkpoints: {max_checkpoints}. Must be at least 1"
+            )
+        if max_age is not None and max_age <= 0:
+            raise ValueError(f"Invalid max_age: {max_age}. Must be positive")
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.max_checkpoints = max_checkpoints
+        self.max_age = max_age
+        self.codec = codec
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # The writer connection is only used by the writer task, one batch at
+        # a time; loads share a second connection
+        self._writer_db = self._connect()
+        self._writer_db.executescript(_SCHEMA)
+        self._reader_db = self._connect()
+        self._reader_lock = threading.Lock()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._last_number: dict[str, int] = {}
+
+        self.batches = 0
+        self.writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # CheckpointStorage protocol
+    async def save_checkpoint(
+        self, agent_name: str, checkpoint: Union[AgentCheckpoint, CheckpointDelta]
+    ) -> str:
+        """Queue a checkpoint insert and wait for its batch to commit."""
+        last = self._last_number.get(agent_name)
+        if last is None:
+            row = await self._read(
+                "SELECT MAX(number) FROM checkpoints WHERE agent_name = ?",
+                (agent_name,),
+            )
+            # Another save of this agent may have numbered a checkpoint
+            # during the read
+            last = max(row[0][0] or 0, self._last_number.get(agent_name, 0))
+        # Checkpoints taken within the same second get the next free ID
+        number = max(int(checkpoint.timestamp), last + 1)
+        self._last_number[agent_name] = number
+        checkpoint_id = f"checkpoint_{number}"
+        if self.codec is not None:
+            data = self.codec.encode(checkpoint)
+        else:
+            data = pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+        await self._submit(
+            (_INSERT, (agent_name, checkpoint_id, number, checkpoint.timestamp, data))
+        )
+        return checkpoint_id
+
+    async def load_checkpoint(
+        self, agent_name: str, checkpoint_id: Optional[str] = None
+    ) -> Optional[Union[AgentCheckpoint, CheckpointDelta]]:
+        """Load a checkpoint by ID, or the agent's latest one."""
+        if checkpoint_id is None:
+            rows = await self._read(_LATEST, (agent_name,))
+        else:
+            rows = await self._read(
+                "SELECT data FROM checkpoints "
+                "WHERE agent_name = ? AND checkpoint_id = ?",
+                (agent_name, checkpoint_id),
+            )
+        if not rows:
+            return None
+        data = rows[0][0]
+        try:
+            # Rows written before a codec was configured stay pickled
+            if self.codec is not None and is_encoded_checkpoint(data):
+                return self.codec.decode(data)
+            checkpoint: Union[AgentCheckpoint, CheckpointDelta] = pickle.loads(data)
+            return checkpoint
+        except Exception as e:
+            logger.error(f"Failed to load checkpoint {agent_name}/{checkpoint_id}: {e}")
+            return None
+
+    async def list_checkpoints(self, agent_name: str) -> list[str]:
+        """List the agent's checkpoint IDs, oldest first."""
+        rows = await self._read(
+            "SELECT checkpoint_id FROM checkpoints WHERE agent_name = ? "
+            "ORDER BY timestamp, number",
+            (agent_name,),
+        )
+        return [row[0] for row in rows]
+
+    async def delete_checkpoint(self, agent_name: str, checkpoint_id: str) -> bool:
+        """Queue a checkpoint delete and report whether a row was removed."""
+        removed: int = await self._submit((_DELETE, (agent_name, checkpoint_id)))
+        return removed > 0
+
+    # Reads
+    async def _read(self, query: str, params: tuple) -> list[tuple]:
+        return await asyncio.to_thread(self._read_sync, query, params)
+
+    def _read_sync(self, query: str, params: tuple) -> list[tuple]:
+        with self._reader_lock:
+            return self._reader_db.execute(query, params).fetchall()
+
+    # Batched writes
+    async def _submit(self, operation: tuple[str, tuple]) -> Any:
+        """Queue a write and wait for the writer to commit it."""
+        loop = asyncio.get_running_loop()
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer = loop.create_task(self._write_batches(self._queue))
+        assert self._queue is not None
+        done = loop.create_future()
+        await self._queue.put((operation, done))
+        return await done
+
+    async def _write_batches(self, queue: asyncio.Queue) -> None:
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    # Commit what was queued before close() and stop
+                    stopping = True
+                    break
+                batch.append(item)
+            operations = [operation for operation, _ in batch]
+            try:
+                results = await asyncio.to_thread(self._commit, operations)
+            except Exception as e:
+                logger.error(f"Failed to write checkpoint batch: {e}")
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            self.batches += 1
+            self.writes += len(batch)
+            for (_, done), result in zip(batch, results):
+                if not done.done():
+                    done.set_result(result)
+
+    def _commit(self, operations: list[tuple[str, tuple]]) -> list[int]:
+        """Apply operations and retention in one transaction."""
+        db = self._writer_db
+        results = []
+        saved_by = set()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for query, params in operations:
+                results.append(db.execute(query, params).rowcount)
+                if query == _INSERT:
+                    saved_by.add(params[0])
+            for agent_name in saved_by:
+                self._apply_retention(db, agent_name)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return results
+
+    def _apply_retention(self, db: sqlite3.Connection, agent_name: str) -> None:
+        if self.max_age is not None:
+            db.execute(
+                "DELETE FROM checkpoints WHERE agent_name = ? AND timestamp < ?",
+                (agent_name, time.time() - self.max_age),
+            )
+        if self.max_checkpoints is not None:
+            db.execute(
+                "DELETE FROM checkpoints WHERE agent_name = ? AND checkpoint_id IN ("
+                "SELECT checkpoint_id FROM checkpoints WHERE agent_name = ? "
+                "ORDER BY timestamp DESC, number DESC LIMIT -1 OFFSET ?)",
+                (agent_name, agent_name, self.max_checkpoints),
+            )
+
+    async def close(self) -> None:
+        """Commit queued writes and close the database connections."""
+        if self._writer is not None and not self._writer.done():
+            assert self._queue is not None
+            await self._queue.put(None)
+            await self._writer
+        self._writer = None
+        self._writer_db.close()
+        self._reader_db.close()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get the number of committed batches and writes."""
+        return {
+            "path": str(self.path),
+            "batches": self.batches,
+            "writes": self.writes,
+            "max_checkpoints": self.max_checkpoints,
+            "max_age": self.max_age,
+        }
@@ -3,7 +3,10 @@
 import asyncio
 import contextlib
 import time
-from typing import Any, Callable, Optional, TypeVar, Union
+from collections.abc import Iterator, MutableMapping
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union
+
+from .context_cache import ContextCache
 
 try:
     from pydantic import BaseModel as PydanticBaseModel
@@ -23,6 +26,9 @@ except ImportError:
 
 from typing import Protocol, runtime_checkable
 
+if TYPE_CHECKING:
+    from .streaming import StreamReader
+
 _PBM_T = TypeVar("_PBM_T", bound=_PBM)
 
 
@@ -41,6 +47,244 @@ class StateType:
     UNTYPED = "untyped"
 
 
+class SharedStateOverlay(MutableMapping[str, Any]):
+    """Copy-on-write view of a shared state for a single state execution.
+
+    Reads fall through to the base dictionary and writes go to a private
+    delta, so concurrent states never see each other's partial updates.
+    The first write to a key records the key's version; :meth:`commit`
+    merges the delta into the base and bumps the versions of every written
+    key, which lets the caller detect keys another state committed in the
+    meantime. Once committed or discarded the overlay writes through.
+    """
+
+    __slots__ = ("_closed", "_deleted", "_delta", "_write_versions", "base", "versions")
+
+    def __init__(
+        self, base: dict[str, Any], versions: Optional[dict[str, int]] = None
+    ) -> None:
+        self.base = base
+        self.versions = versions if versions is not None else {}
+        self._delta: dict[str, Any] = {}
+        self._deleted: set[str] = set()
+        self._write_versions: dict[str, int] = {}
+        self._closed = False
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._delta:
+            return self._delta[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        return self.base[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._delta:
+            return self._delta[key]
+        if key in self._deleted:
+            return default
+        return self.base.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._delta or (key not in self._deleted and key in self.base)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self._closed:
+            self.base[key] = value
+            self.versions[key] = self.versions.get(key, 0) + 1
+            return
+        if key not in self._write_versions:
+            self._write_versions[key] = self.versions.get(key, 0)
+        self._deleted.discard(key)
+        self._delta[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self._closed:
+            del self.base[key]
+            self.versions[key] = self.versions.get(key, 0) + 1
+            return
+        if key not in self:
+            raise KeyError(key)
+        if key not in self._write_versions:
+            self._write_versions[key] = self.versions.get(key, 0)
+        self._delta.pop(key, None)
+        if key in self.base:
+            self._deleted.add(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._delta
+        for key in self.base:
+            if key not in self._delta and key not in self._deleted:
+                yield key
+
+    def __len__(self) -> int:
+        added = sum(1 for key in self._delta if key not in self.base)
+        removed = sum(1 for key in self._deleted if key in self.base)
+        return len(self.base) + added - removed
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the overlay holds uncommitted writes or deletions."""
+        return bool(self._write_versions)
+
+    def pending(self, prefix: str) -> tuple[dict[str, Any], list[str]]:
+        """Uncommitted writes and deletions of keys starting with ``prefix``."""
+        return (
+            {
+                key: value
+                for key, value in self._delta.items()
+                if key.startswith(prefix)
+            },
+            [key for key in self._deleted if key.startswith(prefix)],
+        )
+
+    @property
+    def written_keys(self) -> set[str]:
+        """Keys written or deleted through this overlay since it was opened."""
+        return set(self._write_versions)
+
+    def changes(self) -> tuple[dict[str, Any], set[str]]:
+        """Uncommitted writes as values set and keys deleted."""
+        return dict(self._delta), set(self._deleted)
+
+    def conflicts(self) -> list[str]:
+        """Keys this overlay wrote that another writer committed meanwhile."""
+        return [
+            key
+            for key, version in self._write_versions.items()
+            if self.versions.get(key, 0) != version
+        ]
+
+    def commit(self) -> None:
+        """Merge the delta into the base and bump the written key versions."""
+        for key in self._deleted:
+            self.base.pop(key, None)
+        self.base.update(self._delta)
+        for key in self._write_versions:
+            self.versions[key] = self.versions.get(key, 0) + 1
+        self.discard()
+
+    def discard(self) -> None:
+        """Drop uncommitted writes and switch to writing through."""
+        self._delta.clear()
+        self._deleted.clear()
+        self._write_versions.clear()
+        self._closed = True
+
+    @property
+    def closed(self) -> bool:
+        """Whether the overlay has been committed or discarded."""
+        return self._closed
+
+
+class ContextIndex:
+    """Namespaced views of the reserved keys of a shared state dictionary.
+
+    Constants, secrets, metadata, outputs and typed and validated variable
+    types are persisted in ``shared_state`` under reserved prefixes. The
+    index keeps each namespace decoded in its own dictionary, plus the set
+    of reserved keys, so contexts sharing it can tell variables from
+    reserved entries without rescanning the shared state. The index only
+    holds committed entries: contexts writing straight to the shared state
+    update it in place, while writes to a :class:`SharedStateOverlay` are
+    recorded by the agent when it commits the overlay. Other code writing
+    reserved keys to the shared state must :meth:`observe` them, as the
+    index is only rebuilt when bound to a different shared state dictionary.
+    Cached values are kept in a :class:`ContextCache` instead, which may be
+    shared with other indexes.
+    """
+
+    __slots__ = (
+        "_source",
+        "cache",
+        "constants",
+        "metadata",
+        "outputs",
+        "reserved",
+        "secrets",
+        "typed_var_types",
+        "validated_types",
+    )
+
+    def __init__(self, cache: Optional[ContextCache] = None) -> None:
+        self.constants: dict[str, Any] = {}
+        self.secrets: dict[str, Any] = {}
+        self.metadata: dict[str, Any] = {}
+        self.typed_var_types: dict[str, type] = {}
+        self.validated_types: dict[str, type] = {}
+        # Cached values live in the cache itself; legacy cache entries found
+        # in a shared state are loaded into it
+        self.cache = cache if cache is not None else ContextCache()
+        self.outputs: dict[str, Any] = {}
+        # Shared state keys of every entry held in a section
+        self.reserved: set[str] = set()
+        self._source: Optional[MutableMapping[str, Any]] = None
+
+    def _sections(self) -> tuple[dict[str, Any], ...]:
+        return (
+            self.constants,
+            self.secrets,
+            self.metadata,
+            self.typed_var_types,
+            self.validated_types,
+            self.outputs,
+        )
+
+    def _section(self, key: str) -> Optional[tuple[Any, str]]:
+        """Get the index section and original key for a reserved key."""
+        if key.startswith("const_"):
+            return self.constants, key[6:]
+        if key.startswith("secret_"):
+            return self.secrets, key[7:]
+        if not key.startswith("_meta_"):
+            return None
+        if key.startswith(Context._META_TYPED):
+            return self.typed_var_types, key[len(Context._META_TYPED) :]
+        if key.startswith(Context._META_VALIDATED):
+            return self.validated_types, key[len(Context._META_VALIDATED) :]
+        if key.startswith(Context._META_METADATA):
+            return self.metadata, key[len(Context._META_METADATA) :]
+        if key.startswith(Context._META_CACHE):
+            return self.cache, key[len(Context._META_CACHE) :]
+        if key.startswith(Context._META_OUTPUT):
+            return self.outputs, key[len(Context._META_OUTPUT) :]
+        return None
+
+    def bind(self, shared_state: MutableMapping[str, Any]) -> None:
+        """Attach the index to a shared state, rebuilding it if it changed."""
+        # Overlays of the bound shared state share its index
+        if isinstance(shared_state, SharedStateOverlay):
+            shared_state = shared_state.base
+        if shared_state is not self._source:
+            self.rebuild(shared_state)
+
+    def rebuild(self, shared_state: MutableMapping[str, Any]) -> None:
+        """Rebuild all sections with a single scan of the shared state."""
+        for section in self._sections():
+            section.clear()
+        self.reserved.clear()
+        for key, value in shared_state.items():
+            self.observe(key, value)
+        self._source = shared_state
+
+    def reserves(self, key: str) -> bool:
+        """Whether a shared state key belongs to an index section."""
+        return self._section(key) is not None
+
+    def observe(self, key: str, value: Any) -> None:
+        """Record a shared state write."""
+        section = self._section(key)
+        if section is not None:
+            section[0][section[1]] = value
+            self.reserved.add(key)
+
+    def forget(self, key: str) -> None:
+        """Record a shared state deletion."""
+        section = self._section(key)
+        if section is not None:
+            section[0].pop(section[1], None)
+            self.reserved.discard(key)
+
+
 class Context:
     """Context for agent state management with rich content support."""
 
@@ -51,45 +295,93 @@ class Context:
     _META_OUTPUT = "_meta_output_"
     _IMMUTABLE_PREFIXES = ("const_", "secret_")
 
-    def __init__(self, shared_state: dict[str, Any], cache_ttl: int = 300) -> None:
+    def __init__(
+        self,
+        shared_state: MutableMapping[str, Any],
+        cache_ttl: int = 300,
+        index: Optional[ContextIndex] = None,
+    ) -> None:
         self.shared_state = shared_state if shared_state is not None else {}
         self.cache_ttl = cache_ttl
         self._typed_data: dict[str, Any] = {}
-        self._typed_var_types: dict[str, type] = {}
-        self._validated_types: dict[str, type] = {}
-        self._cache: dict[str, tuple] = {}  # (value, expiry_time)
-        self._outputs: dict[str, Any] = {}
         self._metadata: dict[str, Any] = {}
         self._metrics: dict[str, Union[int, float]] = {}
-        self._restore_metadata()
+        self._streams: dict[str, StreamReader] = {}
+        # Deadline timestamp of the agent run, if it has a timeout
+        self.deadline: Optional[float] = None
+
+        # A shared index is already up to date, so creating the context does
+        # not have to scan the shared state
+        self._index = index if index is not None else ContextIndex()
+        if index is None:
+            self._restore_metadata()
+        else:
+            index.bind(self.shared_state)
+
+    @property
+    def _cache(self) -> ContextCache:
+        """Cache of values set with :meth:`set_cached`."""
+        return self._index.cache
+
+    @property
+    def _overlay(self) -> Optional[SharedStateOverlay]:
+        """The open overlay holding this state's uncommitted writes, if any."""
+        state = self.shared_state
+        if isinstance(state, SharedStateOverlay) and not state.closed:
+            return state
+        return None
+
+    def _observe(self, key: str, value: Any) -> None:
+        # Writes to an overlay reach the index when the agent commits it, so
+        # concurrent states never see them early
+        if self._overlay is None:
+            self._index.observe(key, value)
+
+    def _forget(self, key: str) -> None:
+        if self._overlay is None:
+            self._index.forget(key)
+
+    def _view(self, prefix: str, section: dict[str, Any]) -> dict[str, Any]:
+        """An index section with this state's uncommitted writes applied."""
+        overlay = self._overlay
+        if overlay is None or not overlay.dirty:
+            return section
+        written, deleted = overlay.pending(prefix)
+        if not written and not deleted:
+            return section
+        view = dict(section)
+        size = len(prefix)
+        for key in deleted:
+            view.pop(key[size:], None)
+        for key, value in written.items():
+            view[key[size:]] = value
+        return view
+
+    @property
+    def _typed_var_types(self) -> dict[str, Any]:
+        return self._view(self._META_TYPED, self._index.typed_var_types)
+
+    @property
+    def _validated_types(self) -> dict[str, Any]:
+        return self._view(self._META_VALIDATED, self._index.validated_types)
+
+    @property
+    def _outputs(self) -> dict[str, Any]:
+        return self._view(self._META_OUTPUT, self._index.outputs)
 
     def _restore_metadata(self) -> None:
         """Restore metadata from shared state."""
-        # Restore typed data metadata
-        typed_keys = [k for k in self.shared_state if k.startswith(self._META_TYPED)]
-        for k in typed_keys:
-            orig = k[len(self._META_TYPED) :]
-            self._typed_var_types[orig] = self.shared_state[k]
-
-        # Restore validated data metadata
-        validated_keys = [
-            k for k in self.shared_state if k.startswith(self._META_VALIDATED)
-        ]
-        for k in validated_keys:
-            orig = k[len(self._META_VALIDATED) :]
-            self._validated_types[orig] = self.shared_state[k]
-
-        # Restore cache data
-        cache_keys = [k for k in self.shared_state if k.startswith(self._META_CACHE)]
-        for k in cache_keys:
-            orig = k[len(self._META_CACHE) :]
-            self._cache[orig] = self.shared_state[k]
-
-        # Restore output data
-        output_keys = [k for k in self.shared_state if k.startswith(self._META_OUTPUT)]
-        for k in output_keys:
-            orig = k[len(self._META_OUTPUT) :]
-            self._outputs[orig] = self.shared_state[k]
+        self._index.rebuild(self.shared_state)
+
+    def _reset(self, shared_state: MutableMapping[str, Any]) -> None:
+        """Prepare a recycled context for another state execution."""
+        self.shared_state = shared_state
+        self._typed_data.clear()
+        self._metadata.clear()
+        self._metrics.clear()
+        self._streams = {}
+        self.deadline = None
+        self._index.bind(shared_state)
 
     @staticmethod
     def _now() -> float:
@@ -103,13 +395,14 @@ class Context:
 
     def _guard_reserved(self, key: str) -> None:
         """Guard against reserved key prefixes."""
-        if any(key.startswith(prefix) for prefix in self._IMMUTABLE_PREFIXES):
+        if key.startswith(self._IMMUTABLE_PREFIXES):
             raise ValueError(f"Cannot modify reserved key: {key}")
 
     def _persist_meta(self, prefix: str, key: str, cls: type) -> None:
         """Persist metadata to shared state."""
         meta_key = f"{prefix}{key}"
         self.shared_state[meta_key] = cls
+        self._observe(meta_key, cls)
 
     # Basic state management
     def set_state(self, key: str, value: Any) -> None:
@@ -129,7 +422,6 @@ class Context:
             raise TypeError(f"Value must be a Pydantic model, got {type(value)}")
 
         self._typed_data[key] = value
-        self._typed_var_types[key] = type(value)
         self._persist_meta(self._META_TYPED, key, type(value))
 
     def get_typed(self, key: str, expected: type[_PBM_T]) -> Optional[_PBM_T]:
@@ -158,7 +450,7 @@ class Context:
     # Variable management (free variables)
     def set_variable(self, key: str, value: Any) -> None:
         """Set a variable in shared state."""
-        if any(key.startswith(prefix) for prefix in self._IMMUTABLE_PREFIXES):
+        if key.startswith(self._IMMUTABLE_PREFIXES):
             raise ValueError(f"Cannot set variable with reserved prefix: {key}")
         self.shared_state[key] = value
 
@@ -168,21 +460,16 @@ class Context:
 
     def get_variable_keys(self) -> set[str]:
         """Get all variable keys, excluding reserved prefixes."""
-        return {
-            k
-            for k in self.shared_state
-            if not any(k.startswith(prefix) for prefix in self._IMMUTABLE_PREFIXES)
-            and not k.startswith(self._META_TYPED)
-            and not k.startswith(self._META_VALIDATED)
-            and not k.startswith(self._META_METADATA)
-            and not k.startswith(self._META_CACHE)
-            and not k.startswith(self._META_OUTPUT)
-        }
+        keys = self.shared_state.keys() - self._index.reserved
+        overlay = self._overlay
+        if overlay is not None and overlay.dirty:
+            keys -= {key for key in overlay.written_keys if self._index.reserves(key)}
+        return set(keys)
 
     # Typed variables (with type consistency checking)
     def set_typed_variable(self, key: str, value: Any) -> None:
         """Set a typed variable with type consistency checking."""
-        if any(key.startswith(prefix) for prefix in self._IMMUTABLE_PREFIXES):
+        if key.startswith(self._IMMUTABLE_PREFIXES):
             raise ValueError(f"Cannot set typed variable with reserved prefix: {key}")
 
         current_cls = self._typed_var_types.get(key)
@@ -192,10 +479,8 @@ class Context:
             )
 
         self.shared_state[key] = value
-        if key not in self._typed_var_types:
-            cls = type(value)
-            self._typed_var_types[key] = cls
-            self._persist_meta(self._META_TYPED, key, cls)
+        if current_cls is None:
+            self._persist_meta(self._META_TYPED, key, type(value))
 
     def get_typed_variable(
         self, key: str, expected: Optional[type[Any]] = None
@@ -225,7 +510,6 @@ class Context:
             )
 
         self.shared_state[key] = value
-        self._validated_types[key] = type(value)
         self._persist_meta(self._META_VALIDATED, key, type(value))
 
     def get_validated_data(self, key: str, expected: type[_PBM_T]) -> Optional[_PBM_T]:
@@ -247,6 +531,7 @@ class Context:
         if full in self.shared_state:
             raise ValueError(f"Immutable key {key} already exists")
         self.shared_state[full] = value
+        self._observe(full, value)
 
     def set_constant(self, key: str, value: Any) -> None:
         """Set a constant value (immutable)."""
@@ -269,13 +554,13 @@ class Context:
     # Output management
     def set_output(self, key: str, value: Any) -> None:
         """Set an output value."""
-        self._outputs[key] = value
-        # Persist to shared state
-        self.shared_state[f"{self._META_OUTPUT}{key}"] = value
+        full = f"{self._META_OUTPUT}{key}"
+        self.shared_state[full] = value
+        self._observe(full, value)
 
     def get_output(self, key: str, default: Any = None) -> Any:
         """Get an output value."""
-        return self._outputs.get(key, default)
+        return self.shared_state.get(f"{self._META_OUTPUT}{key}", default)
 
     def get_output_keys(self) -> set[str]:
         """Get all output keys."""
@@ -290,7 +575,9 @@ class Context:
         """Set metadata value."""
         self._metadata[key] = value
         # Also persist to shared state for cross-agent access
-        self.shared_state[f"{self._META_METADATA}{key}"] = value
+        full = f"{self._META_METADATA}{key}"
+        self.shared_state[full] = value
+        self._observe(full, value)
 
     def get_metadata(self, key: str, default: Any = None) -> Any:
         """Get metadata value."""
@@ -304,11 +591,9 @@ class Context:
         """Get all metadata."""
         result = self._metadata.copy()
         # Add shared metadata
-        for key, value in self.shared_state.items():
-            if key.startswith(self._META_METADATA):
-                orig_key = key[len(self._META_METADATA) :]
-                if orig_key not in result:
-                    result[orig_key] = value
+        shared = self._view(self._META_METADATA, self._index.metadata)
+        for key, value in shared.items():
+            result.setdefault(key, value)
         return result
 
     # Metrics management
@@ -338,42 +623,15 @@ class Context:
             ttl = self.cache_ttl
 
         expiry_time = self._now() + ttl if ttl > 0 else self._now() - 1
-        cache_entry = (value, expiry_time)
-        self._cache[key] = cache_entry
-        # Persist to shared state
-        self.shared_state[f"{self._META_CACHE}{key}"] = cache_entry
+        self._cache.put(key, value, expiry_time)
 
     def get_cached(self, key: str, default: Any = None) -> Any:
         """Get a cached value, respecting TTL."""
-        if key not in self._cache:
-            return default
-
-        value, expiry_time = self._cache[key]
-        if self._now() > expiry_time:
-            del self._cache[key]
-            # Also remove from shared state
-            shared_key = f"{self._META_CACHE}{key}"
-            if shared_key in self.shared_state:
-                del self.shared_state[shared_key]
-            return default
-
-        return value
+        return self._cache.get(key, default)
 
     def clear_expired_cache(self) -> int:
         """Clear expired cache entries and return count cleared."""
-        now = self._now()
-        expired_keys = [
-            key for key, (_, expiry_time) in self._cache.items() if now > expiry_time
-        ]
-
-        for key in expired_keys:
-            del self._cache[key]
-            # Also remove from shared state
-            shared_key = f"{self._META_CACHE}{key}"
-            if shared_key in self.shared_state:
-                del self.shared_state[shared_key]
-
-        return len(expired_keys)
+        return self._cache.expire(self._now())
 
     # State management and cleanup
     def remove_state(self, key: str, state_type: str = StateType.ANY) -> bool:
@@ -392,7 +650,7 @@ class Context:
                 del self._typed_data[key]
                 removed = True
             if key in self._typed_var_types:
-                del self._typed_var_types[key]
+                self._remove_type(key)
                 removed = True
 
         return removed
@@ -400,20 +658,37 @@ class Context:
     def clear_state(self, state_type: str = StateType.ANY) -> None:
         """Clear state data by type."""
         if state_type in (StateType.ANY, StateType.UNTYPED):
-            # Clear non-reserved keys from shared state
-            keys_to_remove = [
-                k
-                for k in self.shared_state
-                if not any(k.startswith(prefix) for prefix in self._IMMUTABLE_PREFIXES)
-                and not k.startswith(self._META_TYPED)
-                and not k.startswith(self._META_VALIDATED)
-            ]
+            # Clear variables, metadata, cache entries and outputs, keeping
+            # constants, secrets and variable types
+            keys_to_remove = list(self.get_variable_keys())
+            for prefix, section in (
+                (
+                    self._META_METADATA,
+                    self._view(self._META_METADATA, self._index.metadata),
+                ),
+                (self._META_OUTPUT, self._outputs),
+            ):
+                keys_to_remove.extend(f"{prefix}{key}" for key in section)
+            keys_to_remove.extend(
+                key for key in self._index.reserved if key.startswith(self._META_CACHE)
+            )
+            self._cache.clear()
             for key in keys_to_remove:
-                del self.shared_state[key]
+                if key in self.shared_state:
+                    del self.shared_state[key]
+                    self._forget(key)
 
         if state_type in (StateType.ANY, StateType.TYPED):
             self._typed_data.clear()
-            self._typed_var_types.clear()
+            for key in list(self._typed_var_types):
+                self._remove_type(key)
+
+    def _remove_type(self, key: str) -> None:
+        """Forget the recorded type of a typed variable."""
+        meta_key = f"{self._META_TYPED}{key}"
+        if meta_key in self.shared_state:
+            del self.shared_state[meta_key]
+        self._forget(meta_key)
 
     def get_keys(self, state_type: str = StateType.ANY) -> set[str]:
         """Get keys by state type."""
@@ -427,6 +702,29 @@ class Context:
 
         return keys
 
+    # Streaming
+    def stream(self, key: str) -> "StreamReader":
+        """Iterate over the items a streaming dependency yields.
+
+        Only states added with ``streaming=True`` get streams, one for each
+        dependency whose function is an async generator. Items arrive as the
+        producer yields them; iteration ends when the producer finishes.
+
+        Raises:
+            ValueError: If no stream named ``key`` is available to this state.
+        """
+        reader = self._streams.get(key)
+        if reader is None:
+            raise ValueError(f"No stream '{key}' is available to this state")
+        return reader
+
+    # Deadlines
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the run's deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
     # Human-in-the-loop functionality
     async def human_in_the_loop(
         self,
@@ -481,8 +779,8 @@ class Context:
             "metrics": len(self._metrics),
             "typed_data": len(self._typed_data),
             "cached_items": len(self._cache),
-            "constants": len([k for k in self.shared_state if k.startswith("const_")]),
-            "secrets": len([k for k in self.shared_state if k.startswith("secret_")]),
+            "constants": len(self._index.constants),
+            "secrets": len(self._index.secrets),
         }
 
     def export_content(self, include_secrets: bool = False) -> dict[str, Any]:
@@ -496,19 +794,13 @@ class Context:
         }
 
         # Add constants
-        constants = {
-            k[6:]: v for k, v in self.shared_state.items() if k.startswith("const_")
-        }
+        constants = dict(self._index.constants)
         if constants:
             content["constants"] = constants
 
         # Add secrets if requested
         if include_secrets:
-            secrets = {
-                k[7:]: v
-                for k, v in self.shared_state.items()
-                if k.startswith("secret_")
-            }
+            secrets = dict(self._index.secrets)
             if secrets:
                 content["secrets"] = secrets
 
@@ -523,7 +815,8 @@ class Context:
 
         # Import outputs
         if "outputs" in content:
-            self._outputs.update(content["outputs"])
+            for key, value in content["outputs"].items():
+                self.set_output(key, value)
 
         # Import metadata
         if "metadata" in content:
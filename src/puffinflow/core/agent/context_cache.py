@@ -0,0 +1,309 @@
+"""Bounded TTL cache behind ``Context.set_cached`` and ``get_cached``."""
+
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Any, Callable, Optional
+
+
+class _LRUOrder:
+    """Eviction order by recency of use."""
+
+    __slots__ = ("_keys",)
+
+    def __init__(self) -> None:
+        self._keys: OrderedDict[str, None] = OrderedDict()
+
+    def add(self, key: str) -> None:
+        self._keys[key] = None
+
+    def touch(self, key: str) -> None:
+        self._keys.move_to_end(key)
+
+    def remove(self, key: str) -> None:
+        del self._keys[key]
+
+    def victim(self) -> str:
+        return next(iter(self._keys))
+
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+class _LFUOrder:
+    """Eviction order by use count, least recently used among equal counts."""
+
+    __slots__ = ("_buckets", "_counts", "_min_count")
+
+    def __init__(self) -> None:
+        self._counts: dict[str, int] = {}
+        # Keys by use count; dicts keep the keys of a count in recency order
+        self._buckets: dict[int, dict[str, None]] = {}
+        self._min_count = 0
+
+    def add(self, key: str) -> None:
+        self._counts[key] = 1
+        self._buckets.setdefault(1, {})[key] = None
+        self._min_count = 1
+
+    def touch(self, key: str) -> None:
+        count = self._counts[key]
+        self._unlink(key, count)
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, {})[key] = None
+        if self._min_count == count and count not in self._buckets:
+            self._min_count = count + 1
+
+    def remove(self, key: str) -> None:
+        self._unlink(key, self._counts.pop(key))
+
+    def _unlink(self, key: str, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def victim(self) -> str:
+        if self._min_count not in self._buckets:
+            self._min_count = min(self._buckets)
+        return next(iter(self._buckets[self._min_count]))
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+
+_POLICIES: dict[str, Callable[[], Any]] = {"lru": _LRUOrder, "lfu": _LFUOrder}
+
+
+class ContextCache:
+    """TTL cache with entry and byte limits and timer wheel expiry.
+
+    Entries are ``(value, expiry_time)`` pairs. When the cache holds more
+    than ``max_entries`` entries or ``max_bytes`` bytes, the least recently
+    used (``"lru"``) or least frequently used (``"lfu"``) entries are
+    evicted. Value sizes are measured with ``sizeof`` only when a byte limit
+    is set.
+
+    Expiry is tracked in a hashed timer wheel of ``wheel_size`` slots, each
+    ``resolution`` seconds wide, so expired entries are found without
+    scanning the cache. The wheel advances whenever the cache is used and,
+    while an agent runs, from a background sweeper task. One cache can be
+    shared by several agents, for example every agent of an ``AgentTeam``.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 10_000,
+        max_bytes: Optional[int] = None,
+        policy: str = "lru",
+        resolution: float = 1.0,
+        wheel_size: int = 512,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+    ) -> None:
+        if max_entries is not None and max_entries < 1:
+            raise ValueError(f"Invalid max_entries: {max_entries}. Must be at least 1")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError(f"Invalid max_bytes: {max_bytes}. Must be at least 1")
+        if policy not in _POLICIES:
+            raise ValueError(
+                f"Unknown cache policy: {policy}. "
+                f"Available policies: {', '.join(_POLICIES)}"
+            )
+        if resolution <= 0:
+            raise ValueError(f"Invalid resolution: {resolution}. Must be positive")
+        if wheel_size < 1:
+            raise ValueError(f"Invalid wheel_size: {wheel_size}. Must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.resolution = resolution
+        self.sizeof = sizeof
+
+        # key -> (value, expiry_time, size, wheel slot)
+        self._entries: dict[str, tuple[Any, float, int, int]] = {}
+        self._order = _POLICIES[policy]()
+        self._bytes = 0
+
+        # Keys by the slot of their expiry tick. Slots before _next_tick
+        # have been swept; entries of later turns of the wheel stay in their
+        # slot until a sweep finds them due. Only occupied slots are stored,
+        # so short-lived caches do not pay for the whole wheel.
+        self.wheel_size = wheel_size
+        self._wheel: dict[int, set[str]] = {}
+        self._next_tick = self._tick_of(time.time())
+
+        self._sweeper: Optional[asyncio.Task] = None
+        self._sweeper_users = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # Mapping access to raw (value, expiry_time) entries, without counting
+    # hits or updating the eviction order
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __getitem__(self, key: str) -> tuple[Any, float]:
+        entry = self._entries[key]
+        return entry[0], entry[1]
+
+    def __setitem__(self, key: str, entry: tuple[Any, float]) -> None:
+        self.put(key, entry[0], entry[1])
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove an entry and return its ``(value, expiry_time)`` pair."""
+        if key not in self._entries:
+            return default
+        entry = self._remove(key)
+        return entry[0], entry[1]
+
+    def items(self) -> list[tuple[str, tuple[Any, float]]]:
+        """Get keys with their ``(value, expiry_time)`` pairs."""
+        return [(key, (entry[0], entry[1])) for key, entry in self._entries.items()]
+
+    # Cache operations
+    def put(self, key: str, value: Any, expiry_time: float) -> None:
+        """Store a value until ``expiry_time``, evicting entries over limits."""
+        self._advance(time.time())
+        if key in self._entries:
+            self._remove(key)
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        # Evict before inserting, so a new entry is never its own victim
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) >= self.max_entries)
+            or (self.max_bytes is not None and self._bytes + size > self.max_bytes)
+        ):
+            self._remove(self._order.victim())
+            self.evictions += 1
+
+        # Entries that are already due go into the next slot to be swept
+        slot = max(self._tick_of(expiry_time), self._next_tick) % self.wheel_size
+        self._entries[key] = (value, expiry_time, size, slot)
+        keys = self._wheel.get(slot)
+        if keys is None:
+            keys = self._wheel[slot] = set()
+        keys.add(key)
+        self._order.add(key)
+        self._bytes += size
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value that has not expired, counting a hit or a miss."""
+        now = time.time()
+        self._advance(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if now > entry[1]:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._order.touch(key)
+        self.hits += 1
+        return entry[0]
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Remove every expired entry and return how many were removed."""
+        if now is None:
+            now = time.time()
+        expired = self._advance(now)
+        # The slot of the current tick is only partly due
+        slot = self._wheel.get(self._next_tick % self.wheel_size, ())
+        due = [key for key in slot if now > self._entries[key][1]]
+        for key in due:
+            self._remove(key)
+        self.expirations += len(due)
+        return expired + len(due)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._order.clear()
+        self._bytes = 0
+        self._wheel.clear()
+
+    def _remove(self, key: str) -> tuple[Any, float, int, int]:
+        entry = self._entries.pop(key)
+        self._order.remove(key)
+        slot = self._wheel[entry[3]]
+        slot.discard(key)
+        if not slot:
+            del self._wheel[entry[3]]
+        self._bytes -= entry[2]
+        return entry
+
+    # Timer wheel
+    def _tick_of(self, timestamp: float) -> int:
+        # Clamp infinite expiry times, which never come due
+        return int(min(timestamp, sys.float_info.max) // self.resolution)
+
+    def _advance(self, now: float) -> int:
+        """Sweep the slots of every tick that ended since the last sweep."""
+        current = self._tick_of(now)
+        if current <= self._next_tick:
+            return 0
+        expired = 0
+        # After a full turn every slot has been swept once
+        last = min(current, self._next_tick + self.wheel_size)
+        for tick in range(self._next_tick, last):
+            slot = self._wheel.get(tick % self.wheel_size)
+            if slot is None:
+                continue
+            due = [key for key in slot if now > self._entries[key][1]]
+            for key in due:
+                self._remove(key)
+            expired += len(due)
+        self._next_tick = current
+        self.expirations += expired
+        return expired
+
+    # Background sweeping
+    def start_sweeper(self) -> None:
+        """Start sweeping expired entries in the background.
+
+        Calls are counted, so agents sharing the cache can each start the
+        sweeper for the duration of a run; it stops once every caller has
+        called :meth:`stop_sweeper`.
+        """
+        self._sweeper_users += 1
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    def stop_sweeper(self) -> None:
+        """Release one :meth:`start_sweeper` call."""
+        self._sweeper_users = max(0, self._sweeper_users - 1)
+        if self._sweeper_users == 0 and self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.resolution)
+            self._advance(time.time())
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get sizes and hit, miss, eviction and expiry counters."""
+        return {
+            "policy": self.policy,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,259 @@
+"""Bounded dead letter queue with indexes and an on-disk spill segment."""
+
+import json
+import logging
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .state import DeadLetter
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class DeadLetterQueue:
+    """Dead letters of an agent, capped in memory and indexed for queries.
+
+    The newest ``max_size`` letters stay in memory, indexed by state name,
+    error type and failure time. Older letters are appended as JSON lines to
+    ``spill_path`` when it is set and dropped otherwise. Spilled context
+    snapshots are serialized with ``repr`` for values JSON cannot encode.
+
+    The queue supports ``len``, iteration, indexing and ``append`` like the
+    list it replaces.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        spill_path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"Invalid max_size: {max_size}. Must be at least 1")
+        self.max_size = max_size
+        self.spill_path = Path(spill_path) if spill_path is not None else None
+
+        # Letters by insertion sequence; dicts keep insertion order
+        self._letters: dict[int, DeadLetter] = {}
+        self._next_seq = 0
+        self._by_state: dict[str, dict[int, None]] = {}
+        self._by_error_type: dict[str, dict[int, None]] = {}
+        # Sorted (failed_at, seq) pairs. Entries of removed letters are
+        # skipped on lookup and compacted away once they are the majority.
+        self._by_time: list[tuple[float, int]] = []
+        self._stale = 0
+
+        # Snapshot shared by consecutive letters while the state is unchanged
+        self._last_snapshot: dict[str, Any] = {}
+
+        self.spilled = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._letters)
+
+    def __iter__(self) -> Iterator[DeadLetter]:
+        return iter(list(self._letters.values()))
+
+    def __getitem__(self, index: int) -> DeadLetter:
+        return list(self._letters.values())[index]
+
+    def __repr__(self) -> str:
+        return f"DeadLetterQueue({list(self._letters.values())!r})"
+
+    def snapshot(self, shared_state: Mapping[str, Any]) -> dict[str, Any]:
+        """Get a shallow snapshot of a shared state for a dead letter.
+
+        When no key was added, removed or rebound since the previous
+        snapshot the same dictionary is returned, so a burst of failures
+        against an unchanged state shares one copy. Treat snapshots as
+        read-only.
+        """
+        last = self._last_snapshot
+        if len(last) == len(shared_state) and all(
+            last.get(key, _MISSING) is value for key, value in shared_state.items()
+        ):
+            return last
+        self._last_snapshot = dict(shared_state)
+        return self._last_snapshot
+
+    def append(self, letter: DeadLetter) -> None:
+        """Add a dead letter, evicting the oldest one beyond ``max_size``."""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._letters[seq] = letter
+        self._by_state.setdefault(letter.state_name, {})[seq] = None
+        self._by_error_type.setdefault(letter.error_type, {})[seq] = None
+        entry = (letter.failed_at, seq)
+        if not self._by_time or entry > self._by_time[-1]:
+            self._by_time.append(entry)
+        else:
+            insort(self._by_time, entry)
+
+        while len(self._letters) > self.max_size:
+            oldest = next(iter(self._letters))
+            evicted = self._remove(oldest)
+            if self.spill_path is not None:
+                self._spill([evicted])
+            else:
+                self.dropped += 1
+
+    def _remove(self, seq: int) -> DeadLetter:
+        letter = self._letters.pop(seq)
+        for index, key in (
+            (self._by_state, letter.state_name),
+            (self._by_error_type, letter.error_type),
+        ):
+            bucket = index[key]
+            del bucket[seq]
+            if not bucket:
+                del index[key]
+        self._stale += 1
+        if self._stale > len(self._letters):
+            self._by_time = [
+                entry for entry in self._by_time if entry[1] in self._letters
+            ]
+            self._stale = 0
+        return letter
+
+    def _spill(self, letters: Iterable[DeadLetter]) -> None:
+        assert self.spill_path is not None
+        lines = [
+            json.dumps(
+                {
+                    "state_name": letter.state_name,
+                    "agent_name": letter.agent_name,
+                    "error_message": letter.error_message,
+                    "error_type": letter.error_type,
+                    "attempts": letter.attempts,
+                    "failed_at": letter.failed_at,
+                    "timeout_occurred": letter.timeout_occurred,
+                    "context_snapshot": letter.context_snapshot,
+                },
+                default=repr,
+            )
+            + "\n"
+            for letter in letters
+        ]
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self.spilled += len(lines)
+        except OSError as e:
+            logger.warning(f"Failed to spill dead letters to {self.spill_path}: {e}")
+            self.dropped += len(lines)
+
+    def read_spilled(self) -> Iterator[DeadLetter]:
+        """Iterate over the letters spilled to disk, oldest first."""
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with self.spill_path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield DeadLetter(**json.loads(line))
+
+    def query(
+        self,
+        state_name: Optional[str] = None,
+        error_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> list[DeadLetter]:
+        """Get in-memory letters matching every given filter, oldest first.
+
+        Args:
+            state_name: Only letters of this state
+            error_type: Only letters with this exception type name
+            since: Only letters that failed at or after this timestamp
+            until: Only letters that failed at or before this timestamp
+        """
+        return [
+            self._letters[seq]
+            for seq in self._select(state_name, error_type, since, until)
+        ]
+
+    def _select(
+        self,
+        state_name: Optional[str],
+        error_type: Optional[str],
+        since: Optional[float],
+        until: Optional[float],
+    ) -> list[int]:
+        candidates: Optional[Iterable[int]] = None
+        for index, key in (
+            (self._by_state, state_name),
+            (self._by_error_type, error_type),
+        ):
+            if key is None:
+                continue
+            bucket = index.get(key, {})
+            if candidates is None:
+                candidates = bucket
+            else:
+                candidates = [seq for seq in candidates if seq in bucket]
+
+        if since is not None or until is not None:
+            low = 0 if since is None else bisect_left(self._by_time, (since, -1))
+            high = (
+                len(self._by_time)
+                if until is None
+                else bisect_right(self._by_time, (until, self._next_seq))
+            )
+            in_range = {
+                seq for _, seq in self._by_time[low:high] if seq in self._letters
+            }
+            if candidates is None:
+                return sorted(in_range)
+            candidates = [seq for seq in candidates if seq in in_range]
+
+        if candidates is None:
+            return list(self._letters)
+        return sorted(candidates)
+
+    def take(
+        self,
+        state_name: Optional[str] = None,
+        error_type: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> list[DeadLetter]:
+        """Remove and return the in-memory letters matching the filters."""
+        return [
+            self._remove(seq)
+            for seq in self._select(state_name, error_type, since, until)
+        ]
+
+    def count_by_state(self) -> dict[str, int]:
+        """Get the number of in-memory letters per state."""
+        return {name: len(bucket) for name, bucket in self._by_state.items()}
+
+    def count_by_error_type(self) -> dict[str, int]:
+        """Get the number of in-memory letters per exception type."""
+        return {name: len(bucket) for name, bucket in self._by_error_type.items()}
+
+    def clear(self) -> None:
+        """Drop every in-memory letter. The spill file is left untouched."""
+        self._letters.clear()
+        self._by_state.clear()
+        self._by_error_type.clear()
+        self._by_time.clear()
+        self._stale = 0
+        self._last_snapshot = {}
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get sizes and eviction counters."""
+        oldest = next(iter(self._letters.values()), None)
+        return {
+            "size": len(self._letters),
+            "max_size": self.max_size,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+            "by_state": self.count_by_state(),
+            "by_error_type": self.count_by_error_type(),
+            "oldest_age": time.time() - oldest.failed_at if oldest else 0.0,
+        }
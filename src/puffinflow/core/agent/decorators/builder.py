@@ -285,6 +285,36 @@ class StateBuilder:
         self._config["leak_detection"] = False
         return self
 
+    # Execution backend
+    def executor(self, name: str) -> "StateBuilder":
+        """Run the state in a thread, process or named executor pool."""
+        self._config["executor"] = name
+        return self
+
+    def in_thread(self) -> "StateBuilder":
+        """Run the state in the shared thread pool."""
+        return self.executor("thread")
+
+    def in_process(self) -> "StateBuilder":
+        """Run the state in the shared process pool."""
+        return self.executor("process")
+
+    # Result caching
+    def cached(
+        self, inputs: Optional[list[str]] = None, ttl: Optional[float] = None
+    ) -> "StateBuilder":
+        """Skip the state when its code and ``inputs`` match a cached run."""
+        self._config["cache"] = True
+        self._config["cache_inputs"] = inputs
+        self._config["cache_ttl"] = ttl
+        return self
+
+    # Streaming
+    def streaming(self, enabled: bool = True) -> "StateBuilder":
+        """Start while streaming dependencies run and consume their items."""
+        self._config["streaming"] = enabled
+        return self
+
     # NEW: Combined reliability methods
     def fault_tolerant(
         self,
@@ -8,7 +8,7 @@ from typing import Any, Callable, Optional, Union
 
 from ...coordination.primitives import PrimitiveType
 from ...resources.requirements import ResourceRequirements, ResourceType
-from ..state import Priority
+from ..state import CachePolicy, Priority
 
 
 @dataclass
@@ -37,6 +37,21 @@ class StateProfile:
     bulkhead_config: Optional[dict[str, Any]] = None
     leak_detection: bool = True  # Default enabled
 
+    # Execution backend: None (event loop), 'thread', 'process' or a named pool
+    executor: Optional[str] = None
+
+    # Start as soon as streaming dependencies start, reading their items
+    streaming: bool = False
+
+    # Skip execution when code and inputs match a cached execution
+    cache: bool = False
+    cache_inputs: Optional[list[str]] = None
+    cache_ttl: Optional[float] = None
+
+    # Checkpoint after the state when the last checkpoint is this many
+    # seconds old
+    checkpoint_interval: Optional[float] = None
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary, excluding None values."""
         import copy
@@ -389,6 +404,12 @@ class FlexibleStateDecorator:
             "bulkhead": False,
             "bulkhead_config": None,
             "leak_detection": True,
+            "executor": None,
+            "streaming": False,
+            "cache": False,
+            "cache_inputs": None,
+            "cache_ttl": None,
+            "checkpoint_interval": None,
         }
 
         # Merge defaults with provided config (only for missing keys)
@@ -423,6 +444,27 @@ class FlexibleStateDecorator:
             coord_config = self._parse_coordination_string(coordination)
             config.update(coord_config)
 
+        # Validate execution backend
+        executor = config.get("executor")
+        if executor is not None and (not isinstance(executor, str) or not executor):
+            raise ValueError(f"Invalid executor: {executor!r}")
+
+        # Validate result caching
+        cache_inputs = config.get("cache_inputs")
+        if isinstance(cache_inputs, str):
+            config["cache_inputs"] = [cache_inputs]
+        cache_ttl = config.get("cache_ttl")
+        if cache_ttl is not None and cache_ttl <= 0:
+            raise ValueError(f"Invalid cache_ttl: {cache_ttl}. Must be positive")
+
+        # Validate checkpointing
+        checkpoint_interval = config.get("checkpoint_interval")
+        if checkpoint_interval is not None and checkpoint_interval < 0:
+            raise ValueError(
+                f"Invalid checkpoint_interval: {checkpoint_interval}. "
+                f"Must not be negative"
+            )
+
         # Normalize dependencies
         depends_on = config.get("depends_on")
         if isinstance(depends_on, str):
@@ -646,6 +688,17 @@ class FlexibleStateDecorator:
             func._bulkhead_enabled = False  # type: ignore
 
         func._leak_detection_enabled = config.get("leak_detection", True)  # type: ignore
+        func._executor = config.get("executor")  # type: ignore
+        func._streaming = bool(config.get("streaming", False))  # type: ignore
+        if config.get("cache"):
+            cache_inputs = config.get("cache_inputs")
+            func._cache_policy = CachePolicy(  # type: ignore
+                inputs=tuple(cache_inputs) if cache_inputs is not None else None,
+                ttl=config.get("cache_ttl"),
+            )
+        else:
+            func._cache_policy = None  # type: ignore
+        func._checkpoint_interval = config.get("checkpoint_interval")  # type: ignore
 
         # Store metadata
         func._state_config = config  # type: ignore
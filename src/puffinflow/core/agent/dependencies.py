@@ -1,5 +1,6 @@
 """Dependency management types."""
 
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from enum import Enum
 from typing import TYPE_CHECKING, Any, Callable, Optional
@@ -55,3 +56,67 @@ class DependencyConfig:
     interval: Optional[float] = None
     timeout: Optional[float] = None
     retry_policy: Optional[dict[str, Any]] = None
+
+
+class DependencyIndex:
+    """Reverse adjacency lists and remaining-dependency counters for states.
+
+    Built once from the agent's dependency lists and updated incrementally, so
+    completing a state only touches its direct dependents instead of scanning
+    the whole graph.
+    """
+
+    __slots__ = ("dependents", "pending", "satisfied")
+
+    def __init__(self) -> None:
+        self.dependents: dict[str, Sequence[str]] = {}
+        self.pending: dict[str, int] = {}
+        self.satisfied: set[str] = set()
+
+    @classmethod
+    def build(
+        cls, dependencies: dict[str, list[str]], completed: Iterable[str] = ()
+    ) -> "DependencyIndex":
+        """Build an index from dependency lists and already completed states."""
+        index = cls()
+        index.satisfied = set(completed)
+        for state_name, deps in dependencies.items():
+            index.add_state(state_name, deps)
+        return index
+
+    def add_state(self, state_name: str, dependencies: Iterable[str]) -> None:
+        """Register a state and the states it depends on."""
+        unique_deps = set(dependencies)
+        for dep in unique_deps:
+            dependents = self.dependents.get(dep)
+            if dependents is None:
+                self.dependents[dep] = [state_name]
+            elif isinstance(dependents, list):
+                dependents.append(state_name)
+            else:
+                # Shared read-only edges from a compiled plan; copy on write
+                self.dependents[dep] = [*dependents, state_name]
+        self.pending[state_name] = sum(
+            1 for dep in unique_deps if dep not in self.satisfied
+        )
+
+    def mark_completed(self, state_name: str) -> list[str]:
+        """Record a completed state and return dependents that became ready.
+
+        Calling this again for the same state is a no-op.
+        """
+        if state_name in self.satisfied:
+            return []
+        self.satisfied.add(state_name)
+
+        unblocked = []
+        for dependent in self.dependents.get(state_name, ()):
+            remaining = self.pending.get(dependent, 0) - 1
+            self.pending[dependent] = remaining
+            if remaining == 0:
+                unblocked.append(dependent)
+        return unblocked
+
+    def is_ready(self, state_name: str) -> bool:
+        """Check whether every dependency of a state has completed."""
+        return self.pending.get(state_name, 0) <= 0
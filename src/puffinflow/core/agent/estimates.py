@@ -0,0 +1,71 @@
+"""Historical state durations and critical path estimates."""
+
+from collections.abc import Container, Iterable, Mapping
+from typing import Any
+
+
+class DurationEstimator:
+    """Exponentially weighted moving average of each state's duration.
+
+    Estimates outlive a single run, so an agent that runs repeatedly learns
+    how long its states take. States that never completed are estimated at
+    zero, which keeps critical path estimates optimistic.
+    """
+
+    def __init__(self, alpha: float = 0.3) -> None:
+        if not 0 < alpha <= 1:
+            raise ValueError(f"Invalid alpha: {alpha}. Must be in (0, 1]")
+        self.alpha = alpha
+        self.estimates: dict[str, float] = {}
+
+    def observe(self, state_name: str, seconds: float) -> None:
+        """Fold one measured duration into a state's estimate."""
+        previous = self.estimates.get(state_name)
+        if previous is None:
+            self.estimates[state_name] = seconds
+        else:
+            self.estimates[state_name] = previous + self.alpha * (seconds - previous)
+
+    def estimate(self, state_name: str) -> float:
+        """Get a state's estimated duration in seconds."""
+        return self.estimates.get(state_name, 0.0)
+
+    def upward_ranks(
+        self,
+        states: Iterable[str],
+        dependents: Mapping[str, Iterable[str]],
+        done: Container[str] = (),
+    ) -> dict[str, float]:
+        """Get the estimated time from each state's start to the end of the run.
+
+        A state's rank is its own estimate plus the largest rank among its
+        dependents, skipping states in ``done``. The largest rank is the
+        length of the critical path through the remaining work.
+        """
+        ranks: dict[str, float] = {}
+        for root in states:
+            if root in ranks or root in done:
+                continue
+            # Iterative post-order walk; the dependency graph is acyclic
+            stack = [(root, False)]
+            while stack:
+                state_name, expanded = stack.pop()
+                if state_name in ranks:
+                    continue
+                children = [
+                    child
+                    for child in dependents.get(state_name, ())
+                    if child not in done
+                ]
+                if expanded:
+                    ranks[state_name] = self.estimate(state_name) + max(
+                        (ranks[child] for child in children), default=0.0
+                    )
+                    continue
+                stack.append((state_name, True))
+                stack.extend((child, False) for child in children if child not in ranks)
+        return ranks
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get the current estimates."""
+        return {"alpha": self.alpha, "estimates": dict(self.estimates)}
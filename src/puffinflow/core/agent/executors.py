@@ -0,0 +1,260 @@
+"""Thread and process pool backends for offloading state execution."""
+
+import asyncio
+import contextlib
+import logging
+import math
+import os
+import pickle
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .checkpoint import DirtyTrackingDict
+from .context import Context
+
+logger = logging.getLogger(__name__)
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+def run_state_in_worker(
+    func: Callable, shared_state: dict[str, Any]
+) -> tuple[Any, dict[str, Any], list[str]]:
+    """Run a state function against a shared state snapshot in a worker.
+
+    Sync functions are called directly; coroutine functions get a private
+    event loop. Returns the state result together with the keys the state
+    wrote and the keys it removed, so only the changes travel back to the
+    agent. Writes are recorded rather than compared, so a value mutated in
+    place and set again is sent back too.
+    """
+    tracked = DirtyTrackingDict(shared_state)
+    context = Context(tracked)
+
+    result = func(context)
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+
+    updates = {key: tracked[key] for key in tracked.dirty}
+    removed = [key for key in tracked.removed if key in shared_state]
+    return result, updates, removed
+
+
+class StateExecutor:
+    """A pool executor with weighted slot accounting.
+
+    Each state reserves a number of slots derived from its ``cpu_units``
+    before it is submitted, so a state declaring ``cpu=4`` holds four slots
+    of the pool for as long as its worker is busy. Slots are granted in FIFO
+    order, which keeps large requests from being starved by small ones.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        executor: Executor,
+        slots: int,
+        picklable: bool = False,
+        owned: bool = False,
+    ) -> None:
+        if slots < 1:
+            raise ValueError(f"Executor '{name}' needs at least one slot")
+
+        self.name = name
+        self.executor = executor
+        self.slots = slots
+        self.picklable = picklable
+        self.owned = owned
+        self._available = slots
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+
+    @property
+    def available_slots(self) -> int:
+        """Number of slots not reserved by running states."""
+        return self._available
+
+    def slots_for(self, resources: Any) -> int:
+        """Map a state's CPU requirement to a slot count."""
+        cpu_units = getattr(resources, "cpu_units", 1.0) or 1.0
+        return max(1, min(self.slots, math.ceil(cpu_units)))
+
+    async def _acquire(self, slots: int) -> None:
+        if not self._waiters and self._available >= slots:
+            self._available -= slots
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((slots, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slots were granted just before cancellation
+                self._release(slots)
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove((slots, waiter))
+                self._grant_waiters()
+            raise
+
+    def _release(self, slots: int) -> None:
+        self._available += slots
+        self._grant_waiters()
+
+    def _grant_waiters(self) -> None:
+        while self._waiters:
+            slots, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self._available < slots:
+                break
+            self._waiters.popleft()
+            self._available -= slots
+            waiter.set_result(None)
+
+    async def run(self, func: Callable, *args: Any, slots: int = 1) -> Any:
+        """Run ``func(*args)`` in the pool once ``slots`` are available.
+
+        The slots stay reserved until the worker actually finishes, even if
+        the awaiting task is cancelled or times out first.
+        """
+        slots = max(1, min(slots, self.slots))
+        await self._acquire(slots)
+
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._release(slots)
+            raise
+
+        loop = asyncio.get_running_loop()
+
+        def _on_done(_: Any) -> None:
+            # The event loop may already be closed
+            with contextlib.suppress(RuntimeError):
+                loop.call_soon_threadsafe(self._release, slots)
+
+        future.add_done_callback(_on_done)
+        return await asyncio.wrap_future(future)
+
+    def snapshot(self, shared_state: Mapping[str, Any]) -> dict[str, Any]:
+        """Copy the shared state for a worker.
+
+        Process workers only receive entries that can be pickled; anything
+        else (locks, open handles, agent references) is left behind.
+        """
+        snapshot = dict(shared_state)
+        if not self.picklable:
+            return snapshot
+
+        try:
+            pickle.dumps(snapshot)
+            return snapshot
+        except Exception:
+            pass
+
+        filtered = {}
+        for key, value in snapshot.items():
+            try:
+                pickle.dumps(value)
+            except Exception:
+                logger.debug(
+                    f"Skipping unpicklable context entry '{key}' for "
+                    f"executor '{self.name}'"
+                )
+                continue
+            filtered[key] = value
+        return filtered
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying pool if this executor created it."""
+        if self.owned:
+            self.executor.shutdown(wait=wait)
+
+
+class ExecutorRegistry:
+    """Named execution backends available to states.
+
+    The built-in ``"thread"`` and ``"process"`` backends are created lazily
+    on first use and sized to the machine's CPU count. Additional named
+    pools can be registered with :meth:`register`.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executors: dict[str, StateExecutor] = {}
+
+    def register(
+        self,
+        name: str,
+        executor: Executor,
+        slots: Optional[int] = None,
+    ) -> StateExecutor:
+        """Register a caller-owned pool under ``name``.
+
+        Args:
+            name: Name used in ``@state(executor=...)``
+            executor: Thread or process pool to dispatch states to
+            slots: Slot capacity, defaults to the pool's worker count
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("Executor name must be a non-empty string")
+        if name in self._executors:
+            raise ValueError(f"Executor '{name}' is already registered")
+
+        if slots is None:
+            slots = getattr(executor, "_max_workers", None) or self.max_workers
+
+        state_executor = StateExecutor(
+            name,
+            executor,
+            slots,
+            picklable=isinstance(executor, ProcessPoolExecutor),
+        )
+        self._executors[name] = state_executor
+        return state_executor
+
+    def get(self, name: str) -> StateExecutor:
+        """Get an executor by name, creating built-in pools on demand."""
+        executor = self._executors.get(name)
+        if executor is not None:
+            return executor
+
+        if name == THREAD:
+            executor = StateExecutor(
+                name,
+                ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="puffinflow"
+                ),
+                self.max_workers,
+                owned=True,
+            )
+        elif name == PROCESS:
+            executor = StateExecutor(
+                name,
+                ProcessPoolExecutor(max_workers=self.max_workers),
+                self.max_workers,
+                picklable=True,
+                owned=True,
+            )
+        else:
+            raise ValueError(
+                f"Unknown executor: {name}. Use '{THREAD}', '{PROCESS}' "
+                f"or register a named pool"
+            )
+
+        self._executors[name] = executor
+        return executor
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._executors
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the pools created by this registry."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._executors.clear()
@@ -0,0 +1,261 @@
+"""Result caching that lets states with unchanged inputs skip execution."""
+
+import contextlib
+import hashlib
+import inspect
+import logging
+import pickle
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CachedEffects = tuple[Any, dict[str, Any], list[str]]
+
+
+def code_fingerprint(func: Callable) -> str:
+    """Hash a function's bytecode, constants and names.
+
+    Line numbers and file names are left out, so moving a function does not
+    invalidate its cached results while editing its body does. Values
+    captured in closures are not part of the fingerprint.
+    """
+    func = getattr(func, "__func__", func)
+    code = getattr(func, "__code__", None)
+    digest = hashlib.sha256(
+        f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', func)}".encode()
+    )
+    if code is not None:
+        _hash_code(digest, code)
+    return digest.hexdigest()
+
+
+def _hash_code(digest: Any, code: Any) -> None:
+    digest.update(code.co_code)
+    digest.update(repr((code.co_names, code.co_varnames)).encode())
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            _hash_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+class StateCache:
+    """Two-tier cache of state effects keyed by code and input hashes.
+
+    An entry holds the return value of a state together with the keys it
+    wrote and deleted, pickled so every replay gets fresh copies. Entries
+    live in an in-memory LRU tier and, when ``directory`` is set, in an
+    on-disk tier that survives restarts. Both tiers honour a TTL; the
+    memory tier is bounded by entry count and the disk tier by bytes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        directory: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"Invalid max_entries: {max_entries}. Must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._disk_sizes: Optional[OrderedDict[str, int]] = None
+        self._fingerprints: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+    def make_key(
+        self,
+        state_name: str,
+        func: Callable,
+        shared_state: Mapping[str, Any],
+        inputs: Optional[Iterable[str]] = None,
+    ) -> Optional[str]:
+        """Build the cache key for a state execution.
+
+        Args:
+            state_name: Name of the state
+            func: State function, whose code is part of the key
+            shared_state: State data visible to the execution
+            inputs: Keys the state reads; all of ``shared_state`` if None
+
+        Returns:
+            The key, or None if an input value cannot be pickled.
+        """
+        digest = hashlib.sha256(state_name.encode())
+        digest.update(self._fingerprint(func).encode())
+
+        keys = sorted(shared_state) if inputs is None else sorted(set(inputs))
+        for key in keys:
+            digest.update(b"\0" + key.encode() + b"\0")
+            if key not in shared_state:
+                digest.update(b"missing")
+                continue
+            try:
+                digest.update(
+                    pickle.dumps(shared_state[key], protocol=pickle.HIGHEST_PROTOCOL)
+                )
+            except Exception:
+                self.uncacheable += 1
+                logger.debug(f"Input '{key}' of state {state_name} is not hashable")
+                return None
+        return digest.hexdigest()
+
+    def _fingerprint(self, func: Callable) -> str:
+        target = getattr(func, "__func__", func)
+        try:
+            fingerprint = self._fingerprints.get(target)
+        except TypeError:
+            return code_fingerprint(func)
+        if fingerprint is None:
+            fingerprint = code_fingerprint(target)
+            with contextlib.suppress(TypeError):
+                self._fingerprints[target] = fingerprint
+        return fingerprint
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[CachedEffects]:
+        """Get the cached effects for a key, or None on a miss."""
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            if ttl is None or now - entry[0] <= ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                effects: CachedEffects = pickle.loads(entry[1])
+                return effects
+            del self._memory[key]
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            if ttl is None or now - entry[0] <= ttl:
+                self._remember(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                effects = pickle.loads(entry[1])
+                return effects
+            self._remove_disk(key)
+
+        self.misses += 1
+        return None
+
+    def put(
+        self, key: str, result: Any, updates: dict[str, Any], removed: Iterable[str]
+    ) -> bool:
+        """Store a state's return value and writes.
+
+        Returns:
+            Whether the effects could be pickled and were stored.
+        """
+        try:
+            payload = pickle.dumps(
+                (result, updates, list(removed)), protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except Exception as e:
+            self.uncacheable += 1
+            logger.debug(f"Skipping cache store for unpicklable effects: {e}")
+            return False
+
+        entry = (time.time(), payload)
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        self.stores += 1
+        return True
+
+    def _remember(self, key: str, entry: tuple[float, bytes]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # Disk tier
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.pkl"
+
+    def _load_disk_index(self) -> OrderedDict[str, int]:
+        if self._disk_sizes is None:
+            assert self.directory is not None
+            self.directory.mkdir(parents=True, exist_ok=True)
+            files = sorted(
+                (path.stat().st_mtime, path.stem, path.stat().st_size)
+                for path in self.directory.glob("*.pkl")
+            )
+            self._disk_sizes = OrderedDict((stem, size) for _, stem, size in files)
+        return self._disk_sizes
+
+    def _read_disk(self, key: str) -> Optional[tuple[float, bytes]]:
+        if self.directory is None or key not in self._load_disk_index():
+            return None
+        try:
+            with self._path(key).open("rb") as f:
+                entry: tuple[float, bytes] = pickle.load(f)
+            return entry
+        except Exception as e:
+            logger.warning(f"Dropping unreadable state cache entry {key}: {e}")
+            self._remove_disk(key)
+            return None
+
+    def _write_disk(self, key: str, entry: tuple[float, bytes]) -> None:
+        if self.directory is None:
+            return
+        sizes = self._load_disk_index()
+        data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            self._path(key).write_bytes(data)
+        except OSError as e:
+            logger.warning(f"Failed to write state cache entry {key}: {e}")
+            return
+
+        sizes[key] = len(data)
+        sizes.move_to_end(key)
+        total = sum(sizes.values())
+        while total > self.max_disk_bytes and len(sizes) > 1:
+            oldest = next(iter(sizes))
+            total -= sizes[oldest]
+            self._remove_disk(oldest)
+            self.evictions += 1
+
+    def _remove_disk(self, key: str) -> None:
+        if self._disk_sizes is not None:
+            self._disk_sizes.pop(key, None)
+        if self.directory is not None:
+            with contextlib.suppress(OSError):
+                self._path(key).unlink()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        if self.directory is not None:
+            for key in list(self._load_disk_index()):
+                self._remove_disk(key)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get hit, miss and eviction counters."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "uncacheable": self.uncacheable,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_sizes or ()),
+        }
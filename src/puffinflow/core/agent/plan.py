@@ -0,0 +1,165 @@
+"""Compiled, immutable workflow plans shared across agents."""
+
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .dependencies import DependencyIndex
+from .state import CachePolicy, ExecutionMode, Priority, RetryPolicy
+
+if TYPE_CHECKING:
+    from .base import Agent
+
+
+@dataclass(frozen=True)
+class PlannedState:
+    """Resolved configuration of a single state in a workflow plan."""
+
+    name: str
+    func: Callable
+    dependencies: tuple[str, ...]
+    priority: Priority
+    resources: Any
+    retry_policy: Optional[RetryPolicy]
+    max_retries: int
+    coordination_primitives: tuple[Any, ...] = ()
+    executor: Optional[str] = None
+    streaming: bool = False
+    cache: Optional[CachePolicy] = None
+    checkpoint_interval: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """Immutable compiled view of an agent's state graph.
+
+    A plan is compiled once from an agent's states and decorator metadata and
+    can be shared by reference between any number of agents. It holds
+    everything that does not change between runs: the topological order,
+    entry states, reverse edges and the resolved per-state configuration.
+    """
+
+    states: Mapping[str, PlannedState]
+    topological_order: tuple[str, ...]
+    dependents: Mapping[str, tuple[str, ...]]
+    entry_states: tuple[str, ...]
+    sequential_unreachable: frozenset[str]
+
+    @classmethod
+    def compile(cls, agent: "Agent") -> "WorkflowPlan":
+        """Compile a plan from an agent's current states.
+
+        Raises:
+            ValueError: If the state dependencies form a cycle.
+        """
+        planned: dict[str, PlannedState] = {}
+        for name, func in agent.states.items():
+            metadata = agent.state_metadata.get(name)
+            planned[name] = PlannedState(
+                name=name,
+                func=func,
+                dependencies=tuple(agent.dependencies.get(name, ())),
+                priority=metadata.priority if metadata else Priority.NORMAL,
+                resources=metadata.resources if metadata else None,
+                retry_policy=metadata.retry_policy if metadata else None,
+                max_retries=(
+                    metadata.max_retries if metadata else agent.retry_policy.max_retries
+                ),
+                coordination_primitives=(
+                    tuple(metadata.coordination_primitives) if metadata else ()
+                ),
+                executor=metadata.executor if metadata else None,
+                streaming=metadata.streaming if metadata else False,
+                cache=metadata.cache if metadata else None,
+                checkpoint_interval=(
+                    metadata.checkpoint_interval if metadata else None
+                ),
+            )
+
+        # Reverse edges, ignoring dependencies on unknown states
+        dependents: dict[str, list[str]] = {name: [] for name in planned}
+        in_degree: dict[str, int] = {}
+        for name, spec in planned.items():
+            known = {dep for dep in spec.dependencies if dep in planned}
+            in_degree[name] = len(known)
+            for dep in known:
+                dependents[dep].append(name)
+
+        # Kahn's algorithm gives the topological order and detects cycles
+        order: list[str] = []
+        ready = deque(name for name, degree in in_degree.items() if degree == 0)
+        while ready:
+            current = ready.popleft()
+            order.append(current)
+            for dependent in dependents[current]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(order) != len(planned):
+            raise ValueError(
+                "Circular dependency detected in workflow. "
+                "State dependencies form a cycle, which would prevent execution."
+            )
+
+        entry_states = tuple(
+            name for name, spec in planned.items() if not spec.dependencies
+        )
+
+        # States reachable from the entry states by following dependents
+        reachable: set[str] = set()
+        to_visit = list(entry_states)
+        while to_visit:
+            current = to_visit.pop()
+            if current in reachable:
+                continue
+            reachable.add(current)
+            to_visit.extend(dependents[current])
+
+        return cls(
+            states=MappingProxyType(planned),
+            topological_order=tuple(order),
+            dependents=MappingProxyType(
+                {name: tuple(deps) for name, deps in dependents.items()}
+            ),
+            entry_states=entry_states,
+            sequential_unreachable=frozenset(planned) - reachable,
+        )
+
+    def entry_states_for(self, execution_mode: ExecutionMode) -> list[str]:
+        """Get the states to queue first for an execution mode."""
+        if execution_mode == ExecutionMode.PARALLEL:
+            # If no entry states exist, start everything for backward compatibility
+            return list(self.entry_states or self.states)
+
+        # SEQUENTIAL: only the first entry state (or first state) runs initially
+        if self.entry_states:
+            return [self.entry_states[0]]
+        first = next(iter(self.states), None)
+        return [first] if first is not None else []
+
+    def matches(
+        self, states: Mapping[str, Callable], dependencies: Mapping[str, Any]
+    ) -> bool:
+        """Check whether the plan still describes the given state graph."""
+        if len(states) != len(self.states):
+            return False
+        for name, func in states.items():
+            spec = self.states.get(name)
+            if spec is None or spec.func is not func:
+                return False
+            if tuple(dependencies.get(name, ())) != spec.dependencies:
+                return False
+        return True
+
+    def new_dependency_index(self) -> DependencyIndex:
+        """Create a fresh dependency index for a run of this plan."""
+        index = DependencyIndex()
+        # Reverse edges are immutable tuples, so they are shared, not copied
+        index.dependents = dict(self.dependents)
+        index.pending = {
+            name: len(set(spec.dependencies)) for name, spec in self.states.items()
+        }
+        return index
@@ -0,0 +1,273 @@
+"""Ordering policies for an agent's queue of ready states."""
+
+import time
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Any, Optional, Union
+
+from .state import PrioritizedState, Priority, StateMetadata
+
+DEFAULT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+
+class QueueWaitHistogram:
+    """Fixed-bucket histogram of how long states waited in the queue."""
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_WAIT_BUCKETS) -> None:
+        self.bounds = bounds
+        # One count per upper bound plus an overflow bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a single wait."""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percentile: float) -> float:
+        """Estimate a percentile as the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        rank = percentile / 100 * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get counts per bucket and summary statistics."""
+        buckets = {str(bound): n for bound, n in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class StateScheduler:
+    """Strict priority ordering, first come first served within a priority.
+
+    A scheduler decides the sort key of each queue entry when the state is
+    queued. The agent keeps entries in a heap, so each policy only has to
+    produce keys whose order does not change while entries wait.
+    """
+
+    policy = "strict"
+    # Whether the agent should compute critical path ranks for prepare()
+    uses_ranks = False
+
+    def __init__(self) -> None:
+        self.wait_histograms: dict[str, QueueWaitHistogram] = {}
+
+    def entry(
+        self, state_name: str, metadata: StateMetadata, priority_boost: int = 0
+    ) -> PrioritizedState:
+        """Create the queue entry for a state."""
+        return PrioritizedState(
+            priority=-(metadata.priority.value + priority_boost),  # Max-heap
+            timestamp=time.time(),
+            state_name=state_name,
+            metadata=metadata,
+        )
+
+    def prepare(self, ranks: Mapping[str, float]) -> None:
+        """Receive the critical path ranks of the states of a new run.
+
+        Ranks are estimated seconds from a state's start to the end of the
+        run. Only policies with ``uses_ranks`` set make use of them.
+        """
+
+    def on_dequeue(self, entry: PrioritizedState) -> None:
+        """Record that an entry left the queue to run."""
+        priority = getattr(entry.metadata, "priority", None)
+        name = getattr(priority, "name", str(priority))
+        histogram = self.wait_histograms.get(name)
+        if histogram is None:
+            histogram = self.wait_histograms[name] = QueueWaitHistogram()
+        histogram.observe(max(0.0, time.time() - entry.timestamp))
+
+    def spawn(self) -> "StateScheduler":
+        """Create a scheduler with the same configuration and no history."""
+        return type(self)()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get the policy name and queue-wait histograms per priority."""
+        return {
+            "policy": self.policy,
+            "wait_histograms": {
+                name: histogram.to_dict()
+                for name, histogram in self.wait_histograms.items()
+            },
+        }
+
+
+class AgingScheduler(StateScheduler):
+    """Priority ordering where waiting raises a state's effective priority.
+
+    The effective priority of a queued state is its priority plus
+    ``aging_rate`` for every second it has waited. Since all queued states
+    age at the same rate, ordering by ``aging_rate * queued_at - priority``
+    is equivalent and never changes, so entries can stay in a heap.
+    """
+
+    policy = "aging"
+
+    def __init__(self, aging_rate: float = 0.1) -> None:
+        if aging_rate <= 0:
+            raise ValueError(f"Invalid aging_rate: {aging_rate}. Must be positive")
+        super().__init__()
+        self.aging_rate = aging_rate
+
+    def entry(
+        self, state_name: str, metadata: StateMetadata, priority_boost: int = 0
+    ) -> PrioritizedState:
+        queued_at = time.time()
+        return PrioritizedState(
+            priority=self.aging_rate * queued_at
+            - (metadata.priority.value + priority_boost),
+            timestamp=queued_at,
+            state_name=state_name,
+            metadata=metadata,
+        )
+
+    def spawn(self) -> "AgingScheduler":
+        return type(self)(self.aging_rate)
+
+
+class WeightedFairScheduler(StateScheduler):
+    """Weighted fair queuing across priority classes.
+
+    Each priority is a class that receives a share of launches proportional
+    to its weight while it has queued states. Entries are tagged with a
+    virtual finish time, ``max(virtual_time, last_finish[class]) + 1 /
+    weight``, and launched in tag order; the virtual time advances to the
+    start tag of each launched entry, so idle classes do not bank credit.
+    """
+
+    policy = "fair"
+
+    DEFAULT_WEIGHTS: Mapping[Priority, float] = {
+        Priority.LOW: 1.0,
+        Priority.NORMAL: 2.0,
+        Priority.HIGH: 4.0,
+        Priority.CRITICAL: 8.0,
+    }
+
+    def __init__(self, weights: Optional[Mapping[Priority, float]] = None) -> None:
+        merged = dict(self.DEFAULT_WEIGHTS)
+        if weights:
+            merged.update(weights)
+        for priority, weight in merged.items():
+            if weight <= 0:
+                raise ValueError(
+                    f"Invalid weight for {priority!r}: {weight}. Must be positive"
+                )
+        super().__init__()
+        self.weights = merged
+        self._virtual_time = 0.0
+        self._last_finish: dict[Priority, float] = {}
+
+    def _cost(self, priority: Priority) -> float:
+        return 1.0 / self.weights.get(priority, 1.0)
+
+    def entry(
+        self, state_name: str, metadata: StateMetadata, priority_boost: int = 0
+    ) -> PrioritizedState:
+        # Classes are the declared priorities; boosts do not move a state
+        # into another class
+        priority = metadata.priority
+        start = max(self._virtual_time, self._last_finish.get(priority, 0.0))
+        finish = start + self._cost(priority)
+        self._last_finish[priority] = finish
+        return PrioritizedState(
+            priority=finish,
+            timestamp=time.time(),
+            state_name=state_name,
+            metadata=metadata,
+        )
+
+    def on_dequeue(self, entry: PrioritizedState) -> None:
+        super().on_dequeue(entry)
+        priority = getattr(entry.metadata, "priority", None)
+        if isinstance(priority, Priority):
+            start = entry.priority - self._cost(priority)
+            if start > self._virtual_time:
+                self._virtual_time = start
+
+    def spawn(self) -> "WeightedFairScheduler":
+        return type(self)(self.weights)
+
+
+class CriticalPathScheduler(StateScheduler):
+    """Longest remaining path first, as in HEFT list scheduling.
+
+    A state's rank is its estimated duration plus the largest rank among
+    its dependents, using the agent's moving averages of past durations.
+    Launching the highest rank first starts long chains early, which
+    shortens the makespan of fan-out/fan-in graphs when states compete for
+    slots. Ranks are fixed for a run. States without history rank zero, and
+    priorities break ties between equal ranks.
+    """
+
+    policy = "critical_path"
+    uses_ranks = True
+
+    # Seconds of rank that one priority level is worth when breaking ties
+    PRIORITY_TIE_BREAK = 1e-9
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.ranks: dict[str, float] = {}
+
+    def prepare(self, ranks: Mapping[str, float]) -> None:
+        self.ranks = dict(ranks)
+
+    def entry(
+        self, state_name: str, metadata: StateMetadata, priority_boost: int = 0
+    ) -> PrioritizedState:
+        level = metadata.priority.value + priority_boost
+        return PrioritizedState(
+            priority=-(
+                self.ranks.get(state_name, 0.0) + level * self.PRIORITY_TIE_BREAK
+            ),
+            timestamp=time.time(),
+            state_name=state_name,
+            metadata=metadata,
+        )
+
+
+_POLICIES: dict[str, type[StateScheduler]] = {
+    StateScheduler.policy: StateScheduler,
+    AgingScheduler.policy: AgingScheduler,
+    WeightedFairScheduler.policy: WeightedFairScheduler,
+    CriticalPathScheduler.policy: CriticalPathScheduler,
+}
+
+
+def create_scheduler(policy: Union[str, StateScheduler]) -> StateScheduler:
+    """Get a scheduler from a policy name or scheduler instance.
+
+    Raises:
+        ValueError: If the policy name is unknown.
+    """
+    if isinstance(policy, StateScheduler):
+        return policy
+    scheduler_class = _POLICIES.get(policy)
+    if scheduler_class is None:
+        raise ValueError(
+            f"Invalid scheduling_policy: {policy}. "
+            f"Use one of {sorted(_POLICIES)} or a StateScheduler"
+        )
+    return scheduler_class()
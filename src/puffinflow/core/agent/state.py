@@ -24,7 +24,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .base import Agent
 
-StateResult = Union[str, list[Union[str, tuple["Agent", str]]], None]
+AgentTransition = Union[tuple["Agent", str], tuple["Agent", str, dict[str, Any]]]
+StateResult = Union[str, AgentTransition, list[Union[str, AgentTransition]], None]
 
 
 class Priority(IntEnum):
@@ -95,7 +96,8 @@ class RetryPolicy:
     dead_letter_on_max_retries: bool = True
     dead_letter_on_timeout: bool = True
 
-    async def wait(self, attempt: int) -> None:
+    def get_delay(self, attempt: int) -> float:
+        """Get the backoff delay in seconds before retry ``attempt``."""
         delay = min(
             self.initial_delay * (self.exponential_base**attempt),
             60.0,  # Max 60 seconds
@@ -103,8 +105,24 @@ class RetryPolicy:
         if self.jitter:
             delay *= 0.5 + random.random() * 0.5
         # Ensure delay is never negative
-        delay = max(0.0, delay)
-        await asyncio.sleep(delay)
+        return max(0.0, delay)
+
+    async def wait(self, attempt: int) -> None:
+        await asyncio.sleep(self.get_delay(attempt))
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Opt-in result caching for a state.
+
+    A state with a cache policy is skipped when its code and the values of
+    its ``inputs`` match an earlier execution; the recorded writes and
+    return value are replayed instead. ``inputs`` of None hashes the whole
+    shared state.
+    """
+
+    inputs: Optional[tuple[str, ...]] = None
+    ttl: Optional[float] = None
 
 
 # Dead letter data structure
@@ -136,6 +154,11 @@ class StateMetadata:
     retry_policy: Optional[RetryPolicy] = None
     priority: Priority = Priority.NORMAL
     coordination_primitives: list[Any] = field(default_factory=list)
+    executor: Optional[str] = None
+    streaming: bool = False
+    cache: Optional[CachePolicy] = None
+    # Checkpoint after the state completes when the last checkpoint is older
+    checkpoint_interval: Optional[float] = None
 
     def __post_init__(self) -> None:
         """Initialize resources if not provided."""
@@ -147,7 +170,7 @@ class StateMetadata:
 class PrioritizedState:
     """State with priority for queue management."""
 
-    priority: int
+    priority: float
     timestamp: float
     state_name: str = field(compare=False)
     metadata: StateMetadata = field(compare=False)
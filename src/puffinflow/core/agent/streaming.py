@@ -0,0 +1,114 @@
+"""Bounded item streams between streaming states and their consumers."""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, Optional
+
+_END = object()
+
+
+class StreamError(Exception):
+    """Raised to a consumer when the producing state of a stream fails."""
+
+    def __init__(self, producer: str, error: BaseException) -> None:
+        super().__init__(f"Stream from state '{producer}' failed: {error}")
+        self.producer = producer
+        self.error = error
+
+
+class StateStream:
+    """Fan-out stream of the items a streaming state yields.
+
+    Every streaming consumer known when the stream opens gets its own
+    bounded queue, so no consumer misses items that were yielded before it
+    started. Publishing waits for room in every attached queue, which
+    applies backpressure from the slowest consumer to the producer.
+    """
+
+    def __init__(self, producer: str, consumers: Iterable[str], maxsize: int) -> None:
+        self.producer = producer
+        self._queues: dict[str, asyncio.Queue] = {
+            consumer: asyncio.Queue(maxsize) for consumer in consumers
+        }
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.items_published = 0
+
+    @property
+    def consumers(self) -> set[str]:
+        """Consumers still attached to the stream."""
+        return set(self._queues)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the producer has finished."""
+        return self._closed
+
+    @property
+    def failed(self) -> bool:
+        """Whether the producer finished with an error."""
+        return self._error is not None
+
+    async def publish(self, item: Any) -> None:
+        """Send an item to every attached consumer."""
+        for queue in list(self._queues.values()):
+            await queue.put(item)
+        self.items_published += 1
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        """Mark the stream finished, optionally because the producer failed."""
+        if self._closed:
+            return
+        self._closed = True
+        self._error = error
+        for queue in self._queues.values():
+            # A full queue is drained by its reader, which then sees the
+            # closed flag instead of the end marker
+            if not queue.full():
+                queue.put_nowait(_END)
+
+    def detach(self, consumer: str) -> None:
+        """Stop delivering items to a consumer that has finished."""
+        queue = self._queues.pop(consumer, None)
+        if queue is None:
+            return
+        # Draining wakes a producer blocked on this consumer's queue
+        while not queue.empty():
+            queue.get_nowait()
+
+    def reader(self, consumer: str) -> "StreamReader":
+        """Get the async iterator over a consumer's items."""
+        if consumer not in self._queues:
+            raise ValueError(
+                f"State '{consumer}' is not a streaming consumer of "
+                f"'{self.producer}'"
+            )
+        return StreamReader(self, self._queues[consumer])
+
+
+class StreamReader:
+    """Async iterator over the items a consumer receives from a stream."""
+
+    def __init__(self, stream: StateStream, queue: asyncio.Queue) -> None:
+        self._stream = stream
+        self._queue = queue
+        self._done = False
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._done:
+            raise StopAsyncIteration
+
+        if self._queue.empty() and self._stream.closed:
+            item = _END
+        else:
+            item = await self._queue.get()
+
+        if item is _END:
+            self._done = True
+            if self._stream._error is not None:
+                raise StreamError(self._stream.producer, self._stream._error)
+            raise StopAsyncIteration
+        return item
@@ -0,0 +1,92 @@
+"""Per-phase timing of state executions kept in fixed-size ring buffers."""
+
+from array import array
+from typing import Any
+
+# Phase indexes, used directly as list indexes on the hot path
+QUEUE_WAIT = 0
+RESOURCE_ACQUIRE = 1
+COORDINATION_ACQUIRE = 2
+BODY = 3
+RESULT_HANDLING = 4
+CONTEXT_MERGE = 5
+
+PHASES = (
+    "queue_wait",
+    "resource_acquire",
+    "coordination_acquire",
+    "body",
+    "result_handling",
+    "context_merge",
+)
+
+
+class PhaseTimer:
+    """Recent durations of each stage of a state execution.
+
+    Every phase keeps its last ``capacity`` samples, in nanoseconds, in a
+    preallocated ring buffer, so recording never allocates and memory stays
+    constant however long an agent runs. Percentiles are computed from the
+    retained samples only when metrics are read.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity: {capacity}. Must be at least 1")
+        self.capacity = capacity
+        self._samples = [array("q", [0]) * capacity for _ in PHASES]
+        self._positions = [0] * len(PHASES)
+        self.counts = [0] * len(PHASES)
+
+    def record(self, phase: int, nanoseconds: int) -> None:
+        """Record one duration for a phase."""
+        position = self._positions[phase]
+        self._samples[phase][position] = nanoseconds if nanoseconds > 0 else 0
+        position += 1
+        self._positions[phase] = 0 if position == self.capacity else position
+        self.counts[phase] += 1
+
+    def samples(self, phase: int) -> list[int]:
+        """Get the retained samples of a phase, oldest first."""
+        count = self.counts[phase]
+        samples = self._samples[phase]
+        if count < self.capacity:
+            return samples[:count].tolist()
+        position = self._positions[phase]
+        return (samples[position:] + samples[:position]).tolist()
+
+    def reset(self) -> None:
+        """Forget every recorded sample."""
+        self._positions = [0] * len(PHASES)
+        self.counts = [0] * len(PHASES)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Get sample counts and percentiles in seconds for every phase."""
+        result = {}
+        for phase, name in enumerate(PHASES):
+            window = sorted(self.samples(phase))
+            if not window:
+                result[name] = {
+                    "count": 0,
+                    "mean": 0.0,
+                    "max": 0.0,
+                    "p50": 0.0,
+                    "p95": 0.0,
+                    "p99": 0.0,
+                }
+                continue
+            result[name] = {
+                "count": self.counts[phase],
+                "mean": sum(window) / len(window) / 1e9,
+                "max": window[-1] / 1e9,
+                "p50": _percentile(window, 50) / 1e9,
+                "p95": _percentile(window, 95) / 1e9,
+                "p99": _percentile(window, 99) / 1e9,
+            }
+        return result
+
+
+def _percentile(ordered: list[int], percentile: float) -> int:
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    rank = max(1, -(-len(ordered) * percentile // 100))
+    return ordered[int(rank) - 1]
@@ -31,6 +31,7 @@ class Settings(BaseSettings):
 
     # Storage and checkpointing
     storage_backend: str = Field(default="sqlite", alias="STORAGE_BACKEND")
+    storage_path: Optional[str] = Field(default=None, alias="STORAGE_PATH")
     checkpoint_interval: int = Field(default=60, alias="CHECKPOINT_INTERVAL")
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
@@ -9,6 +9,7 @@ from dataclasses import dataclass, field
 from typing import Any, Callable, Optional
 
 from ..agent.base import Agent, AgentResult
+from ..agent.context_cache import ContextCache
 from ..agent.state import AgentStatus
 
 logger = logging.getLogger(__name__)
@@ -183,6 +184,7 @@ class AgentTeam:
         self.name = name
         self._agents: dict[str, Agent] = {}
         self._shared_context: dict[str, Any] = {}
+        self._shared_cache: Optional[ContextCache] = None
         self._message_queue: asyncio.Queue = asyncio.Queue()
         self._event_bus = EventBus()
         self._running = False
@@ -197,7 +199,9 @@ class AgentTeam:
         agent.set_team(self)
 
         # Share context
-        agent.shared_state.update(self._shared_context)
+        agent.update_shared_state(self._shared_context)
+        if self._shared_cache is not None:
+            agent.context_cache = self._shared_cache
 
         return self
 
@@ -227,10 +231,25 @@ class AgentTeam:
 
             # Update all agent contexts
             for agent in self._agents.values():
-                agent.shared_state.update(context)
+                agent.update_shared_state(context)
 
         return self
 
+    def with_shared_cache(self, cache: Optional[ContextCache] = None) -> "AgentTeam":
+        """Make all agents use one cache for ``set_cached`` and ``get_cached``.
+
+        Args:
+            cache: Cache to share; a new one with default limits if None
+        """
+        self._shared_cache = cache if cache is not None else ContextCache()
+        for agent in self._agents.values():
+            agent.context_cache = self._shared_cache
+        return self
+
+    def get_shared_cache(self) -> Optional[ContextCache]:
+        """Get the cache shared by all agents, if any."""
+        return self._shared_cache
+
     def set_global_variable(self, key: str, value: Any) -> None:
         """Set variable for all agents."""
         self._shared_context[key] = value
@@ -26,6 +26,7 @@ from puffinflow.core.agent.base import Agent, RetryPolicy
 from puffinflow.core.agent.context import Context
 from puffinflow.core.agent.state import (
     AgentStatus,
+    ExecutionMode,
     PrioritizedState,
     Priority,
     StateStatus,
@@ -518,6 +519,273 @@ class TestStateExecution:
 
         assert "has unmet dependencies" in caplog.text
 
+    @pytest.mark.asyncio
+    async def test_parallel_states_write_to_private_overlays(self):
+        """Test that concurrent states do not see uncommitted writes."""
+        agent = Agent("isolated", max_concurrent=2)
+        observed = {}
+        written = asyncio.Event()
+        read = asyncio.Event()
+
+        async def writer(context: Context) -> None:
+            context.set_variable("draft", "value")
+            written.set()
+            await read.wait()
+
+        async def reader(context: Context) -> None:
+            await written.wait()
+            observed["during"] = context.get_variable("draft")
+            read.set()
+            # Wait for the writer's overlay to be committed
+            while "draft" not in agent.shared_state:
+                await asyncio.sleep(0)
+            observed["after"] = context.get_variable("draft")
+
+        agent.add_state("writer", writer)
+        agent.add_state("reader", reader)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert observed == {"during": None, "after": "value"}
+        assert agent.shared_state["draft"] == "value"
+
+    @pytest.mark.asyncio
+    async def test_parallel_states_do_not_see_uncommitted_outputs(self):
+        """Test that outputs and metadata reach the index on commit."""
+        agent = Agent("isolated_index", max_concurrent=2)
+        observed = {}
+        written = asyncio.Event()
+        read = asyncio.Event()
+
+        async def writer(context: Context) -> None:
+            context.set_output("result", 1)
+            context.set_metadata("owner", "writer")
+            observed["own"] = (
+                context.get_output("result"),
+                context.get_all_outputs(),
+                context.get_all_metadata(),
+                context.get_variable_keys(),
+            )
+            written.set()
+            await read.wait()
+
+        async def reader(context: Context) -> None:
+            await written.wait()
+            observed["during"] = (
+                context.get_output("result"),
+                context.get_all_outputs(),
+                context.get_all_metadata(),
+            )
+            read.set()
+            while "_meta_output_result" not in agent.shared_state:
+                await asyncio.sleep(0)
+            observed["after"] = context.get_all_outputs()
+
+        agent.add_state("writer", writer)
+        agent.add_state("reader", reader)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert observed["own"] == (1, {"result": 1}, {"owner": "writer"}, set())
+        assert observed["during"] == (None, {}, {})
+        assert observed["after"] == {"result": 1}
+
+    def test_shared_state_updates_reach_the_index(self):
+        """Test that writes made outside a context update the index."""
+        agent = Agent("external")
+        agent.update_shared_state({"const_team": "a", "_meta_output_x": 1, "v": 2})
+        agent.set_shared_variable("_meta_metadata_m", 3)
+
+        assert agent.context.get_variable_keys() == {"v"}
+        assert agent.context.get_all_outputs() == {"x": 1}
+        assert agent.context.get_all_metadata() == {"m": 3}
+
+    @pytest.mark.asyncio
+    async def test_conflicting_writes_overwrite_by_default(self):
+        """Test that conflicting writes are counted and last commit wins."""
+        agent = Agent("overwrite", max_concurrent=2)
+
+        def make_state(value: str, delay: float):
+            async def write(context: Context) -> None:
+                context.set_variable("shared", value)
+                await asyncio.sleep(delay)
+
+            return write
+
+        agent.add_state("fast", make_state("fast", 0.0))
+        agent.add_state("slow", make_state("slow", 0.02))
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert agent.shared_state["shared"] == "slow"
+        assert result.get_metric("write_conflicts") == 1
+
+    @pytest.mark.asyncio
+    async def test_conflicting_writes_fail_state_when_configured(self):
+        """Test the fail policy rejects the later commit and retries it."""
+        agent = Agent(
+            "strict",
+            max_concurrent=2,
+            on_write_conflict="fail",
+            retry_policy=RetryPolicy(max_retries=2, initial_delay=0.001),
+        )
+        attempts = {"slow": 0}
+
+        async def fast(context: Context) -> None:
+            context.set_variable("shared", "fast")
+            await asyncio.sleep(0)
+
+        async def slow(context: Context) -> None:
+            attempts["slow"] += 1
+            context.set_variable("shared", f"slow-{attempts['slow']}")
+            context.set_variable("slow_only", True)
+            if attempts["slow"] == 1:
+                await asyncio.sleep(0.02)
+
+        agent.add_state("fast", fast)
+        agent.add_state("slow", slow)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert attempts["slow"] == 2
+        assert agent.shared_state["shared"] == "slow-2"
+        assert result.get_metric("write_conflicts") == 1
+
+    @pytest.mark.asyncio
+    async def test_agent_variables_are_not_state_writes(self):
+        """Test that agent variables copied into contexts never conflict."""
+        agent = Agent("variables", max_concurrent=2, on_write_conflict="fail")
+        agent.set_agent_variable("cfg", 1)
+        started = asyncio.Event()
+
+        def make_state(key: str):
+            async def write(context: Context) -> None:
+                assert context.get_variable("cfg") == 1
+                context.set_variable(key, True)
+                if started.is_set():
+                    return
+                started.set()
+                await asyncio.sleep(0)
+
+            return write
+
+        agent.add_state("first", make_state("x1"))
+        agent.add_state("second", make_state("x2"))
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert result.get_metric("write_conflicts") == 0
+        assert len(agent.dead_letters) == 0
+        assert agent.shared_state["x1"] and agent.shared_state["x2"]
+
+    def test_invalid_write_conflict_policy(self):
+        """Test that unknown conflict policies are rejected."""
+        with pytest.raises(ValueError, match="on_write_conflict"):
+            Agent("invalid", on_write_conflict="merge")
+
+    @pytest.mark.asyncio
+    async def test_state_contexts_are_recycled(self, agent):
+        """Test that finished state contexts are reused without leaking data."""
+        seen = []
+
+        async def first(context: Context) -> str:
+            seen.append(context)
+            context.set_metric("calls", 1)
+            context.set_output("first", True)
+            return "second"
+
+        async def second(context: Context) -> None:
+            seen.append(context)
+            assert context.get_metric("calls") == 0
+            assert context.get_output("first") is True
+
+        agent.add_state("first", first)
+        agent.add_state("second", second)
+
+        with patch("puffinflow.core.agent.context.ContextIndex.rebuild") as rebuild:
+            result = await agent.run()
+
+        assert result.status == AgentStatus.COMPLETED
+        assert seen[0] is seen[1]
+        rebuild.assert_not_called()
+        assert result.get_output("first") is True
+
+    @pytest.mark.asyncio
+    async def test_default_state_skips_pool_and_breaker(
+        self, agent, simple_state_func, mock_resource_pool
+    ):
+        """Test that states with default resources take the fast path."""
+        agent.resource_pool = mock_resource_pool
+        agent.add_state("test_state", simple_state_func)
+
+        with patch.object(agent.circuit_breaker, "protect") as protect:
+            await agent.run_state("test_state")
+
+        mock_resource_pool.acquire.assert_not_called()
+        protect.assert_not_called()
+        assert "test_state" in agent.completed_states
+        assert agent._fast_path_executions == 1
+
+    @pytest.mark.asyncio
+    async def test_custom_resources_use_pool_and_breaker(
+        self, agent, simple_state_func, mock_resource_pool
+    ):
+        """Test that states with custom resources keep full protection."""
+        mock_resource_pool.acquire.return_value = True
+        agent.resource_pool = mock_resource_pool
+        agent.add_state(
+            "test_state",
+            simple_state_func,
+            resources=ResourceRequirements(cpu_units=2.0),
+        )
+
+        await agent.run_state("test_state")
+
+        mock_resource_pool.acquire.assert_awaited_once()
+        mock_resource_pool.release.assert_awaited_once_with("test_state")
+        assert agent._fast_path_executions == 0
+        assert agent._protected_executions == 1
+
+    def test_fast_path_can_be_disabled(self, simple_state_func):
+        """Test that fast path is skipped when disabled or a breaker is configured."""
+        from puffinflow.core.agent.decorators.flexible import state
+        from puffinflow.core.reliability.circuit_breaker import CircuitBreakerConfig
+
+        disabled = Agent("disabled", enable_fast_path=False)
+        configured = Agent(
+            "configured", circuit_breaker_config=CircuitBreakerConfig(name="cb")
+        )
+
+        for candidate in (disabled, configured):
+            candidate.add_state("test_state", simple_state_func)
+            assert not candidate._is_fast_path_state("test_state")
+
+        @state(circuit_breaker=True)
+        async def guarded(context: Context) -> None:
+            pass
+
+        agent = Agent("guarded")
+        agent.add_state("guarded", guarded)
+        assert not agent._is_fast_path_state("guarded")
+
+    @pytest.mark.asyncio
+    async def test_fast_path_failure_is_retried(self, agent, failing_state_func):
+        """Test that fast path failures still go through retry handling."""
+        agent.add_state("failing_state", failing_state_func)
+
+        with patch.object(agent.retry_policy, "wait", new_callable=AsyncMock):
+            await agent.run_state("failing_state")
+
+        metadata = agent.state_metadata["failing_state"]
+        assert metadata.attempts == 1
+        assert metadata.status == StateStatus.PENDING
+        assert agent._get_execution_metrics()["fast_path_executions"] == 1
+
 
 # ============================================================================
 # ERROR HANDLING AND RETRY TESTS
@@ -537,7 +805,9 @@ class TestErrorHandlingAndRetry:
         metadata = agent.state_metadata["failing_state"]
         assert metadata.status == StateStatus.PENDING
         assert metadata.attempts == 1
-        assert len(agent.priority_queue) == 1
+        # The retry waits out its backoff in the delay queue
+        assert len(agent._retry_heap) == 1
+        assert len(agent.priority_queue) == 0
 
     @pytest.mark.asyncio
     async def test_handle_failure_within_retry_limit(self, agent, failing_state_func):
@@ -548,15 +818,78 @@ class TestErrorHandlingAndRetry:
         metadata.max_retries = 3
 
         with patch.object(
-            metadata.retry_policy, "wait", new_callable=AsyncMock
-        ) as mock_wait:
+            metadata.retry_policy, "get_delay", return_value=5.0
+        ) as mock_get_delay:
             await agent._handle_failure("test_state", ValueError("Test error"))
 
         assert metadata.attempts == 2
         assert metadata.status == StateStatus.PENDING
-        mock_wait.assert_called_once_with(1)
+        mock_get_delay.assert_called_once_with(1)
+        assert len(agent.priority_queue) == 0
+        assert [name for _, name in agent._retry_heap] == ["test_state"]
+        assert agent._release_due_retries() == pytest.approx(5.0, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_handle_failure_without_delay_requeues_immediately(
+        self, agent, failing_state_func
+    ):
+        """Test that a retry with no backoff skips the delay queue."""
+        agent.add_state("test_state", failing_state_func)
+        metadata = agent.state_metadata["test_state"]
+
+        with patch.object(metadata.retry_policy, "get_delay", return_value=0.0):
+            await agent._handle_failure("test_state", ValueError("Test error"))
+
+        assert agent._retry_heap == []
         assert len(agent.priority_queue) == 1
 
+    @pytest.mark.asyncio
+    async def test_backoff_does_not_hold_execution_slot(self):
+        """Test that other states run while a failed state backs off."""
+        agent = Agent(
+            "backoff",
+            max_concurrent=1,
+            retry_policy=RetryPolicy(max_retries=3, initial_delay=0.1, jitter=False),
+        )
+        events = []
+
+        async def flaky(context: Context) -> None:
+            attempts = context.get_variable("attempts", 0) + 1
+            context.set_variable("attempts", attempts)
+            events.append(f"flaky {attempts}")
+            if attempts == 1:
+                raise ValueError("first attempt fails")
+
+        async def other(context: Context) -> None:
+            events.append("other")
+
+        agent.add_state("flaky", flaky)
+        agent.add_state("other", other)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        # With one slot, "other" ran while "flaky" waited out its backoff
+        assert events == ["flaky 1", "other", "flaky 2"]
+        assert result.metrics["retries_scheduled"] == 1
+        assert result.metrics["pending_retries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pending_retries_are_checkpointed_and_cancellable(
+        self, agent, failing_state_func
+    ):
+        """Test checkpoints and cancellation see states in backoff."""
+        agent.add_state("test_state", failing_state_func)
+        agent._schedule_retry("test_state", 60.0)
+
+        assert agent._get_execution_metrics()["pending_retries"] == 1
+        checkpoint = agent.create_checkpoint()
+        assert [ps.state_name for ps in checkpoint.priority_queue] == ["test_state"]
+        assert agent.priority_queue == []
+
+        agent.cancel_state("test_state")
+        assert agent._retry_heap == []
+
     @pytest.mark.asyncio
     async def test_handle_failure_exceeds_retry_limit(self, agent, failing_state_func):
         """Test failure handling when retry limit is exceeded."""
@@ -700,6 +1033,86 @@ class TestCancellation:
         assert len(agent.running_states) == 0
         assert len(agent.priority_queue) == 0
 
+    @pytest.mark.asyncio
+    async def test_cancel_state_interrupts_running_state(self):
+        """Test that cancelling a running state stops it and frees resources."""
+        agent = Agent("interrupt", enable_fast_path=False)
+        started = asyncio.Event()
+
+        async def runaway(context):
+            context.set_variable("progress", 1)
+            started.set()
+            await asyncio.sleep(10)
+
+        agent.add_state("runaway", runaway)
+        run = asyncio.create_task(agent.run())
+        await asyncio.wait_for(started.wait(), timeout=1)
+        assert "runaway" in agent.resource_pool.get_state_allocations()
+
+        cancelled_at = time.perf_counter()
+        agent.cancel_state("runaway")
+        await asyncio.wait_for(run, timeout=1)
+
+        assert time.perf_counter() - cancelled_at < 0.1
+        assert agent.state_metadata["runaway"].status == StateStatus.CANCELLED
+        assert "runaway" not in agent.resource_pool.get_state_allocations()
+        assert agent.get_variable("progress") == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_all_interrupts_running_states(self):
+        """Test that cancel_all returns once running states have unwound."""
+        agent = Agent("interrupt_all", enable_fast_path=False)
+        started = asyncio.Event()
+
+        async def slow(context):
+            started.set()
+            await asyncio.sleep(10)
+
+        agent.add_state("slow_1", slow)
+        agent.add_state("slow_2", slow)
+        run = asyncio.create_task(agent.run(execution_mode=ExecutionMode.PARALLEL))
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        await agent.cancel_all()
+
+        assert agent._running_tasks == {}
+        assert agent.resource_pool.get_state_allocations() == {}
+        assert agent.state_metadata["slow_1"].status == StateStatus.CANCELLED
+        result = await asyncio.wait_for(run, timeout=1)
+        assert result.status == AgentStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_pause_requeues_interrupted_states(self):
+        """Test that pausing interrupts states and resuming runs them again."""
+        agent = Agent("pausable")
+        attempts = 0
+        started = asyncio.Event()
+
+        async def long_running(context):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                started.set()
+                await asyncio.sleep(10)
+            context.set_variable("finished", True)
+
+        agent.add_state("long_running", long_running)
+        run = asyncio.create_task(agent.run())
+        await asyncio.wait_for(started.wait(), timeout=1)
+
+        checkpoint = await agent.pause()
+        paused = await asyncio.wait_for(run, timeout=1)
+
+        assert paused.status == AgentStatus.PAUSED
+        assert [ps.state_name for ps in checkpoint.priority_queue] == ["long_running"]
+
+        await agent.resume()
+        result = await agent.run()
+
+        assert result.status == AgentStatus.COMPLETED
+        assert result.get_variable("finished") is True
+        assert attempts == 2
+
 
 # ============================================================================
 # WORKFLOW EXECUTION TESTS
@@ -888,6 +1301,334 @@ class TestWorkflowExecution:
         assert isinstance(result.error, RuntimeError)
         assert "Test error" in str(result.error)
 
+    @pytest.mark.asyncio
+    async def test_slow_state_does_not_block_ready_dependents(self, agent):
+        """Test that dependents start as soon as their dependencies finish."""
+        finished = []
+
+        async def slow(context: Context) -> None:
+            await asyncio.sleep(0.2)
+            finished.append("slow")
+
+        async def fast(context: Context) -> None:
+            await asyncio.sleep(0.01)
+            finished.append("fast")
+
+        async def after_fast(context: Context) -> None:
+            finished.append("after_fast")
+
+        agent.add_state("slow", slow)
+        agent.add_state("fast", fast)
+        agent.add_state("after_fast", after_fast, dependencies=["fast"])
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert finished == ["fast", "after_fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_ready_states_beyond_max_concurrent_are_not_dropped(self, agent):
+        """Test that ready states over the concurrency limit run later."""
+        in_flight = 0
+        peak = 0
+
+        async def tracked(context: Context) -> None:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        for i in range(5):
+            agent.add_state(f"state{i}", tracked)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert agent.completed_states == {f"state{i}" for i in range(5)}
+        assert peak == agent.max_concurrent
+
+    @pytest.mark.asyncio
+    async def test_blocked_queued_state_is_parked_until_ready(
+        self, agent, simple_state_func
+    ):
+        """Test that a queued state with unmet dependencies waits off the heap."""
+        agent.add_state("first", simple_state_func)
+        agent.add_state("second", simple_state_func, dependencies=["first"])
+        await agent._add_to_queue("second")
+
+        assert await agent._get_ready_states() == []
+        assert agent.priority_queue == []
+        assert agent.get_state_info("second")["in_queue"] is True
+
+        agent.completed_states.add("first")
+        agent.completed_once.add("first")
+        await agent._check_dependent_states("first")
+
+        assert await agent._get_ready_states() == ["second"]
+        assert agent.get_state_info("second")["in_queue"] is False
+
+    @pytest.mark.asyncio
+    async def test_add_to_queue_skips_already_queued_state(
+        self, agent, simple_state_func
+    ):
+        """Test that queue membership prevents duplicate entries."""
+        agent.add_state("test_state", simple_state_func)
+
+        await agent._add_to_queue("test_state")
+        await agent._add_to_queue("test_state")
+
+        assert len(agent.priority_queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_interrupts_running_states(self, agent):
+        """Test that a run timeout does not wait for slow states to finish."""
+
+        async def hanging(context: Context) -> None:
+            await asyncio.sleep(10)
+
+        agent.add_state("hanging", hanging)
+
+        started = time.time()
+        result = await agent.run(timeout=0.05)
+
+        assert result.status == AgentStatus.FAILED
+        assert time.time() - started < 1.0
+        assert not agent._running_tasks
+
+
+# ============================================================================
+# BATCH EXECUTION TESTS
+# ============================================================================
+
+
+class TestBatchExecution:
+    """Test cases for running one agent definition over many inputs."""
+
+    @pytest.fixture
+    def batch_agent(self):
+        agent = Agent(name="batch_agent")
+
+        async def double(context: Context) -> None:
+            context.set_variable("doubled", context.get_variable("value") * 2)
+
+        async def publish(context: Context) -> None:
+            context.set_output("result", context.get_variable("doubled"))
+
+        agent.add_state("double", double)
+        agent.add_state("publish", publish, dependencies=["double"])
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_run_many_isolates_runs(self, batch_agent):
+        """Test that each input gets its own isolated run."""
+        inputs = [{"value": i} for i in range(10)]
+
+        results = [r async for r in batch_agent.run_many(inputs, concurrency=3)]
+
+        assert len(results) == 10
+        by_index = {r.get_metadata("run_index"): r for r in results}
+        for i in range(10):
+            assert by_index[i].status == AgentStatus.COMPLETED
+            assert by_index[i].get_output("result") == i * 2
+
+        # The template agent itself is untouched
+        assert batch_agent.completed_states == set()
+        assert "doubled" not in batch_agent.shared_state
+
+    @pytest.mark.asyncio
+    async def test_run_many_respects_concurrency(self):
+        """Test that no more than `concurrency` runs are in flight."""
+        agent = Agent(name="limited")
+        in_flight = 0
+        peak = 0
+
+        async def slow(context: Context) -> None:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        agent.add_state("slow", slow)
+
+        results = [r async for r in agent.run_many([{}] * 8, concurrency=2)]
+
+        assert len(results) == 8
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_run_many_reuses_run_agents_without_leaking_state(self, monkeypatch):
+        """Test that a reused run agent starts every run from scratch."""
+        agent = Agent(name="reused")
+        seen = []
+
+        async def record(context: Context) -> None:
+            seen.append(context.get_variable("leftover"))
+            context.set_variable("leftover", context.get_variable("value"))
+            context.set_cached("cached", context.get_variable("value"))
+            if context.get_variable("value") == 0:
+                raise RuntimeError("first run fails")
+
+        agent.add_state("record", record, max_retries=1)
+        spawned = []
+        spawn = agent._spawn_run_agent
+        monkeypatch.setattr(
+            agent,
+            "_spawn_run_agent",
+            lambda plan, index: spawned.append(index) or spawn(plan, index),
+        )
+
+        inputs = [{"value": i} for i in range(3)]
+        results = [r async for r in agent.run_many(inputs, concurrency=1)]
+
+        assert spawned == [0]
+        assert seen == [None, None, None]
+        assert [r.agent_name for r in results] == [
+            "reused[0]",
+            "reused[1]",
+            "reused[2]",
+        ]
+        assert [r.get_metadata("states_failed") for r in results] == [
+            ["record"],
+            [],
+            [],
+        ]
+        assert [r.status for r in results] == [
+            AgentStatus.FAILED,
+            AgentStatus.COMPLETED,
+            AgentStatus.COMPLETED,
+        ]
+        # Earlier results keep their own variables and cache
+        assert [r.get_variable("leftover") for r in results] == [0, 1, 2]
+        assert [r.get_cached("cached") for r in results] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_run_many_shares_engine_components(self, batch_agent):
+        """Test that runs share the resource pool and circuit breaker."""
+        plan = batch_agent.compile_plan()
+        run_agent = batch_agent._spawn_run_agent(plan, 0)
+
+        assert run_agent.resource_pool is batch_agent.resource_pool
+        assert run_agent.circuit_breaker is batch_agent.circuit_breaker
+        assert run_agent.compile_plan() is plan
+
+    @pytest.mark.asyncio
+    async def test_run_many_early_exit_cancels_outstanding_runs(self):
+        """Test that breaking out of the iterator stops remaining runs."""
+        agent = Agent(name="early_exit")
+        started = 0
+
+        async def work(context: Context) -> None:
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.05 if context.get_variable("slow") else 0)
+
+        agent.add_state("work", work)
+        inputs = [{"slow": False}] + [{"slow": True}] * 20
+
+        async for result in agent.run_many(inputs, concurrency=2):
+            assert result.get_metadata("run_index") == 0
+            break
+
+        assert started < len(inputs)
+
+    @pytest.mark.asyncio
+    async def test_run_many_rejects_invalid_concurrency(self, batch_agent):
+        """Test that concurrency must be positive."""
+        with pytest.raises(ValueError, match="concurrency"):
+            async for _ in batch_agent.run_many([{}], concurrency=0):
+                pass
+
+
+class TestCrossAgentHandoff:
+    """Test cross-agent transitions and variable waits."""
+
+    @pytest.mark.asyncio
+    async def test_handoff_wakes_running_target(self):
+        """Test that a handoff reaches a running agent's loop directly."""
+        source = Agent(name="source")
+        target = Agent(name="target")
+        payload = {"rows": [1, 2, 3]}
+        handed_off_at = 0.0
+        received = {}
+
+        async def send(context: Context):
+            nonlocal handed_off_at
+            handed_off_at = time.perf_counter()
+            return (target, "receive", {"payload": payload})
+
+        async def idle(context: Context) -> None:
+            await target.wait_for_variable("done", True, timeout=2)
+
+        async def receive(context: Context) -> None:
+            received["latency"] = time.perf_counter() - handed_off_at
+            received["payload"] = context.get_variable("payload")
+            context.set_variable("done", True)
+
+        source.add_state("send", send)
+        target.add_state("idle", idle)
+        target.add_state("receive", receive)
+
+        target_run = asyncio.create_task(target.run())
+        await asyncio.sleep(0)
+        await source.run()
+        result = await asyncio.wait_for(target_run, timeout=2)
+
+        assert result.status == AgentStatus.COMPLETED
+        # Data moves by reference and the target reacts without polling
+        assert received["payload"] is payload
+        assert received["latency"] < 0.05
+
+    @pytest.mark.asyncio
+    async def test_handoff_to_unknown_state_is_ignored(self, caplog):
+        """Test that handing off to a missing state queues nothing."""
+        target = Agent(name="target")
+        target.add_state("known", lambda context: None)
+
+        with caplog.at_level(logging.WARNING):
+            await target.receive_handoff("missing", {"value": 1})
+
+        assert target.priority_queue == []
+        assert "unknown state missing" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_wait_for_variable_is_notified(self, agent):
+        """Test that variable waits wake on change instead of polling."""
+
+        async def set_later() -> float:
+            await asyncio.sleep(0.01)
+            agent.set_variable("ready", True)
+            return time.perf_counter()
+
+        setter = asyncio.create_task(set_later())
+        assert await agent.wait_for_variable("ready", True, timeout=1)
+        woke_at = time.perf_counter()
+
+        assert woke_at - await setter < 0.05
+        assert not await agent.wait_for_variable("ready", False, timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_wait_for_agent_variable_through_team(self, agent):
+        """Test waiting on a teammate's variable."""
+        other = Agent(name="other")
+
+        class Team:
+            def get_agent(self, name):
+                return other if name == "other" else None
+
+        team = Team()
+        agent.set_team(team)
+
+        waiter = asyncio.create_task(
+            agent.wait_for_agent_variable("other", "status", "done", timeout=1)
+        )
+        await asyncio.sleep(0)
+        other.set_variable("status", "done")
+
+        assert await waiter
+        assert not await agent.wait_for_agent_variable("missing", "status", "done")
+
 
 # ============================================================================
 # INTEGRATION TESTS
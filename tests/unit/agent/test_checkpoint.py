@@ -12,16 +12,23 @@ Tests cover:
 - Checkpoint data validation
 """
 
+import asyncio
 import copy
 import time
 from unittest.mock import Mock, patch
 
 import pytest
 
-from puffinflow.core.agent.base import Agent, RetryPolicy
+from puffinflow.core.agent.base import Agent, MemoryCheckpointStorage, RetryPolicy
 
 # Import the modules to test
-from puffinflow.core.agent.checkpoint import AgentCheckpoint
+from puffinflow.core.agent.checkpoint import (
+    AgentCheckpoint,
+    CheckpointDelta,
+    DeltaCheckpointer,
+    DirtyTrackingDict,
+)
+from puffinflow.core.agent.decorators.builder import build_state
 from puffinflow.core.agent.state import (
     AgentStatus,
     PrioritizedState,
@@ -29,6 +36,7 @@ from puffinflow.core.agent.state import (
     StateMetadata,
     StateStatus,
 )
+from puffinflow.core.config import get_settings
 from puffinflow.core.resources.requirements import ResourceRequirements
 
 # ============================================================================
@@ -969,5 +977,264 @@ class TestIntegrationWorkflow:
         assert restored_data["timestamp"] == checkpoint.timestamp
 
 
+# ============================================================================
+# DELTA CHECKPOINT TESTS
+# ============================================================================
+
+
+class TestDirtyTrackingDict:
+    """Test change tracking of shared state writes."""
+
+    def test_records_writes_and_removals(self):
+        state = DirtyTrackingDict({"kept": 1, "dropped": 2})
+        assert state.dirty == set()
+
+        state["new"] = 3
+        state.update(kept=4)
+        state.pop("dropped")
+        state.setdefault("default", 5)
+
+        assert state.dirty == {"new", "kept", "default"}
+        assert state.removed == {"dropped"}
+
+        del state["new"]
+        assert state.removed == {"dropped", "new"}
+        assert "new" not in state.dirty
+
+    def test_copies_are_plain_dicts(self):
+        state = DirtyTrackingDict({"nested": [1]})
+
+        assert type(copy.deepcopy(state)) is dict
+        assert copy.deepcopy(state) == {"nested": [1]}
+
+
+class TestDeltaCheckpoints:
+    """Test delta checkpoints saved and restored through an agent."""
+
+    @staticmethod
+    def make_agent(checkpointer, storage):
+        async def step(context):
+            pass
+
+        agent = Agent("delta", checkpointer=checkpointer, checkpoint_storage=storage)
+        agent.add_state("first", step)
+        agent.add_state("second", step)
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_delta_holds_only_changes(self):
+        storage = MemoryCheckpointStorage()
+        agent = self.make_agent(DeltaCheckpointer(), storage)
+        for i in range(10):
+            agent.shared_state[f"key_{i}"] = i
+
+        base_id = await agent.save_checkpoint()
+        agent.shared_state["key_1"] = "changed"
+        del agent.shared_state["key_2"]
+        agent.state_metadata["first"].attempts = 2
+        delta_id = await agent.save_checkpoint()
+
+        delta = await storage.load_checkpoint("delta", delta_id)
+        assert isinstance(delta, CheckpointDelta)
+        assert delta.parent_id == base_id
+        assert delta.shared_state_updates == {"key_1": "changed"}
+        assert delta.shared_state_removed == {"key_2"}
+        assert set(delta.state_metadata) == {"first"}
+
+    @pytest.mark.asyncio
+    async def test_restore_applies_delta_chain(self):
+        storage = MemoryCheckpointStorage()
+        agent = self.make_agent(DeltaCheckpointer(), storage)
+        agent.shared_state.update({"a": 1, "b": 2, "c": 3, "d": 4})
+        await agent.save_checkpoint()
+        agent.shared_state["a"] = 10
+        await agent.save_checkpoint()
+        del agent.shared_state["b"]
+        agent.completed_states.add("first")
+        await agent.save_checkpoint()
+
+        restored = self.make_agent(DeltaCheckpointer(), storage)
+        assert await restored.load_checkpoint()
+
+        assert restored.shared_state == {"a": 10, "c": 3, "d": 4}
+        assert restored.completed_states == {"first"}
+        assert isinstance(restored.shared_state, DirtyTrackingDict)
+
+    @pytest.mark.asyncio
+    async def test_compaction_takes_new_base(self):
+        storage = MemoryCheckpointStorage()
+        checkpointer = DeltaCheckpointer(compact_every=2)
+        agent = self.make_agent(checkpointer, storage)
+        agent.shared_state.update({f"key_{i}": i for i in range(10)})
+
+        for i in range(4):
+            agent.shared_state["key_0"] = i
+            await agent.save_checkpoint()
+
+        kinds = [
+            type(await storage.load_checkpoint("delta", checkpoint_id)).__name__
+            for checkpoint_id in await storage.list_checkpoints("delta")
+        ]
+        assert kinds == [
+            "AgentCheckpoint",
+            "CheckpointDelta",
+            "CheckpointDelta",
+            "AgentCheckpoint",
+        ]
+        assert checkpointer.get_metrics()["bases"] == 2
+
+    @pytest.mark.asyncio
+    async def test_large_change_takes_new_base(self):
+        storage = MemoryCheckpointStorage()
+        agent = self.make_agent(DeltaCheckpointer(compact_ratio=0.5), storage)
+        agent.shared_state.update({"a": 1, "b": 2})
+        await agent.save_checkpoint()
+
+        agent.shared_state.update({"a": 3, "b": 4})
+        checkpoint_id = await agent.save_checkpoint()
+
+        checkpoint = await storage.load_checkpoint("delta", checkpoint_id)
+        assert isinstance(checkpoint, AgentCheckpoint)
+
+    @pytest.mark.asyncio
+    async def test_failed_save_resets_chain(self):
+        storage = MemoryCheckpointStorage()
+        checkpointer = DeltaCheckpointer()
+        agent = self.make_agent(checkpointer, storage)
+        agent.shared_state.update({f"key_{i}": i for i in range(10)})
+        await agent.save_checkpoint()
+
+        agent.shared_state["key_0"] = "lost"
+        with patch.object(storage, "save_checkpoint", side_effect=OSError("full")):
+            with pytest.raises(OSError):
+                await agent.save_checkpoint()
+        checkpoint_id = await agent.save_checkpoint()
+
+        checkpoint = await storage.load_checkpoint("delta", checkpoint_id)
+        assert isinstance(checkpoint, AgentCheckpoint)
+        assert checkpoint.shared_state["key_0"] == "lost"
+
+
+class SlowCheckpointStorage(MemoryCheckpointStorage):
+    """Memory storage whose saves take a while."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+
+    async def save_checkpoint(self, agent_name, checkpoint):
+        await asyncio.sleep(self.delay)
+        return await super().save_checkpoint(agent_name, checkpoint)
+
+
+class TestAutomaticCheckpoints:
+    """Test checkpoints taken by the run loop."""
+
+    def test_interval_defaults_to_settings_with_storage(self):
+        assert Agent("plain").checkpoint_interval is None
+        agent = Agent("stored", checkpoint_storage=MemoryCheckpointStorage())
+        assert agent.checkpoint_interval == get_settings().checkpoint_interval
+        disabled = Agent(
+            "disabled",
+            checkpoint_storage=MemoryCheckpointStorage(),
+            checkpoint_interval=0,
+        )
+        assert disabled.checkpoint_interval is None
+
+    def test_checkpoint_every_reaches_state_metadata(self):
+        @build_state().checkpoint_every(5.0)
+        async def step(context):
+            pass
+
+        agent = Agent("builder")
+        agent.add_state("step", step)
+        assert agent.state_metadata["step"].checkpoint_interval == 5.0
+
+    @pytest.mark.asyncio
+    async def test_state_checkpoint_is_written_in_background(self):
+        storage = SlowCheckpointStorage(delay=0.1)
+        events = []
+
+        async def first(context):
+            context.set_variable("done", "first")
+            return "second"
+
+        async def second(context):
+            events.append(len(await storage.list_checkpoints("auto")))
+
+        agent = Agent("auto", checkpoint_storage=storage)
+        agent.add_state("first", first, checkpoint_interval=0)
+        agent.add_state("second", second)
+        result = await agent.run()
+
+        # The second state ran while the checkpoint was still being written
+        assert events == [0]
+        checkpoint = await storage.load_checkpoint("auto")
+        assert checkpoint.completed_states == {"first"}
+        assert checkpoint.shared_state["done"] == "first"
+        writes = result.metrics["checkpoint_writes"]
+        assert writes["latency"]["count"] == 1
+        assert writes["latency"]["max"] >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_periodic_checkpoints_coalesce_behind_slow_writes(self):
+        storage = SlowCheckpointStorage(delay=0.05)
+
+        async def work(context):
+            await asyncio.sleep(0.2)
+
+        agent = Agent("periodic", checkpoint_storage=storage, checkpoint_interval=0.01)
+        agent.add_state("work", work)
+        result = await agent.run()
+
+        saved = len(await storage.list_checkpoints("periodic"))
+        writes = result.metrics["checkpoint_writes"]
+        assert 2 <= saved <= 6
+        assert writes["coalesced"] > 0
+        assert writes["latency"]["count"] == saved
+
+    @pytest.mark.parametrize("delta", [False, True])
+    @pytest.mark.asyncio
+    async def test_restoring_mid_run_checkpoint_reruns_in_flight_states(self, delta):
+        storage = MemoryCheckpointStorage()
+        runs = []
+        mid_run = []
+
+        async def first(context):
+            runs.append("first")
+
+        async def slow(context):
+            runs.append("slow")
+            if mid_run:
+                return
+            # Wait for a periodic checkpoint taken while this state runs
+            before = len(await storage.list_checkpoints("resumable"))
+            while len(await storage.list_checkpoints("resumable")) == before:
+                await asyncio.sleep(0.005)
+            mid_run.append((await storage.list_checkpoints("resumable"))[-1])
+
+        async def last(context):
+            runs.append("last")
+
+        def make_agent(**kwargs):
+            agent = Agent("resumable", checkpoint_storage=storage, **kwargs)
+            agent.add_state("first", first)
+            agent.add_state("slow", slow, dependencies=["first"])
+            agent.add_state("last", last, dependencies=["slow"])
+            return agent
+
+        checkpointer = DeltaCheckpointer() if delta else None
+        await make_agent(checkpoint_interval=0.01, checkpointer=checkpointer).run()
+        runs.clear()
+
+        restored = make_agent(checkpoint_interval=0)
+        assert await restored.load_checkpoint(mid_run[0])
+        result = await restored.run()
+
+        assert result.status == AgentStatus.COMPLETED
+        assert runs == ["slow", "last"]
+        assert restored.completed_states >= {"first", "slow", "last"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
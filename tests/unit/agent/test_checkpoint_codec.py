@@ -0,0 +1,246 @@
+"""Tests for the binary checkpoint codec."""
+
+import mmap
+import uuid
+from dataclasses import fields
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from puffinflow.core.agent import checkpoint_codec
+from puffinflow.core.agent.base import Agent, FileCheckpointStorage
+from puffinflow.core.agent.checkpoint import (
+    AgentCheckpoint,
+    CheckpointDelta,
+    DeltaCheckpointer,
+)
+from puffinflow.core.agent.checkpoint_codec import (
+    MAGIC,
+    CheckpointCodec,
+    is_encoded_checkpoint,
+)
+from puffinflow.core.agent.checkpoint_log import LogCheckpointStorage
+from puffinflow.core.agent.state import CachePolicy, Priority, RetryPolicy
+from puffinflow.core.resources.requirements import ResourceRequirements
+
+
+class Opaque:
+    """A value the codec only stores pickled."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Opaque) and other.value == self.value
+
+
+def make_agent(**kwargs) -> Agent:
+    async def step(context):
+        pass
+
+    agent = Agent("codec", **kwargs)
+    agent.add_state(
+        "first",
+        step,
+        resources=ResourceRequirements(cpu_units=2.0, timeout=5.0),
+        retry_policy=RetryPolicy(max_retries=7, jitter=False),
+        executor="thread",
+        cache=CachePolicy(inputs=("a",), ttl=10.0),
+        checkpoint_interval=3.0,
+    )
+    agent.add_state("second", step, dependencies=["first"])
+    agent.shared_state.update(
+        {
+            "none": None,
+            "flags": [True, False],
+            "numbers": (0, 127, 128, -1, 2**80, 1.5),
+            "text": "é" * 300,
+            "blob": b"\x00\x01",
+            "nested": {"set": {1, 2}, "frozen": frozenset({"x"}), 3: "int key"},
+            "priority": Priority.HIGH,
+        }
+    )
+    agent.completed_states.add("first")
+    agent.completed_once.add("first")
+    agent.state_metadata["first"].attempts = 2
+    agent.state_metadata["first"].last_success = 123.5
+    agent.state_metadata["second"].satisfied_dependencies.add("first")
+    return agent
+
+
+def assert_same_checkpoint(decoded, original):
+    for field in fields(AgentCheckpoint):
+        if field.name != "priority_queue":
+            assert getattr(decoded, field.name) == getattr(original, field.name)
+    assert [
+        (entry.priority, entry.timestamp, entry.state_name, entry.metadata)
+        for entry in decoded.priority_queue
+    ] == [
+        (entry.priority, entry.timestamp, entry.state_name, entry.metadata)
+        for entry in original.priority_queue
+    ]
+
+
+class TestCheckpointCodec:
+    """Test encoding and decoding checkpoints."""
+
+    def test_round_trips_full_checkpoint(self):
+        agent = make_agent()
+        agent.priority_queue.append(
+            agent._prioritized_state("second", agent.state_metadata["second"])
+        )
+        agent.state_metadata["second"].resources = None
+        checkpoint = agent.create_checkpoint()
+
+        data = CheckpointCodec().encode(checkpoint)
+        decoded = CheckpointCodec().decode(data)
+
+        assert is_encoded_checkpoint(data)
+        assert_same_checkpoint(decoded, checkpoint)
+        first = decoded.state_metadata["first"]
+        assert first.resources.cpu_units == 2.0
+        assert first.retry_policy.max_retries == 7
+        assert first.cache == CachePolicy(inputs=("a",), ttl=10.0)
+        assert first.executor == "thread"
+        assert decoded.state_metadata["second"].resources is None
+
+    def test_round_trips_delta_checkpoint(self):
+        agent = make_agent(checkpointer=DeltaCheckpointer())
+        agent.checkpointer.start_base(agent)
+        agent.checkpointer.saved("checkpoint_1")
+        agent.shared_state["text"] = "changed"
+        del agent.shared_state["blob"]
+        agent.state_metadata["second"].attempts = 1
+        delta = agent._capture_checkpoint()
+        assert isinstance(delta, CheckpointDelta)
+
+        decoded = CheckpointCodec().decode(CheckpointCodec().encode(delta))
+
+        for field in fields(CheckpointDelta):
+            assert getattr(decoded, field.name) == getattr(delta, field.name)
+
+    def test_round_trips_standard_library_scalars(self):
+        values = {
+            "naive": datetime(2024, 2, 29, 12, 30, 5, 123456),
+            "aware": datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=-5))),
+            "named": datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=1), "CET")),
+            "utc": datetime(1999, 12, 31, 23, 59, tzinfo=timezone.utc),
+            "date": date(2000, 1, 1),
+            "time": time(8, 15, fold=1),
+            "delta": timedelta(days=-3, seconds=7, microseconds=9),
+            "decimal": [Decimal("1.10"), Decimal("-0"), Decimal("NaN")],
+            "uuid": uuid.UUID(int=42),
+        }
+        agent = make_agent()
+        agent.shared_state.update(values)
+
+        decoded = CheckpointCodec().decode(
+            CheckpointCodec().encode(agent.create_checkpoint())
+        )
+
+        for key, value in values.items():
+            assert repr(decoded.shared_state[key]) == repr(value)
+
+    def test_other_objects_need_allow_pickle(self):
+        agent = make_agent()
+        agent.shared_state["opaque"] = Opaque(1)
+        checkpoint = agent.create_checkpoint()
+
+        with pytest.raises(TypeError, match="allow_pickle"):
+            CheckpointCodec().encode(checkpoint)
+        data = CheckpointCodec(allow_pickle=True).encode(checkpoint)
+        with pytest.raises(ValueError, match="allow_pickle"):
+            CheckpointCodec().decode(data)
+        decoded = CheckpointCodec(allow_pickle=True).decode(data)
+        assert decoded.shared_state["opaque"] == Opaque(1)
+
+    def test_compression(self):
+        checkpoint = make_agent().create_checkpoint()
+        plain = CheckpointCodec().encode(checkpoint)
+        compressed = CheckpointCodec("zlib").encode(checkpoint)
+
+        assert len(compressed) < len(plain)
+        # Decoding reads the compression from the header
+        assert_same_checkpoint(CheckpointCodec().decode(compressed), checkpoint)
+        with pytest.raises(ValueError, match="Unknown compression"):
+            CheckpointCodec("brotli")
+
+    def test_optional_compression_requires_package(self, monkeypatch):
+        monkeypatch.setattr(checkpoint_codec, "_ZSTD_AVAILABLE", False)
+        with pytest.raises(ValueError, match="zstandard"):
+            CheckpointCodec("zstd")
+
+    def test_rejects_foreign_and_newer_data(self):
+        data = bytearray(CheckpointCodec().encode(make_agent().create_checkpoint()))
+
+        with pytest.raises(ValueError, match="an encoded checkpoint"):
+            CheckpointCodec().decode(b"\x80\x04" + bytes(16))
+        data[4] = checkpoint_codec.VERSION + 1
+        with pytest.raises(ValueError, match="version"):
+            CheckpointCodec().decode(data)
+
+    @pytest.mark.parametrize("compression", ["none", "zlib"])
+    def test_rejects_truncated_data(self, compression):
+        agent = make_agent()
+        agent.priority_queue.append(
+            agent._prioritized_state("second", agent.state_metadata["second"])
+        )
+        data = CheckpointCodec(compression).encode(agent.create_checkpoint())
+
+        for length in range(len(MAGIC) + 3, len(data)):
+            with pytest.raises(ValueError):
+                CheckpointCodec().decode(data[:length])
+
+    def test_decodes_memory_mapped_file(self, tmp_path):
+        checkpoint = make_agent().create_checkpoint()
+        path = tmp_path / "checkpoint.ckpt"
+        path.write_bytes(CheckpointCodec().encode(checkpoint))
+
+        with path.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                decoded = CheckpointCodec().decode(mapped)
+
+        assert_same_checkpoint(decoded, checkpoint)
+
+
+class TestStorageIntegration:
+    """Test storages writing the binary format."""
+
+    @pytest.mark.asyncio
+    async def test_file_storage_binary_format(self, tmp_path):
+        storage = FileCheckpointStorage(str(tmp_path), format="binary")
+        agent = make_agent(checkpoint_storage=storage, checkpoint_interval=0)
+        checkpoint_id = await agent.save_checkpoint()
+
+        assert (tmp_path / "codec" / f"{checkpoint_id}.ckpt").exists()
+        restored = Agent("codec", checkpoint_storage=storage, checkpoint_interval=0)
+        assert await restored.load_checkpoint()
+        assert restored.shared_state == agent.shared_state
+        assert restored.state_metadata["first"].attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_file_storage_saves_standard_library_scalars(self, tmp_path):
+        storage = FileCheckpointStorage(str(tmp_path), format="binary")
+        agent = make_agent(checkpoint_storage=storage, checkpoint_interval=0)
+        agent.shared_state["when"] = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        agent.shared_state["amount"] = Decimal("19.99")
+        await agent.save_checkpoint()
+
+        restored = Agent("codec", checkpoint_storage=storage, checkpoint_interval=0)
+        assert await restored.load_checkpoint()
+        assert restored.shared_state["when"] == agent.shared_state["when"]
+        assert restored.shared_state["amount"] == Decimal("19.99")
+
+    @pytest.mark.asyncio
+    async def test_log_storage_reads_pickled_records_after_enabling_codec(
+        self, tmp_path
+    ):
+        checkpoint = make_agent().create_checkpoint()
+        old = await LogCheckpointStorage(tmp_path).save_checkpoint("codec", checkpoint)
+
+        storage = LogCheckpointStorage(tmp_path, codec=CheckpointCodec("zlib"))
+        new = await storage.save_checkpoint("codec", checkpoint)
+
+        assert_same_checkpoint(await storage.load_checkpoint("codec", old), checkpoint)
+        assert_same_checkpoint(await storage.load_checkpoint("codec", new), checkpoint)
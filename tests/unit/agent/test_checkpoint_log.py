@@ -0,0 +1,195 @@
+"""Tests for the segmented checkpoint log storage."""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from puffinflow.core.agent import checkpoint_log
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.checkpoint import AgentCheckpoint, DeltaCheckpointer
+from puffinflow.core.agent.checkpoint_log import LogCheckpointStorage
+
+
+def make_checkpoint(timestamp: float, **shared_state) -> AgentCheckpoint:
+    return AgentCheckpoint(
+        timestamp=timestamp,
+        agent_name="agent",
+        agent_status="running",
+        priority_queue=[],
+        state_metadata={},
+        running_states=[],
+        completed_states=[],
+        completed_once=set(),
+        shared_state=shared_state,
+        session_start=None,
+    )
+
+
+class TestLogCheckpointStorage:
+    """Test appending, loading, recovery and compaction."""
+
+    def test_rejects_invalid_configuration(self, tmp_path):
+        with pytest.raises(ValueError, match="segment_bytes"):
+            LogCheckpointStorage(tmp_path, segment_bytes=0)
+        with pytest.raises(ValueError, match="flush_interval"):
+            LogCheckpointStorage(tmp_path, flush_interval=-1)
+
+    @pytest.mark.asyncio
+    async def test_ids_are_unique_and_latest_loads(self, tmp_path):
+        storage = LogCheckpointStorage(tmp_path)
+        first = await storage.save_checkpoint("agent", make_checkpoint(100.0, n=1))
+        second = await storage.save_checkpoint("agent", make_checkpoint(100.0, n=2))
+
+        assert first != second
+        assert await storage.list_checkpoints("agent") == [first, second]
+        latest = await storage.load_checkpoint("agent")
+        assert latest.shared_state == {"n": 2}
+        assert (await storage.load_checkpoint("agent", first)).shared_state == {"n": 1}
+        assert await storage.load_checkpoint("other") is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_saves_share_one_fsync(self, tmp_path):
+        storage = LogCheckpointStorage(tmp_path, flush_interval=0.01)
+        await asyncio.gather(
+            *(
+                storage.save_checkpoint("agent", make_checkpoint(100.0 + i, n=i))
+                for i in range(20)
+            )
+        )
+
+        assert storage.get_metrics()["fsyncs"] == 1
+        assert len(await storage.list_checkpoints("agent")) == 20
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_reopen_rebuilds_index_and_drops_torn_record(self, tmp_path):
+        storage = LogCheckpointStorage(tmp_path)
+        kept = await storage.save_checkpoint("agent", make_checkpoint(100.0, n=1))
+        deleted = await storage.save_checkpoint("agent", make_checkpoint(101.0, n=2))
+        assert await storage.delete_checkpoint("agent", deleted)
+        await storage.close()
+
+        segment = next((tmp_path / "agent").glob("segment_*.log"))
+        with segment.open("ab") as f:
+            f.write(b"\x00\x10\x00")
+        size = segment.stat().st_size
+
+        reopened = LogCheckpointStorage(tmp_path)
+        assert await reopened.list_checkpoints("agent") == [kept]
+        assert segment.stat().st_size == size - 3
+        saved = await reopened.save_checkpoint("agent", make_checkpoint(100.0, n=3))
+        assert saved not in (kept, deleted)
+        assert (await reopened.load_checkpoint("agent")).shared_state == {"n": 3}
+
+    @pytest.mark.asyncio
+    async def test_segments_roll_over_and_compact(self, tmp_path):
+        storage = LogCheckpointStorage(tmp_path, segment_bytes=1, fsync=False)
+        ids = [
+            await storage.save_checkpoint("agent", make_checkpoint(100.0 + i, n=i))
+            for i in range(6)
+        ]
+        assert storage.get_metrics()["agents"]["agent"]["segments"] == 6
+
+        for checkpoint_id in ids[:4]:
+            await storage.delete_checkpoint("agent", checkpoint_id)
+        await storage.compact("agent")
+
+        metrics = storage.get_metrics()
+        assert metrics["agents"]["agent"]["dead_bytes"] == 0
+        assert len(list((tmp_path / "agent").glob("segment_*.log"))) == 1
+        assert await storage.list_checkpoints("agent") == ids[4:]
+
+        reopened = LogCheckpointStorage(tmp_path)
+        assert await reopened.list_checkpoints("agent") == ids[4:]
+        assert (await reopened.load_checkpoint("agent")).shared_state == {"n": 5}
+
+    @pytest.mark.asyncio
+    async def test_sealing_waits_for_in_flight_fsync(self, tmp_path, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+        synced = []
+
+        def fsync_all(descriptors):
+            started.set()
+            release.wait(5)
+            for fd in descriptors:
+                os.fsync(fd)
+            synced.extend(descriptors)
+
+        monkeypatch.setattr(checkpoint_log, "_fsync_all", fsync_all)
+        storage = LogCheckpointStorage(tmp_path, segment_bytes=1, flush_interval=0)
+        first = asyncio.create_task(
+            storage.save_checkpoint("agent", make_checkpoint(100.0))
+        )
+        await asyncio.to_thread(started.wait, 5)
+        sealed_fd = storage._logs["agent"].active_fd
+
+        # The second save seals the segment the first one is syncing
+        second = asyncio.create_task(
+            storage.save_checkpoint("agent", make_checkpoint(101.0))
+        )
+        await asyncio.sleep(0)
+        assert storage._logs["agent"].active_fd != sealed_fd
+        release.set()
+        await asyncio.gather(first, second)
+
+        assert sealed_fd in synced
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_deletes_during_compaction_stay_deleted(self, tmp_path, monkeypatch):
+        storage = LogCheckpointStorage(tmp_path, segment_bytes=1, fsync=False)
+        ids = [
+            await storage.save_checkpoint("agent", make_checkpoint(100.0 + i, n=i))
+            for i in range(4)
+        ]
+        started = threading.Event()
+        release = threading.Event()
+        rewrite = storage._rewrite
+
+        def blocking_rewrite(*args):
+            started.set()
+            release.wait(5)
+            return rewrite(*args)
+
+        monkeypatch.setattr(storage, "_rewrite", blocking_rewrite)
+        compaction = asyncio.create_task(storage.compact("agent"))
+        await asyncio.to_thread(started.wait, 5)
+
+        # The event loop keeps serving the log while segments are rewritten
+        assert await storage.delete_checkpoint("agent", ids[0])
+        assert (await storage.load_checkpoint("agent", ids[1])).shared_state == {"n": 1}
+        release.set()
+        await compaction
+
+        assert await storage.list_checkpoints("agent") == ids[1:]
+        assert (await storage.load_checkpoint("agent", ids[1])).shared_state == {"n": 1}
+        reopened = LogCheckpointStorage(tmp_path)
+        assert await reopened.list_checkpoints("agent") == ids[1:]
+
+    @pytest.mark.asyncio
+    async def test_agent_restores_delta_chain(self, tmp_path):
+        async def step(context):
+            pass
+
+        def make_agent(storage):
+            agent = Agent(
+                "agent",
+                checkpointer=DeltaCheckpointer(),
+                checkpoint_storage=storage,
+            )
+            agent.add_state("step", step)
+            return agent
+
+        agent = make_agent(LogCheckpointStorage(tmp_path))
+        agent.shared_state.update({"a": 1, "b": 2})
+        await agent.save_checkpoint()
+        agent.shared_state["a"] = 10
+        await agent.save_checkpoint()
+        await agent.checkpoint_storage.close()
+
+        restored = make_agent(LogCheckpointStorage(tmp_path))
+        assert await restored.load_checkpoint()
+        assert restored.shared_state == {"a": 10, "b": 2}
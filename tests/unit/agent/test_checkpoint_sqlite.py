@@ -0,0 +1,147 @@
+"""Tests for the SQLite checkpoint storage."""
+
+import asyncio
+
+import pytest
+
+from puffinflow.core.agent.base import (
+    Agent,
+    FileCheckpointStorage,
+    MemoryCheckpointStorage,
+    create_checkpoint_storage,
+)
+from puffinflow.core.agent.checkpoint import AgentCheckpoint, DeltaCheckpointer
+from puffinflow.core.agent.checkpoint_log import LogCheckpointStorage
+from puffinflow.core.agent.checkpoint_sqlite import SQLiteCheckpointStorage
+from puffinflow.core.config import get_settings
+
+
+def make_checkpoint(timestamp: float, **shared_state) -> AgentCheckpoint:
+    return AgentCheckpoint(
+        timestamp=timestamp,
+        agent_name="agent",
+        agent_status="running",
+        priority_queue=[],
+        state_metadata={},
+        running_states=[],
+        completed_states=[],
+        completed_once=set(),
+        shared_state=shared_state,
+        session_start=None,
+    )
+
+
+class TestSQLiteCheckpointStorage:
+    """Test batched writes, lookups and retention."""
+
+    def test_rejects_invalid_configuration(self, tmp_path):
+        with pytest.raises(ValueError, match="batch_size"):
+            SQLiteCheckpointStorage(tmp_path / "db", batch_size=0)
+        with pytest.raises(ValueError, match="max_age"):
+            SQLiteCheckpointStorage(tmp_path / "db", max_age=0)
+
+    @pytest.mark.asyncio
+    async def test_saves_from_many_agents_share_batches(self, tmp_path):
+        storage = SQLiteCheckpointStorage(tmp_path / "checkpoints.db")
+        ids = await asyncio.gather(
+            *(
+                storage.save_checkpoint(f"agent_{i % 5}", make_checkpoint(100.0, n=i))
+                for i in range(50)
+            )
+        )
+
+        assert storage.get_metrics()["writes"] == 50
+        assert storage.get_metrics()["batches"] < 50
+        assert len(await storage.list_checkpoints("agent_0")) == 10
+        assert len(set(zip([i % 5 for i in range(50)], ids))) == 50
+        latest = await storage.load_checkpoint("agent_4")
+        assert latest.shared_state == {"n": 49}
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_load_list_and_delete(self, tmp_path):
+        storage = SQLiteCheckpointStorage(tmp_path / "checkpoints.db")
+        first = await storage.save_checkpoint("agent", make_checkpoint(100.0, n=1))
+        second = await storage.save_checkpoint("agent", make_checkpoint(101.0, n=2))
+
+        assert await storage.list_checkpoints("agent") == [first, second]
+        assert (await storage.load_checkpoint("agent", first)).shared_state == {"n": 1}
+        assert await storage.delete_checkpoint("agent", second)
+        assert not await storage.delete_checkpoint("agent", second)
+        assert (await storage.load_checkpoint("agent")).shared_state == {"n": 1}
+        assert await storage.load_checkpoint("other") is None
+        await storage.close()
+
+        reopened = SQLiteCheckpointStorage(tmp_path / "checkpoints.db")
+        third = await reopened.save_checkpoint("agent", make_checkpoint(100.0, n=3))
+        assert third != first
+        await reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_retention_by_count_and_age(self, tmp_path):
+        storage = SQLiteCheckpointStorage(
+            tmp_path / "checkpoints.db", max_checkpoints=3, max_age=1000.0
+        )
+        for i in range(5):
+            await storage.save_checkpoint("recent", make_checkpoint(1e12 + i, n=i))
+        await storage.save_checkpoint("stale", make_checkpoint(100.0, n=0))
+
+        recent = await storage.list_checkpoints("recent")
+        assert len(recent) == 3
+        assert (await storage.load_checkpoint("recent", recent[0])).shared_state == {
+            "n": 2
+        }
+        assert await storage.list_checkpoints("stale") == []
+        await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_agent_restores_delta_chain(self, tmp_path):
+        async def step(context):
+            pass
+
+        storage = SQLiteCheckpointStorage(tmp_path / "checkpoints.db")
+        agent = Agent("agent", checkpointer=DeltaCheckpointer())
+        agent.checkpoint_storage = storage
+        agent.add_state("step", step)
+        agent.shared_state.update({"a": 1, "b": 2})
+        await agent.save_checkpoint()
+        agent.shared_state["a"] = 10
+        await agent.save_checkpoint()
+
+        restored = Agent("agent", checkpoint_storage=storage)
+        assert await restored.load_checkpoint()
+        assert restored.shared_state == {"a": 10, "b": 2}
+        await storage.close()
+
+
+class TestCreateCheckpointStorage:
+    """Test picking a backend from arguments or settings."""
+
+    def test_backends(self, tmp_path):
+        assert isinstance(
+            create_checkpoint_storage("sqlite", str(tmp_path / "db")),
+            SQLiteCheckpointStorage,
+        )
+        assert isinstance(
+            create_checkpoint_storage("log", str(tmp_path / "log")),
+            LogCheckpointStorage,
+        )
+        assert isinstance(
+            create_checkpoint_storage("file", str(tmp_path / "files")),
+            FileCheckpointStorage,
+        )
+        assert isinstance(create_checkpoint_storage("memory"), MemoryCheckpointStorage)
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            create_checkpoint_storage("redis", str(tmp_path))
+
+    def test_uses_settings(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+        monkeypatch.setenv("STORAGE_PATH", str(tmp_path / "settings.db"))
+        get_settings.cache_clear()
+        try:
+            storage = create_checkpoint_storage()
+        finally:
+            get_settings.cache_clear()
+
+        assert isinstance(storage, SQLiteCheckpointStorage)
+        assert storage.path == tmp_path / "settings.db"
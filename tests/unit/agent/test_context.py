@@ -23,7 +23,13 @@ from unittest.mock import AsyncMock, Mock, patch
 import pytest
 
 # Import the module to test
-from puffinflow.core.agent.context import Context, StateType
+from puffinflow.core.agent.context import (
+    Context,
+    ContextIndex,
+    SharedStateOverlay,
+    StateType,
+)
+from puffinflow.core.agent.context_cache import ContextCache
 
 # Test Pydantic models for validation testing
 try:
@@ -121,7 +127,7 @@ class TestContextInitialization:
         assert isinstance(context._typed_data, dict)
         assert isinstance(context._typed_var_types, dict)
         assert isinstance(context._validated_types, dict)
-        assert isinstance(context._cache, dict)
+        assert isinstance(context._cache, ContextCache)
 
     def test_context_custom_cache_ttl(self):
         """Test Context initialization with custom cache TTL."""
@@ -156,6 +162,204 @@ class TestContextInitialization:
         assert len(context._typed_var_types) == 1
         assert len(context._validated_types) == 1
 
+    def test_shared_index_skips_shared_state_scan(self):
+        """Test that contexts sharing an index see each other's writes."""
+        shared_state = {"_meta_output_existing": 1}
+        index = ContextIndex()
+
+        first = Context(shared_state, index=index)
+        first.set_output("result", 42)
+        first.set_cached("token", "abc")
+        first.set_typed_variable("count", 1)
+
+        with patch.object(ContextIndex, "rebuild") as rebuild:
+            second = Context(shared_state, index=index)
+            rebuild.assert_not_called()
+
+        assert second.get_output("existing") == 1
+        assert second.get_output("result") == 42
+        assert second.get_cached("token") == "abc"
+        with pytest.raises(TypeError):
+            second.set_typed_variable("count", "not an int")
+
+    def test_shared_index_rebinds_to_new_shared_state(self):
+        """Test that the index is rebuilt for a different shared state."""
+        index = ContextIndex()
+        Context({"_meta_output_old": 1}, index=index)
+
+        context = Context({"_meta_output_new": 2}, index=index)
+
+        assert context.get_all_outputs() == {"new": 2}
+
+    def test_index_tracks_external_writes(self):
+        """Test incremental updates for writes made outside a context."""
+        shared_state: dict[str, Any] = {}
+        index = ContextIndex()
+        context = Context(shared_state, index=index)
+
+        shared_state["_meta_output_result"] = 7
+        index.observe("_meta_output_result", 7)
+        index.observe("plain_variable", 1)
+        assert context.get_output("result") == 7
+
+        del shared_state["_meta_output_result"]
+        index.forget("_meta_output_result")
+        assert context.get_output("result") is None
+
+    def test_index_namespaces(self):
+        """Test that reserved keys are decoded into separate namespaces."""
+        shared_state = {"const_version": 1, "plain": 2}
+        index = ContextIndex()
+        context = Context(shared_state, index=index)
+        context.set_secret("token", "abc")
+        context.set_metadata("owner", "team")
+        context.set_output("result", 3)
+
+        assert index.constants == {"version": 1}
+        assert index.secrets == {"token": "abc"}
+        assert index.metadata == {"owner": "team"}
+        assert index.outputs == {"result": 3}
+        assert "plain" not in index.reserved
+        assert shared_state["secret_token"] == "abc"
+        assert context.get_variable_keys() == {"plain"}
+
+    def test_summary_and_export_use_namespaces(self):
+        """Test that summaries and exports read the index, not the state."""
+        context = Context({"const_a": 1, "secret_b": "x", "var": 2})
+        context.set_metadata("m", 3)
+
+        with patch.object(ContextIndex, "rebuild") as rebuild:
+            summary = context.get_content_summary()
+            content = context.export_content(include_secrets=True)
+            rebuild.assert_not_called()
+
+        assert summary["constants"] == 1
+        assert summary["secrets"] == 1
+        assert summary["variables"] == 1
+        assert content["constants"] == {"a": 1}
+        assert content["secrets"] == {"b": "x"}
+        assert content["metadata"] == {"m": 3}
+
+    def test_clear_state_keeps_index_in_sync(self):
+        """Test that clearing removes non-protected namespaces from the index."""
+        shared_state: dict[str, Any] = {"const_a": 1}
+        context = Context(shared_state)
+        context.set_variable("var", 1)
+        context.set_output("out", 2)
+        context.set_cached("hot", 3)
+        context.set_metadata("m", 4)
+
+        context.clear_state(StateType.UNTYPED)
+
+        assert shared_state == {"const_a": 1}
+        assert context._index.reserved == {"const_a"}
+        assert context.get_all_outputs() == {}
+        assert context.get_cached("hot") is None
+
+    def test_reset_clears_per_state_data(self):
+        """Test that a recycled context starts with empty scratch data."""
+        index = ContextIndex()
+        shared_state = {"key": "value"}
+        context = Context(shared_state, index=index)
+        context.set_metric("count", 1)
+        context.set_output("result", 1)
+        context._metadata["local"] = True
+
+        context._reset(shared_state)
+
+        assert context.get_all_metrics() == {}
+        assert context._metadata == {}
+        assert context.get_output("result") == 1
+
+
+# ============================================================================
+# SHARED STATE OVERLAY TESTS
+# ============================================================================
+
+
+class TestSharedStateOverlay:
+    """Test cases for copy-on-write shared state overlays."""
+
+    def test_reads_fall_through_and_writes_stay_private(self):
+        """Test that writes are buffered until commit."""
+        base = {"a": 1, "b": 2}
+        overlay = SharedStateOverlay(base)
+
+        overlay["a"] = 10
+        overlay["c"] = 3
+        del overlay["b"]
+
+        assert overlay["a"] == 10
+        assert overlay.get("b") is None
+        assert "b" not in overlay
+        assert dict(overlay) == {"a": 10, "c": 3}
+        assert len(overlay) == 2
+        assert base == {"a": 1, "b": 2}
+
+        overlay.commit()
+
+        assert base == {"a": 10, "c": 3}
+        assert overlay.closed
+
+    def test_delete_missing_key_raises(self):
+        """Test that deleting an unknown key raises KeyError."""
+        overlay = SharedStateOverlay({})
+        with pytest.raises(KeyError):
+            del overlay["missing"]
+
+    def test_concurrent_writes_are_detected(self):
+        """Test that per-key versions detect conflicting writers."""
+        base: dict[str, Any] = {}
+        versions: dict[str, int] = {}
+        first = SharedStateOverlay(base, versions)
+        second = SharedStateOverlay(base, versions)
+
+        first["shared"] = "first"
+        first["only_first"] = True
+        second["shared"] = "second"
+
+        assert first.conflicts() == []
+        first.commit()
+
+        assert second.conflicts() == ["shared"]
+        assert versions == {"shared": 1, "only_first": 1}
+
+    def test_write_after_commit_is_not_a_conflict(self):
+        """Test that writes made after another commit are serialized."""
+        base: dict[str, Any] = {}
+        versions: dict[str, int] = {}
+        first = SharedStateOverlay(base, versions)
+        second = SharedStateOverlay(base, versions)
+
+        first["key"] = 1
+        first.commit()
+        second["key"] = 2
+
+        assert second.conflicts() == []
+
+    def test_closed_overlay_writes_through(self):
+        """Test that a finished overlay updates the base directly."""
+        base: dict[str, Any] = {"kept": 1}
+        overlay = SharedStateOverlay(base)
+        overlay["dropped"] = 1
+        overlay.discard()
+
+        overlay["late"] = 2
+
+        assert base == {"kept": 1, "late": 2}
+
+    def test_context_on_overlay_shares_index(self):
+        """Test that an overlay context reuses the base state's index."""
+        base = {"_meta_output_existing": 1}
+        index = ContextIndex()
+        Context(base, index=index)
+
+        with patch.object(ContextIndex, "rebuild") as rebuild:
+            context = Context(SharedStateOverlay(base), index=index)
+            rebuild.assert_not_called()
+
+        assert context.get_output("existing") == 1
+
 
 # ============================================================================
 # PER-STATE SCRATCH DATA TESTS
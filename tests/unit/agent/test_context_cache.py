@@ -0,0 +1,168 @@
+"""Tests for the bounded context cache."""
+
+import asyncio
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.context import Context, ContextIndex
+from puffinflow.core.agent.context_cache import ContextCache
+from puffinflow.core.coordination.agent_team import AgentTeam
+
+CLOCK = "puffinflow.core.agent.context_cache.time.time"
+
+
+class TestContextCache:
+    """Test eviction, expiry and counters."""
+
+    def test_rejects_invalid_configuration(self):
+        with pytest.raises(ValueError, match="max_entries"):
+            ContextCache(max_entries=0)
+        with pytest.raises(ValueError, match="Unknown cache policy"):
+            ContextCache(policy="fifo")
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = ContextCache(max_entries=2)
+        cache.put("a", 1, float("inf"))
+        cache.put("b", 2, float("inf"))
+        cache.get("a")
+        cache.put("c", 3, float("inf"))
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get_metrics()["evictions"] == 1
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = ContextCache(max_entries=2, policy="lfu")
+        cache.put("a", 1, float("inf"))
+        cache.put("b", 2, float("inf"))
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        cache.put("c", 3, float("inf"))
+        cache.put("d", 4, float("inf"))
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" not in cache
+        assert cache.get("d") == 4
+
+    def test_byte_budget(self):
+        cache = ContextCache(max_entries=None, max_bytes=10, sizeof=len)
+        cache.put("a", "xxxx", float("inf"))
+        cache.put("b", "xxxx", float("inf"))
+        cache.put("c", "xxxx", float("inf"))
+
+        assert list(cache) == ["b", "c"]
+        assert cache.get_metrics()["bytes"] == 8
+
+    def test_wheel_sweeps_expired_entries_without_access(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(CLOCK, lambda: now[0])
+        cache = ContextCache(resolution=1.0, wheel_size=8)
+        cache.put("short", 1, 1001.5)
+        cache.put("long", 2, 1020.0)
+        cache.put("due", 3, 999.0)
+
+        now[0] = 1002.0
+        cache.put("other", 4, 1100.0)
+
+        assert "short" not in cache
+        assert "due" not in cache
+        assert cache.get_metrics()["expirations"] == 2
+
+        # A later turn of the wheel finds entries left in swept slots
+        now[0] = 1021.0
+        assert cache.expire() == 1
+        assert list(cache) == ["other"]
+
+    def test_wheel_only_keeps_occupied_slots(self, monkeypatch):
+        monkeypatch.setattr(CLOCK, lambda: 1000.0)
+        cache = ContextCache(resolution=1.0, wheel_size=8)
+        assert cache._wheel == {}
+
+        cache.put("a", 1, 1003.0)
+        cache.put("b", 2, 1003.5)
+        assert len(cache._wheel) == 1
+
+        cache.pop("a")
+        cache.pop("b")
+        assert cache._wheel == {}
+
+    def test_expire_includes_current_tick(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(CLOCK, lambda: now[0])
+        cache = ContextCache(resolution=10.0)
+        cache.put("key", 1, 1001.0)
+
+        assert cache.expire(1002.0) == 1
+        assert len(cache) == 0
+
+    def test_counts_hits_and_misses(self):
+        cache = ContextCache()
+        cache.put("key", 1, float("inf"))
+        cache.get("key")
+        cache.get("missing", "default")
+
+        metrics = cache.get_metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper_is_reference_counted(self):
+        cache = ContextCache(resolution=0.01)
+        cache.start_sweeper()
+        cache.start_sweeper()
+        cache.put("key", 1, 0.0)
+
+        await asyncio.sleep(0.05)
+        assert len(cache) == 0
+
+        cache.stop_sweeper()
+        assert cache._sweeper is not None
+        cache.stop_sweeper()
+        assert cache._sweeper is None
+
+
+class TestContextIntegration:
+    """Test the cache behind contexts, agents and teams."""
+
+    def test_cached_values_stay_out_of_shared_state(self):
+        shared_state: dict = {}
+        context = Context(shared_state)
+        context.set_cached("token", "abc")
+
+        assert context.get_cached("token") == "abc"
+        assert shared_state == {}
+
+    def test_legacy_cache_keys_are_loaded(self):
+        index = ContextIndex()
+        context = Context({"_meta_cache_token": ("abc", float("inf"))}, index=index)
+
+        assert context.get_cached("token") == "abc"
+        assert context.get_variable_keys() == set()
+
+    @pytest.mark.asyncio
+    async def test_team_shares_one_cache(self):
+        async def produce(context):
+            context.set_cached("shared", 42)
+
+        async def consume(context):
+            context.set_variable("seen", context.get_cached("shared"))
+
+        producer = Agent("producer")
+        producer.add_state("produce", produce)
+        consumer = Agent("consumer")
+        consumer.add_state("consume", consume)
+        cache = ContextCache(max_entries=100)
+        AgentTeam("team").add_agent(producer).with_shared_cache(cache).add_agent(
+            consumer
+        )
+
+        await producer.run()
+        result = await consumer.run()
+
+        assert consumer.context_cache is cache
+        assert result.get_variable("seen") == 42
+        assert result.metrics["context_cache"]["hits"] == 1
+        assert cache._sweeper is None
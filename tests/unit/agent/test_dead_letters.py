@@ -0,0 +1,177 @@
+"""Tests for the dead letter queue."""
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.dead_letters import DeadLetterQueue
+from puffinflow.core.agent.state import (
+    AgentStatus,
+    DeadLetter,
+    ExecutionMode,
+    StateStatus,
+)
+
+
+def letter(state_name="state", error_type="ValueError", failed_at=100.0, **kwargs):
+    return DeadLetter(
+        state_name=state_name,
+        agent_name="agent",
+        error_message="failed",
+        error_type=error_type,
+        attempts=3,
+        failed_at=failed_at,
+        **kwargs,
+    )
+
+
+class TestDeadLetterQueue:
+    """Test the queue and its indexes."""
+
+    def test_list_compatibility(self):
+        queue = DeadLetterQueue()
+        first, second = letter("a"), letter("b")
+        queue.append(first)
+        queue.append(second)
+
+        assert len(queue) == 2
+        assert list(queue) == [first, second]
+        assert queue[0] is first
+        assert queue[-1] is second
+
+    def test_indexed_queries(self):
+        queue = DeadLetterQueue()
+        queue.append(letter("fetch", "TimeoutError", 10.0))
+        queue.append(letter("parse", "ValueError", 20.0))
+        queue.append(letter("fetch", "ValueError", 30.0))
+        queue.append(letter("fetch", "TimeoutError", 15.0))
+
+        assert [dl.failed_at for dl in queue.query(state_name="fetch")] == [
+            10.0,
+            30.0,
+            15.0,
+        ]
+        assert [dl.state_name for dl in queue.query(error_type="ValueError")] == [
+            "parse",
+            "fetch",
+        ]
+        assert [
+            dl.failed_at
+            for dl in queue.query(state_name="fetch", error_type="TimeoutError")
+        ] == [10.0, 15.0]
+        assert [dl.failed_at for dl in queue.query(since=15.0, until=20.0)] == [
+            20.0,
+            15.0,
+        ]
+        assert queue.query(state_name="missing") == []
+        assert queue.count_by_state() == {"fetch": 3, "parse": 1}
+        assert queue.count_by_error_type() == {"TimeoutError": 2, "ValueError": 2}
+
+    def test_cap_drops_oldest_without_spill_path(self):
+        queue = DeadLetterQueue(max_size=2)
+        for i in range(5):
+            queue.append(letter(f"s{i}", failed_at=float(i)))
+
+        assert [dl.state_name for dl in queue] == ["s3", "s4"]
+        assert queue.query(since=0.0) == list(queue)
+        assert queue.get_metrics()["dropped"] == 3
+
+    def test_cap_spills_oldest_to_disk(self, tmp_path):
+        path = tmp_path / "dlq" / "letters.jsonl"
+        queue = DeadLetterQueue(max_size=1, spill_path=path)
+        queue.append(letter("first", context_snapshot={"value": 1, "obj": object()}))
+        queue.append(letter("second"))
+
+        spilled = list(queue.read_spilled())
+
+        assert [dl.state_name for dl in queue] == ["second"]
+        assert [dl.state_name for dl in spilled] == ["first"]
+        assert spilled[0].context_snapshot["value"] == 1
+        assert spilled[0].context_snapshot["obj"].startswith("<object")
+        assert queue.get_metrics()["spilled"] == 1
+
+    def test_snapshots_share_unchanged_state(self):
+        queue = DeadLetterQueue()
+        shared_state = {"big": list(range(100))}
+
+        first = queue.snapshot(shared_state)
+        second = queue.snapshot(shared_state)
+        shared_state["new"] = 1
+        third = queue.snapshot(shared_state)
+
+        assert first is second
+        assert third is not first
+        assert third == {"big": shared_state["big"], "new": 1}
+        assert "new" not in first
+
+    def test_take_removes_matching_letters(self):
+        queue = DeadLetterQueue()
+        queue.append(letter("a"))
+        queue.append(letter("b"))
+        queue.append(letter("a"))
+
+        taken = queue.take(state_name="a")
+
+        assert [dl.state_name for dl in taken] == ["a", "a"]
+        assert [dl.state_name for dl in queue] == ["b"]
+        assert queue.count_by_state() == {"b": 1}
+
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError, match="max_size"):
+            DeadLetterQueue(max_size=0)
+
+
+class TestAgentDeadLetters:
+    """Test dead letters recorded by an agent."""
+
+    @pytest.mark.asyncio
+    async def test_failures_are_indexed_and_capped(self):
+        agent = Agent("storm", dead_letter_queue=DeadLetterQueue(max_size=2))
+
+        def make_state(i):
+            async def failing(context):
+                raise KeyError(i)
+
+            return failing
+
+        for i in range(4):
+            agent.add_state(f"s{i}", make_state(i), max_retries=1)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.FAILED
+        assert agent.get_dead_letter_count() == 2
+        assert len(agent.query_dead_letters(error_type="KeyError")) == 2
+        assert result.metrics["dead_letters"]["dropped"] == 2
+        # Failures against an unchanged shared state share one snapshot
+        first, second = agent.get_dead_letters()
+        assert first.context_snapshot is second.context_snapshot
+
+    @pytest.mark.asyncio
+    async def test_bulk_replay(self):
+        agent = Agent("replay")
+        healthy = False
+
+        async def flaky(context):
+            if not healthy:
+                raise ConnectionError("down")
+            context.set_variable("recovered", True)
+
+        async def other(context):
+            raise ValueError("bad input")
+
+        agent.add_state("flaky", flaky, max_retries=1)
+        agent.add_state("other", other, max_retries=1)
+
+        await agent.run(execution_mode=ExecutionMode.PARALLEL)
+        assert agent.get_dead_letter_count() == 2
+
+        healthy = True
+        assert agent.replay_dead_letters(error_type="ConnectionError") == ["flaky"]
+        assert agent.state_metadata["flaky"].status == StateStatus.PENDING
+        assert [dl.state_name for dl in agent.get_dead_letters()] == ["other"]
+
+        await agent.run()
+
+        assert agent.get_variable("recovered") is True
+        assert agent.state_metadata["flaky"].status == StateStatus.COMPLETED
+        assert agent.replay_dead_letters(state_name="missing") == []
@@ -4,6 +4,7 @@ from unittest.mock import Mock
 
 from puffinflow.core.agent.dependencies import (
     DependencyConfig,
+    DependencyIndex,
     DependencyLifecycle,
     DependencyType,
 )
@@ -353,3 +354,47 @@ class TestDependencyTypes:
 
         # Sequential means must run after dependency completes
         assert config.type == DependencyType.SEQUENTIAL
+
+
+class TestDependencyIndex:
+    """Test DependencyIndex readiness tracking."""
+
+    def test_build_reverse_adjacency(self):
+        """Test that dependents are indexed by their dependency."""
+        index = DependencyIndex.build({"a": [], "b": ["a"], "c": ["a", "b"]})
+
+        assert index.dependents["a"] == ["b", "c"]
+        assert index.dependents["b"] == ["c"]
+        assert index.pending == {"a": 0, "b": 1, "c": 2}
+
+    def test_mark_completed_returns_unblocked_dependents(self):
+        """Test that only dependents whose last dependency finished are returned."""
+        index = DependencyIndex.build({"a": [], "b": ["a"], "c": ["a", "b"]})
+
+        assert index.mark_completed("a") == ["b"]
+        assert not index.is_ready("c")
+        assert index.mark_completed("b") == ["c"]
+        assert index.is_ready("c")
+
+    def test_mark_completed_is_idempotent(self):
+        """Test that completing a state twice does not double count."""
+        index = DependencyIndex.build({"a": [], "b": ["a"], "c": ["a", "b"]})
+
+        index.mark_completed("a")
+        assert index.mark_completed("a") == []
+        assert index.pending["c"] == 1
+
+    def test_build_with_completed_states(self):
+        """Test that already completed dependencies start satisfied."""
+        index = DependencyIndex.build({"a": [], "b": ["a"]}, completed={"a"})
+
+        assert index.is_ready("b")
+        assert index.mark_completed("a") == []
+
+    def test_duplicate_dependencies_counted_once(self):
+        """Test that a dependency listed twice only blocks once."""
+        index = DependencyIndex()
+        index.add_state("b", ["a", "a"])
+
+        assert index.pending["b"] == 1
+        assert index.mark_completed("a") == ["b"]
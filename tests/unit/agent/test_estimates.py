@@ -0,0 +1,184 @@
+"""Tests for duration estimates and run deadlines."""
+
+import asyncio
+import time
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.context import Context
+from puffinflow.core.agent.estimates import DurationEstimator
+from puffinflow.core.agent.state import AgentStatus, ExecutionMode, Priority
+
+
+class TestDurationEstimator:
+    """Test the moving averages and critical path ranks."""
+
+    def test_moving_average(self):
+        estimator = DurationEstimator(alpha=0.5)
+        estimator.observe("state", 1.0)
+        estimator.observe("state", 3.0)
+
+        assert estimator.estimate("state") == 2.0
+        assert estimator.estimate("unknown") == 0.0
+
+    def test_upward_ranks_follow_longest_path(self):
+        estimator = DurationEstimator()
+        estimator.estimates = {"a": 1.0, "b": 2.0, "c": 5.0, "d": 1.0}
+        dependents = {"a": ["b", "c"], "b": ["d"], "c": ["d"]}
+
+        ranks = estimator.upward_ranks(["a", "b", "c", "d"], dependents)
+
+        assert ranks == {"d": 1.0, "b": 3.0, "c": 6.0, "a": 7.0}
+        assert estimator.upward_ranks(["a"], dependents, done={"c"})["a"] == 4.0
+
+    def test_invalid_alpha(self):
+        with pytest.raises(ValueError, match="alpha"):
+            DurationEstimator(alpha=0)
+
+
+class TestRunDeadline:
+    """Test deadline propagation inside a run."""
+
+    def test_context_without_deadline(self):
+        assert Context({}).remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_states_see_the_run_deadline(self):
+        seen = []
+
+        async def check(context):
+            seen.append((context.deadline, context.remaining()))
+
+        for timeout in (5, None):
+            agent = Agent("deadline")
+            agent.add_state("check", check)
+            await agent.run(timeout=timeout)
+            assert agent._deadline is None
+
+        (deadline, remaining), unbounded = seen
+        assert deadline is not None
+        assert 4 < remaining <= 5
+        assert unbounded == (None, None)
+
+    @pytest.mark.asyncio
+    async def test_waits_are_capped_at_the_budget(self):
+        agent = Agent("capped")
+        agent._deadline = time.time() + 0.05
+        assert agent._capped_timeout(None) <= 0.05
+        assert agent._capped_timeout(0.01) == 0.01
+
+        started = time.monotonic()
+        assert not await agent.wait_for_variable("never", True)
+
+        assert time.monotonic() - started < 1
+
+    @pytest.mark.asyncio
+    async def test_state_timeout_is_capped_at_the_budget(self):
+        agent = Agent("slow", enable_fast_path=False)
+
+        async def slow(context):
+            await asyncio.sleep(10)
+
+        agent.add_state("slow", slow, max_retries=1)
+
+        started = time.monotonic()
+        result = await agent.run(timeout=0.1)
+
+        assert result.status == AgentStatus.FAILED
+        assert time.monotonic() - started < 1
+
+    @pytest.mark.asyncio
+    async def test_doomed_run_aborts_early(self):
+        calls = 0
+
+        async def slow(context):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+
+        first = Agent("doomed")
+        first.add_state("slow", slow)
+        await first.run()
+        assert first.duration_estimator.estimate("slow") >= 0.05
+
+        # A later run learns from the shared history
+        agent = Agent("doomed")
+        agent.add_state("slow", slow)
+        agent.duration_estimator = first.duration_estimator
+        started = time.monotonic()
+        result = await agent.run(timeout=0.01)
+
+        assert result.status == AgentStatus.FAILED
+        assert result.metrics["deadline_aborts"] == 1
+        assert calls == 1
+        assert time.monotonic() - started < 0.01
+
+    @pytest.mark.asyncio
+    async def test_early_abort_can_be_disabled(self):
+        agent = Agent("patient", early_abort=False)
+
+        async def quick(context):
+            pass
+
+        agent.add_state("quick", quick)
+        agent.duration_estimator.estimates["quick"] = 100.0
+
+        result = await agent.run(timeout=1)
+
+        assert result.status == AgentStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_critical_path_runs_first_near_the_deadline(self):
+        def build():
+            agent = Agent("critical", max_concurrent=1)
+            order = []
+
+            def make_state(name):
+                async def state_func(context):
+                    order.append(name)
+
+                return state_func
+
+            agent.add_state("short", make_state("short"), priority=Priority.HIGH)
+            agent.add_state("head", make_state("head"), priority=Priority.LOW)
+            agent.add_state("tail", make_state("tail"), dependencies=["head"])
+            agent.duration_estimator.estimates = {
+                "short": 0.01,
+                "head": 0.01,
+                "tail": 0.5,
+            }
+            return agent, order
+
+        relaxed, relaxed_order = build()
+        await relaxed.run(execution_mode=ExecutionMode.PARALLEL)
+
+        pressed, pressed_order = build()
+        result = await pressed.run(timeout=0.9, execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert relaxed_order[0] == "short"
+        assert pressed_order[0] == "head"
+
+    def test_remaining_critical_path_tracks_queue_changes(self):
+        async def state_func(context):
+            pass
+
+        agent = Agent("ranks")
+        for name in ("a", "b", "c"):
+            agent.add_state(name, state_func)
+        agent._critical_ranks = {"a": 3.0, "b": 2.0, "c": 1.0}
+        agent._reset_rank_heap()
+
+        agent._enqueue("b")
+        agent._enqueue("c")
+        agent._schedule_retry("a", 60.0)
+        assert agent._remaining_critical_path() == 3.0
+
+        agent.cancel_state("a")
+        assert agent._remaining_critical_path() == 2.0
+        agent._queued.discard("b")
+        assert agent._remaining_critical_path() == 1.0
+        agent._queued.discard("c")
+        assert agent._remaining_critical_path() == 0.0
+        assert agent._rank_heap == []
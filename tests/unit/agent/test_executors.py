@@ -0,0 +1,300 @@
+"""Tests for thread and process pool state execution."""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.decorators.builder import build_state
+from puffinflow.core.agent.decorators.flexible import state
+from puffinflow.core.agent.executors import (
+    ExecutorRegistry,
+    StateExecutor,
+    run_state_in_worker,
+)
+from puffinflow.core.agent.state import AgentStatus, ExecutionMode, StateStatus
+from puffinflow.core.resources.requirements import ResourceRequirements
+
+
+def square_in_process(context):
+    value = context.get_variable("value")
+    context.set_variable("squared", value * value)
+    context.set_output("pid", os.getpid())
+
+
+def append_in_process(context):
+    items = context.get_variable("items")
+    items.append(4)
+    context.set_variable("items", items)
+    context.set_variable("n", len(items))
+
+
+class TestRunStateInWorker:
+    """Test the worker-side entry point."""
+
+    def test_returns_only_changes(self):
+        shared = {"kept": 1, "replaced": 2, "dropped": 3}
+
+        def func(context):
+            context.set_state("replaced", 20)
+            context.set_state("added", 4)
+            context.remove_state("dropped")
+            return "next"
+
+        result, updates, removed = run_state_in_worker(func, shared)
+
+        assert result == "next"
+        assert updates == {"replaced": 20, "added": 4}
+        assert removed == ["dropped"]
+
+    def test_runs_coroutine_functions(self):
+        async def func(context):
+            await asyncio.sleep(0)
+            context.set_variable("done", True)
+
+        result, updates, _ = run_state_in_worker(func, {})
+
+        assert result is None
+        assert updates == {"done": True}
+
+
+class TestStateExecutor:
+    """Test slot accounting."""
+
+    @pytest.fixture
+    def executor(self):
+        pool = ThreadPoolExecutor(max_workers=4)
+        yield StateExecutor("test", pool, slots=4, owned=True)
+        pool.shutdown(wait=True)
+
+    def test_slots_for_maps_cpu_units(self, executor):
+        assert executor.slots_for(ResourceRequirements(cpu_units=0.5)) == 1
+        assert executor.slots_for(ResourceRequirements(cpu_units=2.0)) == 2
+        assert executor.slots_for(ResourceRequirements(cpu_units=2.5)) == 3
+        assert executor.slots_for(ResourceRequirements(cpu_units=16.0)) == 4
+        assert executor.slots_for(None) == 1
+
+    def test_requires_a_slot(self):
+        with pytest.raises(ValueError, match="at least one slot"):
+            StateExecutor("empty", ThreadPoolExecutor(max_workers=1), slots=0)
+
+    @pytest.mark.asyncio
+    async def test_slots_limit_concurrent_work(self, executor):
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def work():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        await asyncio.gather(*(executor.run(work, slots=2) for _ in range(4)))
+
+        assert peak == 2
+        assert executor.available_slots == 4
+
+    @pytest.mark.asyncio
+    async def test_slots_held_until_worker_finishes(self, executor):
+        release = threading.Event()
+
+        task = asyncio.create_task(executor.run(release.wait, slots=3))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The worker is still running, so its slots are still reserved
+        assert executor.available_slots == 1
+
+        release.set()
+        for _ in range(100):
+            if executor.available_slots == 4:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.available_slots == 4
+
+    def test_snapshot_drops_unpicklable_values_for_processes(self):
+        executor = StateExecutor(
+            "proc", ThreadPoolExecutor(max_workers=1), slots=1, picklable=True
+        )
+        snapshot = executor.snapshot({"value": 1, "lock": threading.Lock()})
+
+        assert snapshot == {"value": 1}
+        executor.executor.shutdown()
+
+
+class TestExecutorRegistry:
+    """Test named executor lookup."""
+
+    def test_builtin_pools_are_created_lazily(self):
+        registry = ExecutorRegistry(max_workers=2)
+        assert "thread" not in registry
+
+        executor = registry.get("thread")
+
+        assert registry.get("thread") is executor
+        assert executor.slots == 2
+        assert not executor.picklable
+        assert registry.get("process").picklable
+        registry.shutdown()
+        assert "thread" not in registry
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError, match="Unknown executor"):
+            ExecutorRegistry().get("gpu")
+
+    def test_register_named_pool(self):
+        registry = ExecutorRegistry()
+        pool = ThreadPoolExecutor(max_workers=3)
+
+        executor = registry.register("io", pool)
+
+        assert registry.get("io") is executor
+        assert executor.slots == 3
+        with pytest.raises(ValueError, match="already registered"):
+            registry.register("io", pool)
+
+        # Caller-owned pools are left running
+        registry.shutdown()
+        assert pool.submit(lambda: 1).result() == 1
+        pool.shutdown()
+
+
+class TestAgentExecutors:
+    """Test dispatching agent states to executors."""
+
+    def test_decorator_and_builder_record_executor(self):
+        @state(executor="thread")
+        def decorated(context):
+            pass
+
+        @build_state().in_process()
+        def built(context):
+            pass
+
+        agent = Agent("configured")
+        agent.add_state("decorated", decorated)
+        agent.add_state("built", built)
+        agent.add_state("explicit", decorated, executor="io")
+
+        assert agent.state_metadata["decorated"].executor == "thread"
+        assert agent.state_metadata["built"].executor == "process"
+        assert agent.state_metadata["explicit"].executor == "io"
+        assert agent.compile_plan().states["decorated"].executor == "thread"
+
+    def test_decorator_rejects_invalid_executor(self):
+        with pytest.raises(ValueError, match="Invalid executor"):
+
+            @state(executor=4)
+            def invalid(context):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_thread_state_does_not_block_event_loop(self):
+        agent = Agent("threaded", max_concurrent=2)
+        finished = threading.Event()
+        ticks = 0
+
+        def blocking(context):
+            time.sleep(0.1)
+            context.set_variable("thread", threading.current_thread().name)
+            finished.set()
+
+        async def ticker(context):
+            nonlocal ticks
+            while not finished.is_set() and ticks < 100:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        agent.add_state("blocking", blocking, executor="thread")
+        agent.add_state("ticker", ticker)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+        await agent.cleanup()
+
+        assert result.status == AgentStatus.COMPLETED
+        # The loop kept ticking while the blocking state ran
+        assert ticks > 3
+        assert result.get_variable("thread").startswith("puffinflow")
+
+    @pytest.mark.asyncio
+    async def test_results_and_transitions_merge_back(self):
+        agent = Agent("merge")
+
+        def produce(context):
+            context.set_variable("value", 21)
+            context.set_output("produced", True)
+            return "consume"
+
+        async def consume(context):
+            context.set_variable("answer", context.get_variable("value") * 2)
+
+        agent.add_state("produce", produce, executor="thread")
+        agent.add_state("consume", consume)
+
+        result = await agent.run()
+        await agent.cleanup()
+
+        assert result.get_variable("answer") == 42
+        assert result.get_output("produced") is True
+
+    @pytest.mark.asyncio
+    async def test_process_executor(self):
+        agent = Agent("processes")
+        agent.executors.register("proc", ProcessPoolExecutor(max_workers=1))
+        agent.set_variable("value", 7)
+        agent.add_state("square", square_in_process, executor="proc")
+
+        result = await agent.run()
+        agent.executors.get("proc").executor.shutdown()
+
+        assert result.status == AgentStatus.COMPLETED
+        assert result.get_variable("squared") == 49
+        assert result.get_output("pid") != os.getpid()
+
+    @pytest.mark.asyncio
+    async def test_process_state_sends_back_values_mutated_in_place(self):
+        agent = Agent("mutations")
+        agent.executors.register("proc", ProcessPoolExecutor(max_workers=1))
+        agent.set_variable("items", [1, 2, 3])
+        agent.add_state("append", append_in_process, executor="proc")
+
+        result = await agent.run()
+        agent.executors.get("proc").executor.shutdown()
+
+        assert result.get_variable("items") == [1, 2, 3, 4]
+        assert result.get_variable("n") == 4
+
+    @pytest.mark.asyncio
+    async def test_unknown_executor_fails_state(self):
+        agent = Agent("unknown")
+
+        def work(context):
+            pass
+
+        agent.add_state("work", work, executor="missing", max_retries=1)
+
+        await agent.run()
+
+        assert agent.state_metadata["work"].status == StateStatus.FAILED
+        assert agent.dead_letters[0].error_type == "ValueError"
+
+    @pytest.mark.asyncio
+    async def test_cleanup_shuts_down_owned_pools(self):
+        agent = Agent("owner")
+        registry = agent.executors
+        registry.get("thread")
+
+        await agent.cleanup()
+
+        assert "thread" not in registry
+        assert agent._executors is None
@@ -0,0 +1,252 @@
+"""Tests for state result caching."""
+
+import threading
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.decorators.builder import build_state
+from puffinflow.core.agent.decorators.flexible import state
+from puffinflow.core.agent.memoization import StateCache, code_fingerprint
+from puffinflow.core.agent.state import AgentStatus, CachePolicy, ExecutionMode
+
+
+def double(context):
+    return context.get_variable("value") * 2
+
+
+def triple(context):
+    return context.get_variable("value") * 3
+
+
+class TestCodeFingerprint:
+    """Test function code hashing."""
+
+    def test_same_code_same_fingerprint(self):
+        assert code_fingerprint(double) == code_fingerprint(double)
+
+    def test_different_code_different_fingerprint(self):
+        assert code_fingerprint(double) != code_fingerprint(triple)
+
+    def test_nested_code_is_included(self):
+        def outer_a():
+            def inner():
+                return 1
+
+            return inner
+
+        def outer_b():
+            def inner():
+                return 2
+
+            return inner
+
+        outer_b.__qualname__ = outer_a.__qualname__
+        assert code_fingerprint(outer_a) != code_fingerprint(outer_b)
+
+
+class TestStateCache:
+    """Test the cache tiers."""
+
+    def test_key_depends_on_declared_inputs_only(self):
+        cache = StateCache()
+
+        key = cache.make_key("s", double, {"value": 1, "other": 1}, inputs=["value"])
+
+        assert key == cache.make_key("s", double, {"value": 1, "other": 2}, ["value"])
+        assert key != cache.make_key("s", double, {"value": 2}, ["value"])
+        assert key != cache.make_key("s", double, {}, ["value"])
+        assert key != cache.make_key("s", triple, {"value": 1}, ["value"])
+        assert key != cache.make_key("t", double, {"value": 1}, ["value"])
+
+    def test_unpicklable_input_is_uncacheable(self):
+        cache = StateCache()
+
+        assert cache.make_key("s", double, {"lock": threading.Lock()}) is None
+        assert cache.get_metrics()["uncacheable"] == 1
+
+    def test_replays_fresh_copies(self):
+        cache = StateCache()
+        cache.put("key", "next", {"items": [1]}, ["old"])
+
+        first = cache.get("key")
+        first[1]["items"].append(2)
+
+        assert cache.get("key") == ("next", {"items": [1]}, ["old"])
+        assert cache.get("missing") is None
+        assert cache.get_metrics()["hits"] == 2
+        assert cache.get_metrics()["misses"] == 1
+
+    def test_lru_eviction(self):
+        cache = StateCache(max_entries=2)
+        cache.put("a", 1, {}, [])
+        cache.put("b", 2, {}, [])
+        cache.get("a")
+        cache.put("c", 3, {}, [])
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_metrics()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = StateCache(ttl=10)
+        monkeypatch.setattr("puffinflow.core.agent.memoization.time.time", lambda: 100)
+        cache.put("key", 1, {}, [])
+
+        monkeypatch.setattr("puffinflow.core.agent.memoization.time.time", lambda: 105)
+        assert cache.get("key") is not None
+        assert cache.get("key", ttl=1) is None
+        assert cache.get("key") is None
+
+    def test_unpicklable_effects_are_not_stored(self):
+        cache = StateCache()
+
+        assert not cache.put("key", None, {"lock": threading.Lock()}, [])
+        assert cache.get("key") is None
+
+    def test_disk_tier_survives_new_cache(self, tmp_path):
+        StateCache(directory=tmp_path).put("key", "done", {"value": 1}, [])
+
+        cache = StateCache(directory=tmp_path)
+
+        assert cache.get("key") == ("done", {"value": 1}, [])
+        assert cache.get_metrics()["disk_hits"] == 1
+
+    def test_disk_tier_byte_limit(self, tmp_path):
+        cache = StateCache(directory=tmp_path, max_disk_bytes=600)
+        for key in ("a", "b", "c"):
+            cache.put(key, None, {"blob": "x" * 200}, [])
+
+        assert not (tmp_path / "a.pkl").exists()
+        assert (tmp_path / "c.pkl").exists()
+
+        cache.clear()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestAgentCaching:
+    """Test skipping cached states in an agent."""
+
+    def test_decorator_builder_and_argument(self):
+        @state(cache=True, cache_inputs="value", cache_ttl=60)
+        def decorated(context):
+            pass
+
+        @build_state().cached(inputs=["a", "b"])
+        def built(context):
+            pass
+
+        agent = Agent("configured")
+        agent.add_state("decorated", decorated)
+        agent.add_state("built", built)
+        agent.add_state("explicit", double, cache=True)
+        agent.add_state("disabled", decorated, cache=False)
+
+        assert agent.state_metadata["decorated"].cache == CachePolicy(
+            inputs=("value",), ttl=60
+        )
+        assert agent.state_metadata["built"].cache.inputs == ("a", "b")
+        assert agent.state_metadata["explicit"].cache == CachePolicy()
+        assert agent.state_metadata["disabled"].cache is None
+        assert agent.compile_plan().states["built"].cache.inputs == ("a", "b")
+
+    def test_decorator_rejects_invalid_ttl(self):
+        with pytest.raises(ValueError, match="cache_ttl"):
+
+            @state(cache=True, cache_ttl=0)
+            def invalid(context):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_unchanged_inputs_replay_writes_and_transitions(self):
+        cache = StateCache()
+        calls = []
+
+        async def expensive(context):
+            calls.append(context.get_variable("value"))
+            context.set_variable("result", context.get_variable("value") * 10)
+            context.set_output("computed", True)
+            return "report"
+
+        async def report(context):
+            context.set_variable("reported", context.get_variable("result"))
+
+        def build(value):
+            agent = Agent("incremental", state_cache=cache)
+            agent.set_variable("value", value)
+            agent.add_state(
+                "expensive", expensive, cache=CachePolicy(inputs=("value",))
+            )
+            agent.add_state("report", report)
+            return agent
+
+        first = await build(4).run()
+        second = await build(4).run()
+        third = await build(5).run()
+
+        assert calls == [4, 5]
+        assert second.status == AgentStatus.COMPLETED
+        assert second.get_variable("result") == 40
+        assert second.get_variable("reported") == 40
+        assert second.get_output("computed") is True
+        assert first.get_variable("reported") == 40
+        assert third.get_variable("reported") == 50
+        assert second.metrics["state_cache"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_changed_frontier_reruns(self):
+        cache = StateCache()
+        runs = []
+
+        def make_state(name, source, target):
+            async def state_func(context):
+                runs.append(name)
+                context.set_variable(target, context.get_variable(source) + 1)
+
+            return state_func
+
+        def build(a, b):
+            agent = Agent("dag", state_cache=cache)
+            agent.set_variable("a", a)
+            agent.set_variable("b", b)
+            agent.add_state(
+                "left", make_state("left", "a", "left_out"), cache=CachePolicy(("a",))
+            )
+            agent.add_state(
+                "right",
+                make_state("right", "b", "right_out"),
+                cache=CachePolicy(("b",)),
+            )
+            agent.add_state(
+                "join",
+                make_state("join", "left_out", "joined"),
+                dependencies=["left", "right"],
+                cache=CachePolicy(("left_out", "right_out")),
+            )
+            return agent
+
+        await build(1, 1).run(execution_mode=ExecutionMode.PARALLEL)
+        runs.clear()
+
+        result = await build(1, 2).run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert runs == ["right", "join"]
+        assert result.get_variable("joined") == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        cache = StateCache()
+        attempts = 0
+
+        async def flaky(context):
+            nonlocal attempts
+            attempts += 1
+            raise ValueError("failed")
+
+        agent = Agent("failing", state_cache=cache)
+        agent.add_state("flaky", flaky, cache=True, max_retries=1)
+
+        await agent.run()
+
+        assert attempts == 1
+        assert cache.get_metrics()["stores"] == 0
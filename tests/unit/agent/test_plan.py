@@ -0,0 +1,156 @@
+"""Tests for compiled workflow plans."""
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.plan import WorkflowPlan
+from puffinflow.core.agent.state import (
+    AgentStatus,
+    ExecutionMode,
+    Priority,
+    RetryPolicy,
+    StateStatus,
+)
+from puffinflow.core.resources.requirements import ResourceRequirements
+
+
+async def noop(context):
+    return None
+
+
+async def record(context):
+    context.set_variable("ran", context.get_variable("ran", 0) + 1)
+
+
+@pytest.fixture
+def template():
+    """Template agent with a small diamond-shaped graph."""
+    agent = Agent("template", retry_policy=RetryPolicy(max_retries=5))
+    agent.add_state("start", noop, priority=Priority.HIGH)
+    agent.add_state(
+        "left",
+        noop,
+        dependencies=["start"],
+        resources=ResourceRequirements(cpu_units=2.0),
+    )
+    agent.add_state("right", noop, dependencies=["start"])
+    agent.add_state("join", record, dependencies=["left", "right"])
+    return agent
+
+
+class TestWorkflowPlanCompile:
+    """Test plan compilation."""
+
+    def test_topological_order(self, template):
+        plan = template.compile_plan()
+
+        order = plan.topological_order
+        assert order[0] == "start"
+        assert order[-1] == "join"
+        assert set(order) == {"start", "left", "right", "join"}
+
+    def test_entry_states_and_dependents(self, template):
+        plan = template.compile_plan()
+
+        assert plan.entry_states == ("start",)
+        assert set(plan.dependents["start"]) == {"left", "right"}
+        assert plan.dependents["join"] == ()
+
+    def test_resolved_state_configuration(self, template):
+        plan = template.compile_plan()
+
+        assert plan.states["start"].priority == Priority.HIGH
+        assert plan.states["left"].resources.cpu_units == 2.0
+        assert plan.states["right"].max_retries == 5
+
+    def test_plan_is_immutable(self, template):
+        plan = template.compile_plan()
+
+        with pytest.raises(AttributeError):
+            plan.entry_states = ()
+        with pytest.raises(TypeError):
+            plan.states["extra"] = None
+
+    def test_cycle_detection(self):
+        agent = Agent("cyclic")
+        agent.add_state("a", noop)
+        agent.add_state("b", noop)
+        agent.dependencies["a"] = ["b"]
+        agent.dependencies["b"] = ["a"]
+
+        with pytest.raises(ValueError, match="Circular dependency"):
+            WorkflowPlan.compile(agent)
+
+    def test_entry_states_for_modes(self, template):
+        plan = template.compile_plan()
+
+        assert plan.entry_states_for(ExecutionMode.SEQUENTIAL) == ["start"]
+        assert plan.entry_states_for(ExecutionMode.PARALLEL) == ["start"]
+
+    def test_sequential_unreachable_states(self):
+        agent = Agent("unreachable")
+        agent.add_state("a", noop)
+        agent.add_state("b", noop)
+        agent.dependencies["b"] = ["missing"]
+
+        plan = agent.compile_plan()
+
+        assert plan.sequential_unreachable == frozenset({"b"})
+
+
+class TestAgentPlanCaching:
+    """Test how agents cache and share compiled plans."""
+
+    def test_compile_plan_is_cached(self, template):
+        assert template.compile_plan() is template.compile_plan()
+
+    def test_add_state_invalidates_plan(self, template):
+        plan = template.compile_plan()
+        template.add_state("extra", noop, dependencies=["join"])
+
+        assert template.compile_plan() is not plan
+
+    def test_direct_dependency_edit_invalidates_plan(self, template):
+        plan = template.compile_plan()
+        template.dependencies["join"] = ["left"]
+
+        new_plan = template.compile_plan()
+        assert new_plan is not plan
+        assert new_plan.states["join"].dependencies == ("left",)
+
+    def test_from_plan_shares_plan(self, template):
+        plan = template.compile_plan()
+
+        agents = [Agent.from_plan(f"worker-{i}", plan) for i in range(3)]
+
+        for agent in agents:
+            assert agent.compile_plan() is plan
+            assert list(agent.states) == list(template.states)
+            assert (
+                agent.state_metadata["left"].resources is plan.states["left"].resources
+            )
+            assert agent.state_metadata["start"].status == StateStatus.PENDING
+
+        # Metadata is per agent, not shared
+        agents[0].state_metadata["start"].attempts = 2
+        assert agents[1].state_metadata["start"].attempts == 0
+
+    def test_apply_plan_rejects_agent_with_states(self, template):
+        plan = template.compile_plan()
+
+        with pytest.raises(ValueError, match="already has states"):
+            template.apply_plan(plan)
+
+    @pytest.mark.asyncio
+    async def test_agents_from_shared_plan_run_independently(self, template):
+        plan = template.compile_plan()
+        first = Agent.from_plan("first", plan)
+        second = Agent.from_plan("second", plan)
+
+        result_first = await first.run(execution_mode=ExecutionMode.PARALLEL)
+        result_second = await second.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result_first.status == AgentStatus.COMPLETED
+        assert result_second.status == AgentStatus.COMPLETED
+        assert first.completed_states == set(plan.states)
+        assert second.get_variable("ran") == 1
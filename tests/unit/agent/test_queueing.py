@@ -0,0 +1,283 @@
+"""Tests for agent queue scheduling policies."""
+
+import asyncio
+import heapq
+import time
+from unittest.mock import patch
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.queueing import (
+    AgingScheduler,
+    CriticalPathScheduler,
+    QueueWaitHistogram,
+    StateScheduler,
+    WeightedFairScheduler,
+    create_scheduler,
+)
+from puffinflow.core.agent.state import (
+    AgentStatus,
+    ExecutionMode,
+    Priority,
+    StateMetadata,
+    StateStatus,
+)
+
+
+def metadata(priority):
+    return StateMetadata(status=StateStatus.PENDING, priority=priority)
+
+
+def drain(scheduler, entries):
+    heap = list(entries)
+    heapq.heapify(heap)
+    order = []
+    while heap:
+        entry = heapq.heappop(heap)
+        scheduler.on_dequeue(entry)
+        order.append(entry.state_name)
+    return order
+
+
+class TestQueueWaitHistogram:
+    """Test the queue-wait histogram."""
+
+    def test_observations_land_in_buckets(self):
+        histogram = QueueWaitHistogram(bounds=(0.01, 0.1, 1.0))
+        for seconds in (0.005, 0.05, 0.05, 0.5, 5.0):
+            histogram.observe(seconds)
+
+        result = histogram.to_dict()
+
+        assert result["count"] == 5
+        assert result["buckets"] == {"0.01": 1, "0.1": 2, "1.0": 1, "+Inf": 1}
+        assert result["max"] == 5.0
+        assert result["mean"] == pytest.approx(1.121)
+        assert result["p50"] == 0.1
+        assert result["p99"] == 5.0
+
+    def test_empty_histogram(self):
+        histogram = QueueWaitHistogram()
+
+        assert histogram.percentile(95) == 0.0
+        assert histogram.to_dict()["mean"] == 0.0
+
+
+class TestSchedulers:
+    """Test the ordering produced by each policy."""
+
+    def test_strict_priority_is_fifo_within_priority(self):
+        scheduler = StateScheduler()
+        entries = [
+            scheduler.entry("low", metadata(Priority.LOW)),
+            scheduler.entry("high_1", metadata(Priority.HIGH)),
+            scheduler.entry("normal", metadata(Priority.NORMAL)),
+            scheduler.entry("high_2", metadata(Priority.HIGH)),
+        ]
+
+        assert drain(scheduler, entries) == ["high_1", "high_2", "normal", "low"]
+        assert set(scheduler.get_metrics()["wait_histograms"]) == {
+            "LOW",
+            "NORMAL",
+            "HIGH",
+        }
+
+    def test_priority_boost(self):
+        scheduler = StateScheduler()
+        entries = [
+            scheduler.entry("high", metadata(Priority.HIGH)),
+            scheduler.entry("boosted", metadata(Priority.NORMAL), priority_boost=2),
+        ]
+
+        assert drain(scheduler, entries) == ["boosted", "high"]
+
+    def test_aging_lets_long_waiting_states_overtake(self):
+        scheduler = AgingScheduler(aging_rate=1.0)
+        with patch("puffinflow.core.agent.queueing.time.time", return_value=100.0):
+            old_low = scheduler.entry("old_low", metadata(Priority.LOW))
+        with patch("puffinflow.core.agent.queueing.time.time", return_value=101.5):
+            new_normal = scheduler.entry("new_normal", metadata(Priority.NORMAL))
+        with patch("puffinflow.core.agent.queueing.time.time", return_value=101.5):
+            new_critical = scheduler.entry("new_critical", metadata(Priority.CRITICAL))
+
+        # LOW gained 1.5 levels while waiting: ahead of NORMAL, behind CRITICAL
+        assert drain(scheduler, [old_low, new_normal, new_critical]) == [
+            "new_critical",
+            "old_low",
+            "new_normal",
+        ]
+
+    def test_fair_queuing_shares_launches_by_weight(self):
+        scheduler = WeightedFairScheduler(
+            weights={Priority.HIGH: 3.0, Priority.LOW: 1.0}
+        )
+        entries = [
+            scheduler.entry(f"high_{i}", metadata(Priority.HIGH)) for i in range(9)
+        ] + [scheduler.entry(f"low_{i}", metadata(Priority.LOW)) for i in range(3)]
+
+        order = drain(scheduler, entries)
+
+        # Every window of four launches holds three HIGH and one LOW state
+        for start in range(0, 12, 4):
+            window = order[start : start + 4]
+            assert sum(name.startswith("low") for name in window) == 1
+        assert [name for name in order if name.startswith("low")] == [
+            "low_0",
+            "low_1",
+            "low_2",
+        ]
+
+    def test_fair_queuing_does_not_bank_idle_credit(self):
+        scheduler = WeightedFairScheduler()
+        first = [
+            scheduler.entry(f"high_{i}", metadata(Priority.HIGH)) for i in range(8)
+        ]
+        drain(scheduler, first)
+
+        # LOW was idle while HIGH ran, so it starts at the current virtual time
+        entries = [
+            scheduler.entry("late_low", metadata(Priority.LOW)),
+            scheduler.entry("late_high", metadata(Priority.HIGH)),
+        ]
+        assert drain(scheduler, entries) == ["late_high", "late_low"]
+
+    def test_critical_path_orders_by_rank_then_priority(self):
+        scheduler = CriticalPathScheduler()
+        scheduler.prepare({"chain_head": 3.0, "leaf": 1.0})
+        entries = [
+            scheduler.entry("leaf", metadata(Priority.CRITICAL)),
+            scheduler.entry("unknown_low", metadata(Priority.LOW)),
+            scheduler.entry("chain_head", metadata(Priority.LOW)),
+            scheduler.entry("unknown_high", metadata(Priority.HIGH)),
+        ]
+
+        assert drain(scheduler, entries) == [
+            "chain_head",
+            "leaf",
+            "unknown_high",
+            "unknown_low",
+        ]
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError, match="aging_rate"):
+            AgingScheduler(aging_rate=0)
+        with pytest.raises(ValueError, match="Invalid weight"):
+            WeightedFairScheduler(weights={Priority.LOW: 0})
+        with pytest.raises(ValueError, match="Invalid scheduling_policy"):
+            create_scheduler("random")
+
+    def test_spawn_copies_configuration_only(self):
+        scheduler = WeightedFairScheduler(weights={Priority.LOW: 5.0})
+        drain(scheduler, [scheduler.entry("low", metadata(Priority.LOW))])
+
+        spawned = scheduler.spawn()
+
+        assert spawned.weights == scheduler.weights
+        assert spawned.wait_histograms == {}
+        assert AgingScheduler(0.5).spawn().aging_rate == 0.5
+
+
+class TestAgentScheduling:
+    """Test scheduling policies inside an agent."""
+
+    def test_policy_selection(self):
+        assert type(Agent("default").state_scheduler) is StateScheduler
+        assert isinstance(
+            Agent("aging", scheduling_policy="aging").state_scheduler, AgingScheduler
+        )
+        assert Agent(
+            "critical", scheduling_policy="critical_path"
+        ).state_scheduler.uses_ranks
+        custom = WeightedFairScheduler()
+        assert Agent("custom", scheduling_policy=custom).state_scheduler is custom
+        with pytest.raises(ValueError, match="Invalid scheduling_policy"):
+            Agent("invalid", scheduling_policy="lottery")
+
+    @pytest.mark.asyncio
+    async def test_fair_policy_interleaves_low_priority_states(self):
+        agent = Agent("fair", max_concurrent=1, scheduling_policy="fair")
+        order = []
+
+        def make_state(name):
+            async def state_func(context):
+                order.append(name)
+
+            return state_func
+
+        for i in range(8):
+            agent.add_state(
+                f"high_{i}", make_state(f"high_{i}"), priority=Priority.HIGH
+            )
+        agent.add_state("low", make_state("low"), priority=Priority.LOW)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        # Strict priority would run "low" last; with weights 4:1 it shares
+        # the first five launches with four HIGH states
+        assert order.index("low") in (3, 4)
+        histograms = result.metrics["queue_wait"]["wait_histograms"]
+        assert result.metrics["queue_wait"]["policy"] == "fair"
+        assert histograms["HIGH"]["count"] == 8
+        assert histograms["LOW"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_strict_policy_keeps_existing_order(self):
+        agent = Agent("strict", max_concurrent=1)
+        order = []
+
+        def make_state(name):
+            async def state_func(context):
+                order.append(name)
+
+            return state_func
+
+        agent.add_state("low", make_state("low"), priority=Priority.LOW)
+        agent.add_state("high", make_state("high"), priority=Priority.HIGH)
+
+        await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert order == ["high", "low"]
+
+    @pytest.mark.asyncio
+    async def test_critical_path_policy_shortens_makespan(self):
+        def build(policy):
+            agent = Agent("fan_out", max_concurrent=2, scheduling_policy=policy)
+            started = []
+
+            def make_state(name):
+                async def state_func(context):
+                    started.append(name)
+                    await asyncio.sleep(0.03)
+
+                return state_func
+
+            # A three-step chain next to three independent, higher priority
+            # leaves of the same length
+            agent.add_state("c1", make_state("c1"), priority=Priority.LOW)
+            agent.add_state("c2", make_state("c2"), dependencies=["c1"])
+            agent.add_state("c3", make_state("c3"), dependencies=["c2"])
+            for i in range(3):
+                agent.add_state(
+                    f"leaf_{i}", make_state(f"leaf_{i}"), priority=Priority.HIGH
+                )
+            agent.duration_estimator.estimates = dict.fromkeys(
+                ["c1", "c2", "c3", "leaf_0", "leaf_1", "leaf_2"], 0.03
+            )
+            return agent, started
+
+        async def makespan(policy):
+            agent, started = build(policy)
+            begin = time.perf_counter()
+            result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+            assert result.status == AgentStatus.COMPLETED
+            return time.perf_counter() - begin, started
+
+        strict_time, strict_order = await makespan("strict")
+        critical_time, critical_order = await makespan("critical_path")
+
+        assert "c1" not in strict_order[:2]
+        assert "c1" in critical_order[:2]
+        # Four rounds of 30 ms under strict priority, three on the critical path
+        assert critical_time < strict_time
@@ -205,6 +205,17 @@ class TestRetryPolicy:
         assert policy.dead_letter_on_max_retries is False
         assert policy.dead_letter_on_timeout is False
 
+    def test_retry_policy_get_delay(self):
+        """Test retry policy delay calculation without sleeping."""
+        policy = RetryPolicy(initial_delay=0.5, exponential_base=2.0, jitter=False)
+
+        assert policy.get_delay(0) == 0.5
+        assert policy.get_delay(2) == 2.0
+        assert policy.get_delay(20) == 60.0
+
+        jittered = RetryPolicy(initial_delay=1.0, jitter=True)
+        assert 0.5 <= jittered.get_delay(0) <= 1.0
+
     @pytest.mark.asyncio
     async def test_retry_policy_wait_without_jitter(self):
         """Test retry policy wait calculation without jitter."""
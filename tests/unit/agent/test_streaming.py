@@ -0,0 +1,278 @@
+"""Tests for streaming states."""
+
+import asyncio
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.context import Context
+from puffinflow.core.agent.decorators.builder import build_state
+from puffinflow.core.agent.decorators.flexible import state
+from puffinflow.core.agent.state import AgentStatus, ExecutionMode, StateStatus
+from puffinflow.core.agent.streaming import StateStream, StreamError
+
+
+async def collect(reader):
+    return [item async for item in reader]
+
+
+class TestStateStream:
+    """Test the stream primitive."""
+
+    @pytest.mark.asyncio
+    async def test_publish_waits_for_full_queue(self):
+        stream = StateStream("producer", ["consumer"], maxsize=2)
+        reader = stream.reader("consumer")
+
+        await stream.publish(1)
+        await stream.publish(2)
+        blocked = asyncio.create_task(stream.publish(3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        assert await reader.__anext__() == 1
+        await asyncio.wait_for(blocked, timeout=1)
+        stream.close()
+
+        assert await collect(reader) == [2, 3]
+        assert stream.items_published == 3
+
+    @pytest.mark.asyncio
+    async def test_each_consumer_gets_every_item(self):
+        stream = StateStream("producer", ["a", "b"], maxsize=4)
+        for item in range(3):
+            await stream.publish(item)
+        stream.close()
+
+        assert await collect(stream.reader("a")) == [0, 1, 2]
+        assert await collect(stream.reader("b")) == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_consumers(self):
+        stream = StateStream("producer", ["consumer"], maxsize=1)
+        await stream.publish("partial")
+        stream.close(error=RuntimeError("boom"))
+        reader = stream.reader("consumer")
+
+        assert await reader.__anext__() == "partial"
+        with pytest.raises(StreamError, match="boom") as exc_info:
+            await reader.__anext__()
+        assert exc_info.value.producer == "producer"
+        assert stream.failed
+
+    @pytest.mark.asyncio
+    async def test_detach_unblocks_producer(self):
+        stream = StateStream("producer", ["consumer"], maxsize=1)
+        await stream.publish(1)
+        blocked = asyncio.create_task(stream.publish(2))
+        await asyncio.sleep(0.01)
+
+        stream.detach("consumer")
+        await asyncio.wait_for(blocked, timeout=1)
+
+        assert stream.consumers == set()
+        await stream.publish(3)
+
+    def test_reader_requires_registered_consumer(self):
+        stream = StateStream("producer", ["consumer"], maxsize=1)
+        with pytest.raises(ValueError, match="not a streaming consumer"):
+            stream.reader("other")
+
+    def test_context_without_stream(self):
+        with pytest.raises(ValueError, match="No stream 'producer'"):
+            Context({}).stream("producer")
+
+
+class TestAgentStreaming:
+    """Test streaming between agent states."""
+
+    def test_decorator_and_builder_record_streaming(self):
+        @state(streaming=True)
+        def decorated(context):
+            pass
+
+        @build_state().streaming()
+        def built(context):
+            pass
+
+        agent = Agent("configured")
+        agent.add_state("decorated", decorated)
+        agent.add_state("built", built)
+        agent.add_state("plain", lambda context: None)
+
+        assert agent.state_metadata["decorated"].streaming
+        assert agent.state_metadata["built"].streaming
+        assert not agent.state_metadata["plain"].streaming
+        assert agent.compile_plan().states["built"].streaming
+
+    def test_invalid_buffer_size(self):
+        with pytest.raises(ValueError, match="stream_buffer_size"):
+            Agent("invalid", stream_buffer_size=0)
+
+    @pytest.mark.asyncio
+    async def test_consumer_receives_items_before_producer_finishes(self):
+        agent = Agent("pipeline")
+        events = []
+
+        async def produce(context):
+            for item in range(3):
+                events.append(f"yield {item}")
+                yield item
+                await asyncio.sleep(0.01)
+            events.append("produced")
+
+        async def consume(context):
+            async for item in context.stream("produce"):
+                events.append(f"got {item}")
+            context.set_variable("consumed", True)
+
+        agent.add_state("produce", produce)
+        agent.add_state("consume", consume, dependencies=["produce"], streaming=True)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert result.get_variable("consumed") is True
+        assert events.index("got 0") < events.index("produced")
+        assert agent._streams == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_applies_backpressure(self):
+        agent = Agent("bounded", stream_buffer_size=2)
+        produced = 0
+        max_ahead = 0
+
+        async def produce(context):
+            nonlocal produced
+            for item in range(10):
+                yield item
+                produced += 1
+
+        async def consume(context):
+            nonlocal max_ahead
+            consumed = 0
+            async for _ in context.stream("produce"):
+                consumed += 1
+                max_ahead = max(max_ahead, produced - consumed)
+                await asyncio.sleep(0.005)
+            context.set_variable("count", consumed)
+
+        agent.add_state("produce", produce)
+        agent.add_state("consume", consume, dependencies=["produce"], streaming=True)
+
+        result = await agent.run()
+
+        assert result.get_variable("count") == 10
+        # The producer never runs more than one queue ahead of the consumer
+        assert max_ahead <= 3
+
+    @pytest.mark.asyncio
+    async def test_consumer_runs_beyond_concurrency_limit(self):
+        agent = Agent("single-slot", max_concurrent=1, stream_buffer_size=1)
+
+        async def produce(context):
+            for item in range(5):
+                yield item
+
+        async def consume(context):
+            items = [item async for item in context.stream("produce")]
+            context.set_variable("items", items)
+
+        agent.add_state("produce", produce)
+        agent.add_state("consume", consume, dependencies=["produce"], streaming=True)
+
+        result = await asyncio.wait_for(agent.run(), timeout=5)
+
+        assert result.status == AgentStatus.COMPLETED
+        assert result.get_variable("items") == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_regular_dependents_wait_for_completion(self):
+        agent = Agent("mixed")
+
+        async def produce(context):
+            for item in range(3):
+                yield item
+            context.set_variable("total", 3)
+
+        async def consume(context):
+            context.set_variable(
+                "items", [item async for item in context.stream("produce")]
+            )
+
+        async def summarize(context):
+            context.set_variable("summary", context.get_variable("total"))
+
+        agent.add_state("produce", produce)
+        agent.add_state("consume", consume, dependencies=["produce"], streaming=True)
+        agent.add_state("summarize", summarize, dependencies=["produce"])
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+
+        assert result.get_variable("items") == [0, 1, 2]
+        assert result.get_variable("summary") == 3
+
+    @pytest.mark.asyncio
+    async def test_consumer_waits_for_other_dependencies(self):
+        agent = Agent("joined")
+        gate = asyncio.Event()
+
+        async def produce(context):
+            for item in range(3):
+                yield item
+
+        async def configure(context):
+            await gate.wait()
+            context.set_variable("factor", 10)
+
+        async def consume(context):
+            factor = context.get_variable("factor")
+            context.set_variable(
+                "items", [item * factor async for item in context.stream("produce")]
+            )
+
+        async def release(context):
+            await asyncio.sleep(0.01)
+            gate.set()
+
+        agent.add_state("produce", produce)
+        agent.add_state("configure", configure)
+        agent.add_state("release", release)
+        agent.add_state(
+            "consume",
+            consume,
+            dependencies=["produce", "configure"],
+            streaming=True,
+        )
+
+        result = await asyncio.wait_for(
+            agent.run(execution_mode=ExecutionMode.PARALLEL), timeout=5
+        )
+
+        assert result.status == AgentStatus.COMPLETED
+        assert result.get_variable("items") == [0, 10, 20]
+
+    @pytest.mark.asyncio
+    async def test_producer_failure_fails_consumer(self):
+        agent = Agent("broken")
+
+        async def produce(context):
+            yield 1
+            raise RuntimeError("source failed")
+
+        async def consume(context):
+            async for _ in context.stream("produce"):
+                pass
+
+        agent.add_state("produce", produce, max_retries=1)
+        agent.add_state(
+            "consume", consume, dependencies=["produce"], streaming=True, max_retries=1
+        )
+
+        result = await agent.run()
+
+        assert result.status == AgentStatus.FAILED
+        assert agent.state_metadata["produce"].status == StateStatus.FAILED
+        assert agent.state_metadata["consume"].status == StateStatus.FAILED
+        errors = {dl.state_name: dl.error_type for dl in agent.dead_letters}
+        assert errors == {"produce": "RuntimeError", "consume": "StreamError"}
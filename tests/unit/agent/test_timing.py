@@ -0,0 +1,110 @@
+"""Tests for per-phase state execution timing."""
+
+import asyncio
+
+import pytest
+
+from puffinflow.core.agent.base import Agent
+from puffinflow.core.agent.state import AgentStatus, ExecutionMode
+from puffinflow.core.agent.timing import BODY, PHASES, QUEUE_WAIT, PhaseTimer
+
+
+async def noop(context):
+    pass
+
+
+class TestPhaseTimer:
+    """Test the ring buffers."""
+
+    def test_percentiles_in_seconds(self):
+        timer = PhaseTimer(capacity=100)
+        for ms in range(1, 101):
+            timer.record(BODY, ms * 1_000_000)
+
+        body = timer.to_dict()["body"]
+
+        assert body["count"] == 100
+        assert body["p50"] == pytest.approx(0.050)
+        assert body["p95"] == pytest.approx(0.095)
+        assert body["p99"] == pytest.approx(0.099)
+        assert body["max"] == pytest.approx(0.100)
+        assert body["mean"] == pytest.approx(0.0505)
+
+    def test_ring_keeps_latest_samples(self):
+        timer = PhaseTimer(capacity=3)
+        for value in (1, 2, 3, 4, 5):
+            timer.record(QUEUE_WAIT, value)
+
+        assert timer.samples(QUEUE_WAIT) == [3, 4, 5]
+        assert timer.to_dict()["queue_wait"]["count"] == 5
+
+    def test_negative_durations_clamp_and_reset(self):
+        timer = PhaseTimer(capacity=2)
+        timer.record(BODY, -5)
+
+        assert timer.samples(BODY) == [0]
+        timer.reset()
+        assert timer.samples(BODY) == []
+        assert set(timer.to_dict()) == set(PHASES)
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError, match="capacity"):
+            PhaseTimer(capacity=0)
+
+
+class TestAgentPhaseTiming:
+    """Test timing inside an agent run."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        agent = Agent("untimed")
+        agent.add_state("only", noop)
+
+        result = await agent.run()
+
+        assert agent.phase_timer is None
+        assert result.metrics["phase_timings"] == {}
+
+    @pytest.mark.asyncio
+    async def test_phases_are_recorded(self):
+        agent = Agent("timed", enable_phase_timing=True)
+
+        async def slow(context):
+            await asyncio.sleep(0.02)
+            context.set_variable("done", True)
+
+        agent.add_state("slow", slow)
+        agent.add_state("fast", noop)
+
+        result = await agent.run(execution_mode=ExecutionMode.PARALLEL)
+        timings = result.metrics["phase_timings"]
+
+        assert result.status == AgentStatus.COMPLETED
+        assert timings["queue_wait"]["count"] == 2
+        assert timings["body"]["count"] == 2
+        assert timings["body"]["max"] >= 0.02
+        assert timings["context_merge"]["count"] == 2
+        assert timings["result_handling"]["count"] == 2
+        # Default states take the fast path and acquire nothing
+        assert timings["resource_acquire"]["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_protected_states_time_acquisition(self):
+        agent = Agent("protected", enable_phase_timing=True, enable_fast_path=False)
+        agent.add_state("only", noop)
+
+        result = await agent.run()
+        timings = result.metrics["phase_timings"]
+
+        assert timings["resource_acquire"]["count"] == 1
+        assert timings["coordination_acquire"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_run_many_shares_timer(self):
+        agent = Agent("batch", enable_phase_timing=True)
+        agent.add_state("only", noop)
+
+        results = [result async for result in agent.run_many([{}, {}, {}])]
+
+        assert len(results) == 3
+        assert agent.phase_timer.counts[BODY] == 3